@@ -0,0 +1,26 @@
+from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.api.wifi import cached_json_response, run_read
+from app.database import get_read_db
+from app.schemas.alcaldia import AlcaldiaResponse
+from app.services import alcaldia_service
+
+
+router = APIRouter(prefix="/alcaldias", tags=["Alcaldías"])
+
+
+@router.get(
+    "",
+    response_model=list[AlcaldiaResponse],
+    summary="Listar alcaldías con su número de puntos"
+)
+async def get_alcaldias(
+    request: Request,
+    db: Session | AsyncSession = Depends(get_read_db)
+) -> Response:
+    cached = await run_read(
+        db, alcaldia_service.get_all_cached, alcaldia_service.get_all_cached_async
+    )
+    return cached_json_response(request, cached)
@@ -0,0 +1,78 @@
+"""
+Rutas de importación.
+
+import_service usa pandas y pyarrow, que pesan en tiempo de arranque y en
+memoria; se importan dentro de cada ruta para que un worker que solo
+atiende lecturas nunca los cargue. Con APP_ROLE=api estas rutas no se
+montan.
+"""
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.schemas.wifi_point import ImportJob, ImportResponse
+
+
+router = APIRouter(prefix="/wifi-points", tags=["WiFi Points"])
+
+
+@router.post(
+    "/import",
+    response_model=ImportResponse,
+    summary="Importar desde CSV/Excel"
+)
+def import_wifi_points(
+    file: UploadFile = File(...),
+    on_error: str = Form(default="report"),
+    on_duplicate: str = Form(default="ignore"),
+    stream: bool = Form(default=False, description="Leer y escribir el archivo por bloques"),
+    delete_missing: bool = Form(default=False, description="Borrar los puntos que no vienen en el archivo"),
+    db: Session = Depends(get_db)
+) -> ImportResponse:
+    from app.services import import_service
+    
+    if stream:
+        return import_service.import_stream(
+            db, file.file, file.filename, on_error, on_duplicate, delete_missing=delete_missing
+        )
+    
+    content = file.file.read()
+    return import_service.import_file(
+        db, content, file.filename, on_error, on_duplicate, delete_missing
+    )
+
+
+@router.post(
+    "/import/jobs",
+    response_model=ImportJob,
+    status_code=202,
+    summary="Importar desde CSV/Excel en segundo plano"
+)
+def create_import_job(
+    file: UploadFile = File(...),
+    on_error: str = Form(default="report"),
+    on_duplicate: str = Form(default="ignore"),
+    delete_missing: bool = Form(default=False, description="Borrar los puntos que no vienen en el archivo"),
+    parallel: bool = Form(default=False, description="CSV: leer y validar por bloques en varios procesos")
+) -> ImportJob:
+    from app.services import import_jobs
+    
+    return import_jobs.submit(
+        file.file, file.filename, on_error, on_duplicate, delete_missing, parallel
+    )
+
+
+@router.get(
+    "/import/{job_id}",
+    response_model=ImportJob,
+    summary="Consultar una importación en segundo plano"
+)
+def get_import_job(job_id: str) -> ImportJob:
+    from app.services import import_jobs
+    
+    job = import_jobs.get(job_id)
+    
+    if not job:
+        raise HTTPException(status_code=404, detail="Trabajo de importación no encontrado")
+    
+    return job
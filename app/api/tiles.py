@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.api.wifi import cached_json_response, run_read
+from app.config import settings
+from app.database import get_read_db
+from app.services import tile_service
+from app.utils import mvt
+
+
+router = APIRouter(prefix="/tiles", tags=["Tiles"])
+
+
+@router.get(
+    "/{z}/{x}/{y}.mvt",
+    response_class=Response,
+    responses={200: {"content": {mvt.MEDIA_TYPE: {}}}},
+    summary="Tile vectorial (MVT) con los puntos WiFi"
+)
+async def get_tile(
+    request: Request,
+    z: int = Path(..., ge=0, le=settings.tile_max_zoom, description="Zoom"),
+    x: int = Path(..., ge=0, description="Columna del tile"),
+    y: int = Path(..., ge=0, description="Fila del tile"),
+    db: Session | AsyncSession = Depends(get_read_db)
+) -> Response:
+    if not mvt.valid_tile(z, x, y):
+        raise HTTPException(status_code=404, detail="Tile fuera de rango")
+    
+    cached = await run_read(db, tile_service.get_tile, tile_service.get_tile_async, z, x, y)
+    return cached_json_response(request, cached, media_type=mvt.MEDIA_TYPE)
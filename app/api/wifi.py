@@ -1,26 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, Query,UploadFile, File, Form
+from collections.abc import Awaitable, Callable
+from typing import Literal, TypeVar
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from app.database import get_db
-from app.services import wifi_service, import_service
+from app.database import get_read_db
+from app.services import wifi_service, wifi_service_async, export_service
 from app.schemas.wifi_point import (
     WifiPointResponse,
     WifiPointWithDistance,
-    PaginatedResponse,
-    ImportResponse
+    NearbyBatchRequest,
+    NearbyBatchResponse,
+    NearbyBatchResult,
+    ViewportResponse,
+    PaginatedResponse
 )
 from app.config import settings
+from app.repositories.wifi_repository import BBox
+from app.services.response_cache import CachedResponse, etag_matches
+from app.utils.cursor import InvalidCursorError
 
 
 router = APIRouter(prefix="/wifi-points", tags=["WiFi Points"])
 
+R = TypeVar("R")
+
+
+async def run_read(
+    db: Session | AsyncSession,
+    sync_fn: Callable[..., R],
+    async_fn: Callable[..., Awaitable[R]],
+    *args
+) -> R:
+    """Ejecuta una lectura con el stack de la sesión: async directo o sync en el threadpool."""
+    if isinstance(db, AsyncSession):
+        return await async_fn(db, *args)
+    return await run_in_threadpool(sync_fn, db, *args)
+
+
+def cached_json_response(
+    request: Request,
+    cached: CachedResponse,
+    media_type: str = "application/json"
+) -> Response:
+    """Responde con los bytes guardados, o 304 si el cliente ya tiene esa versión."""
+    headers = {"ETag": cached.etag}
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type=media_type, headers=headers)
+
 
 @router.get(
     "",
     response_model=PaginatedResponse[WifiPointResponse],
     summary="Listar puntos WiFi"
 )
-def get_wifi_points(
+async def get_wifi_points(
+    request: Request,
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(
         settings.default_page_size, 
@@ -28,9 +67,34 @@ def get_wifi_points(
         le=settings.max_page_size,
         description="Elementos por página"
     ),
-    db: Session = Depends(get_db)
-) -> PaginatedResponse[WifiPointResponse]:
-    return wifi_service.get_all(db, page, limit)
+    include_total: bool = Query(True, description="Calcular total y páginas"),
+    after: str | None = Query(None, description="Cursor de la página siguiente (pagination.next_cursor)"),
+    db: Session | AsyncSession = Depends(get_read_db)
+) -> Response:
+    try:
+        cached = await run_read(
+            db, wifi_service.get_all_cached, wifi_service_async.get_all_cached,
+            page, limit, include_total, after
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return cached_json_response(request, cached)
+
+
+@router.get(
+    "/export",
+    summary="Exportar todos los puntos WiFi (NDJSON o CSV)",
+    response_class=StreamingResponse,
+    responses={200: {"content": {media_type: {} for media_type in export_service.MEDIA_TYPES.values()}}}
+)
+def export_wifi_points(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Formato de salida")
+) -> StreamingResponse:
+    return StreamingResponse(
+        export_service.stream(format),
+        media_type=export_service.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="wifi-points.{format}"'}
+    )
 
 
 @router.get(
@@ -38,9 +102,11 @@ def get_wifi_points(
     response_model=PaginatedResponse[WifiPointWithDistance],
     summary="Listar puntos WiFi por proximidad"
 )
-def get_nearby_wifi_points(
+async def get_nearby_wifi_points(
     lat: float = Query(..., ge=-90, le=90, description="Latitud"),
     lng: float = Query(..., ge=-180, le=180, description="Longitud"),
+    radius_m: float | None = Query(None, gt=0, description="Radio máximo en metros"),
+    cursor: str | None = Query(None, description="Cursor de la página siguiente (pagination.next_cursor)"),
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(
         settings.default_page_size,
@@ -48,9 +114,84 @@ def get_nearby_wifi_points(
         le=settings.max_page_size,
         description="Elementos por página"
     ),
-    db: Session = Depends(get_db)
-) -> PaginatedResponse[WifiPointWithDistance]:
-    return wifi_service.get_nearby(db, lat, lng, page, limit)
+    include_total: bool = Query(True, description="Calcular total y páginas"),
+    db: Session | AsyncSession = Depends(get_read_db)
+) -> Response:
+    try:
+        body = await run_read(
+            db, wifi_service.get_nearby_json, wifi_service_async.get_nearby_json,
+            lat, lng, page, limit, radius_m, cursor, include_total
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return Response(content=body, media_type="application/json")
+
+
+@router.post(
+    "/nearby/batch",
+    response_model=NearbyBatchResponse,
+    summary="Puntos WiFi más cercanos para varias coordenadas"
+)
+async def get_nearby_batch(
+    body: NearbyBatchRequest,
+    db: Session | AsyncSession = Depends(get_read_db)
+) -> Response:
+    if len(body.queries) > settings.nearby_batch_max_queries:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Máximo {settings.nearby_batch_max_queries} coordenadas por petición"
+        )
+    
+    content = await run_read(
+        db, wifi_service.get_nearby_batch_json, wifi_service_async.get_nearby_batch_json,
+        body.queries
+    )
+    return Response(content=content, media_type="application/json")
+
+
+@router.get(
+    "/nearest",
+    response_model=NearbyBatchResult,
+    summary="Puntos WiFi más cercanos a una coordenada"
+)
+async def get_nearest_wifi_points(
+    lat: float = Query(..., ge=-90, le=90, description="Latitud"),
+    lng: float = Query(..., ge=-180, le=180, description="Longitud"),
+    k: int = Query(
+        settings.nearest_grid_k,
+        ge=1,
+        le=settings.max_page_size,
+        description="Puntos más cercanos a devolver"
+    ),
+    db: Session | AsyncSession = Depends(get_read_db)
+) -> Response:
+    content = await run_read(
+        db, wifi_service.get_nearest_json, wifi_service_async.get_nearest_json, lat, lng, k
+    )
+    return Response(content=content, media_type="application/json")
+
+
+@router.get(
+    "/viewport",
+    response_model=ViewportResponse,
+    summary="Puntos o clusters dentro de un rectángulo del mapa"
+)
+async def get_viewport(
+    min_lng: float = Query(..., ge=-180, le=180, description="Longitud oeste"),
+    min_lat: float = Query(..., ge=-90, le=90, description="Latitud sur"),
+    max_lng: float = Query(..., ge=-180, le=180, description="Longitud este"),
+    max_lat: float = Query(..., ge=-90, le=90, description="Latitud norte"),
+    zoom: int = Query(..., ge=0, le=22, description="Nivel de zoom del mapa"),
+    db: Session | AsyncSession = Depends(get_read_db)
+) -> Response:
+    if min_lng >= max_lng or min_lat >= max_lat:
+        raise HTTPException(status_code=422, detail="Rectángulo inválido: min debe ser menor que max")
+    
+    bbox = BBox(min_lng, min_lat, max_lng, max_lat)
+    content = await run_read(
+        db, wifi_service.get_viewport_json, wifi_service_async.get_viewport_json, bbox, zoom
+    )
+    return Response(content=content, media_type="application/json")
 
 
 @router.get(
@@ -58,7 +199,8 @@ def get_nearby_wifi_points(
     response_model=PaginatedResponse[WifiPointResponse],
     summary="Listar puntos WiFi por alcaldía"
 )
-def get_wifi_points_by_alcaldia(
+async def get_wifi_points_by_alcaldia(
+    request: Request,
     alcaldia: str,
     page: int = Query(1, ge=1, description="Número de página"),
     limit: int = Query(
@@ -67,9 +209,18 @@ def get_wifi_points_by_alcaldia(
         le=settings.max_page_size,
         description="Elementos por página"
     ),
-    db: Session = Depends(get_db)
-) -> PaginatedResponse[WifiPointResponse]:
-    return wifi_service.get_by_alcaldia(db, alcaldia, page, limit)
+    include_total: bool = Query(True, description="Calcular total y páginas"),
+    after: str | None = Query(None, description="Cursor de la página siguiente (pagination.next_cursor)"),
+    db: Session | AsyncSession = Depends(get_read_db)
+) -> Response:
+    try:
+        cached = await run_read(
+            db, wifi_service.get_by_alcaldia_cached, wifi_service_async.get_by_alcaldia_cached,
+            alcaldia, page, limit, include_total, after
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return cached_json_response(request, cached)
 
 
 @router.get(
@@ -77,28 +228,16 @@ def get_wifi_points_by_alcaldia(
     response_model=WifiPointResponse,
     summary="Obtener punto WiFi por ID"
 )
-def get_wifi_point(
+async def get_wifi_point(
+    request: Request,
     wifi_id: str,
-    db: Session = Depends(get_db)
-) -> WifiPointResponse:
-    point = wifi_service.get_by_id(db, wifi_id)
+    db: Session | AsyncSession = Depends(get_read_db)
+) -> Response:
+    cached = await run_read(
+        db, wifi_service.get_by_id_cached, wifi_service_async.get_by_id_cached, wifi_id
+    )
     
-    if not point:
+    if not cached:
         raise HTTPException(status_code=404, detail="Punto WiFi no encontrado")
     
-    return point
-
-
-@router.post(
-    "/import",
-    response_model=ImportResponse,
-    summary="Importar desde CSV/Excel"
-)
-async def import_wifi_points(
-    file: UploadFile = File(...),
-    on_error: str = Form(default="report"),
-    on_duplicate: str = Form(default="ignore"),
-    db: Session = Depends(get_db)
-) -> ImportResponse:
-    content = await file.read()
-    return import_service.import_file(db, content, file.filename, on_error, on_duplicate)
\ No newline at end of file
+    return cached_json_response(request, cached)
@@ -1,23 +1,224 @@
 """
 Configuración de conexión a la base de datos.
+
+Las escrituras (importación) usan siempre el primario. Las lecturas de
+la API pasan por un ReadRouter que las reparte entre las réplicas de
+DATABASE_REPLICA_URLS y cae al primario si no hay ninguna disponible.
+
+Los motores no se crean al importar el módulo: la aplicación los crea en
+su lifespan con init_pools() (y abre DB_POOL_WARMUP conexiones); los
+scripts y las sesiones creadas antes los crean al primer uso.
 """
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
+from app.utils.db_router import ReadRouter, ReadSession
+from app.utils.pool_metrics import instrumented
+
+logger = logging.getLogger(__name__)
+
+def pool_options() -> dict:
+    """Opciones del pool de conexiones tomadas de la configuración."""
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle,
+    }
+
+
+def async_url(url: str) -> str:
+    """Cambia el driver de una URL de PostgreSQL por asyncpg."""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+def build_engine(url: str) -> Engine:
+    """Motor síncrono con el pool instrumentado."""
+    return create_engine(url, poolclass=instrumented(QueuePool), **pool_options())
+
+
+def build_async_engine(url: str) -> AsyncEngine:
+    """Motor async con el pool instrumentado."""
+    return create_async_engine(
+        url, poolclass=instrumented(AsyncAdaptedQueuePool), **pool_options()
+    )
+
+
+# Motores síncronos (primario y réplicas), creados por get_read_router()
+_read_router: ReadRouter | None = None
+
+
+def get_read_router() -> ReadRouter:
+    global _read_router
+    if _read_router is None:
+        _read_router = ReadRouter(
+            build_engine(settings.database_url),
+            [build_engine(url) for url in settings.database_replica_urls],
+            settings.db_replica_strategy,
+            settings.db_replica_retry_after
+        )
+    return _read_router
+
+
+def get_engine() -> Engine:
+    """Motor del primario."""
+    return get_read_router().primary
+
+
+class PrimarySession(Session):
+    """Sesión sobre el primario; el motor se crea cuando la sesión lo necesita."""
+    
+    def get_bind(self, *args, **kwargs) -> Engine:
+        return get_engine()
 
-# Motor de base de datos
-engine = create_engine(settings.database_url)
 
 # Sesión para queries
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SessionLocal = sessionmaker(class_=PrimarySession, autocommit=False, autoflush=False)
 
 # Base para los modelos
 Base = declarative_base()
 
+# El motor async se crea al primer uso: asyncpg solo hace falta con DB_ASYNC
+_async_engine: AsyncEngine | None = None
+_async_session: async_sessionmaker[AsyncSession] | None = None
+_async_replicas: list[AsyncEngine] = []
+_async_read_router: ReadRouter | None = None
+
+
+def get_async_engine() -> AsyncEngine:
+    global _async_engine, _async_session, _async_replicas, _async_read_router
+    if _async_engine is None:
+        _async_engine = build_async_engine(
+            settings.async_database_url or async_url(settings.database_url)
+        )
+        _async_session = async_sessionmaker(
+            _async_engine, autoflush=False, expire_on_commit=False
+        )
+        _async_replicas = [
+            build_async_engine(async_url(url)) for url in settings.database_replica_urls
+        ]
+        # El router trabaja con los motores síncronos que envuelve cada AsyncEngine
+        _async_read_router = ReadRouter(
+            _async_engine.sync_engine,
+            [replica.sync_engine for replica in _async_replicas],
+            settings.db_replica_strategy,
+            settings.db_replica_retry_after
+        )
+    return _async_engine
+
+
+def new_async_session() -> AsyncSession:
+    get_async_engine()
+    return _async_session()
+
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_read_db() -> AsyncIterator[Session | AsyncSession]:
+    """
+    Sesión para las rutas de lectura, desde una réplica si hay.
+    
+    AsyncSession con DB_ASYNC, si no la sesión síncrona de siempre.
+    """
+    if settings.db_async:
+        get_async_engine()
+        async with AsyncSession(
+            sync_session_class=ReadSession, router=_async_read_router, autoflush=False
+        ) as db:
+            yield db
+    else:
+        db = ReadSession(get_read_router(), autoflush=False)
+        try:
+            yield db
+        finally:
+            # close devuelve la conexión con un ROLLBACK: fuera del event loop
+            await run_in_threadpool(db.close)
+
+
+def pool_stats() -> dict:
+    """Métricas de los pools de este proceso (los que ya se crearon)."""
+    stats = {}
+    if _read_router is not None:
+        stats["sync"] = _read_router.stats()
+    if _async_read_router is not None:
+        stats["async"] = _async_read_router.stats()
+    return stats
+
+
+def warm_up(engine: Engine, connections: int) -> None:
+    """Abre `connections` conexiones a la vez y las devuelve al pool."""
+    opened = []
+    try:
+        for _ in range(connections):
+            opened.append(engine.connect())
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+async def warm_up_async(engine: AsyncEngine, connections: int) -> None:
+    opened = await asyncio.gather(
+        *(engine.connect().start() for _ in range(connections)), return_exceptions=True
+    )
+    for connection in opened:
+        if not isinstance(connection, BaseException):
+            await connection.close()
+    errors = [error for error in opened if isinstance(error, BaseException)]
+    if errors:
+        raise errors[0]
+
+
+async def init_pools(connections: int = 0) -> None:
+    """
+    Crea los motores de las lecturas y abre `connections` en cada pool.
+    
+    Con DB_ASYNC se calientan los pools async (los que usan las lecturas);
+    el primario síncrono se crea igual porque lo usan la importación y los
+    índices. Si una BD no responde se registra y se sigue: las conexiones
+    se abrirán con la primera petición.
+    """
+    router = get_read_router()
+    if settings.db_async:
+        get_async_engine()
+    if connections <= 0:
+        return
+    
+    connections = min(connections, settings.db_pool_size)
+    if settings.db_async:
+        engines = [_async_engine, *_async_replicas]
+        warmups = [warm_up_async(engine, connections) for engine in engines]
+    else:
+        engines = [router.primary, *router.replicas]
+        warmups = [run_in_threadpool(warm_up, engine, connections) for engine in engines]
+    
+    for engine, result in zip(engines, await asyncio.gather(*warmups, return_exceptions=True)):
+        if isinstance(result, BaseException):
+            logger.warning("No se pudo calentar el pool de %s: %s", engine.url, result)
+
+
+async def dispose_engines() -> None:
+    """Cierra las conexiones de los pools (al apagar la aplicación)."""
+    if _read_router is not None:
+        for sync_engine in (_read_router.primary, *_read_router.replicas):
+            sync_engine.dispose()
+    for async_engine in (_async_engine, *_async_replicas):
+        if async_engine is not None:
+            await async_engine.dispose()
@@ -1,14 +1,53 @@
 """
 Punto de entrada de la aplicación FastAPI.
 """
-from fastapi import FastAPI
+import logging
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
 from app.config import settings
 from app.api.wifi import router as wifi_router
+from app.api.alcaldias import router as alcaldias_router
+from app.api.tiles import router as tiles_router
+from app.api.imports import router as imports_router
+from app.database import dispose_engines, init_pools, pool_stats
+from app.services import (
+    dataset_sync, metrics_service, nearby_index, nearest_index, response_cache, tile_service,
+)
+from app.utils import metrics
+from app.utils.instrumentation import TimingMiddleware, install_sql_hooks
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await init_pools(settings.db_pool_warmup)
+    if dataset_sync.enabled():
+        # Antes de los índices: la versión leída es la que reflejan
+        await run_in_threadpool(dataset_sync.start)
+    if nearby_index.enabled():
+        # Si la BD no responde se sigue con PostGIS hasta la próxima importación
+        try:
+            await run_in_threadpool(nearby_index.rebuild)
+        except Exception:
+            logger.exception("No se pudo construir el índice de proximidad al arrancar")
+    if nearest_index.enabled():
+        # Reusa el índice recién construido si NEARBY_BACKEND=memory
+        try:
+            await run_in_threadpool(nearest_index.rebuild)
+        except Exception:
+            logger.exception("No se pudo construir la rejilla de vecinos al arrancar")
+    yield
+    dataset_sync.stop()
+    await dispose_engines()
 
 
 app = FastAPI(
+    lifespan=lifespan,
     title=settings.api_title,
     version=settings.api_version,
     description=settings.api_description,
@@ -24,7 +63,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(wifi_router, prefix="/api/v1")
+if settings.metrics_enabled:
+    # Último en agregarse = el más externo: mide también CORS
+    install_sql_hooks(settings.slow_query_ms)
+    app.add_middleware(TimingMiddleware, server_timing=settings.server_timing_enabled)
+
+if settings.app_role != "ingest":
+    app.include_router(wifi_router, prefix="/api/v1")
+    app.include_router(alcaldias_router, prefix="/api/v1")
+    app.include_router(tiles_router, prefix="/api/v1")
+if settings.app_role != "api":
+    app.include_router(imports_router, prefix="/api/v1")
 
 
 @app.get("/", tags=["Health"])
@@ -35,3 +84,33 @@ def root():
         "version": settings.api_version,
         "docs": "/docs"
     }
+
+
+@app.get("/stats/cache", tags=["Health"])
+def cache_stats():
+    """Métricas de la caché de respuestas."""
+    return response_cache.stats()
+
+
+@app.get("/stats/tiles", tags=["Health"])
+def tile_cache_stats():
+    """Métricas de la caché de tiles en memoria."""
+    return tile_service.stats()
+
+
+@app.get("/stats/nearest", tags=["Health"])
+def nearest_grid_stats():
+    """Celdas, candidatos, memoria y tiempo de construcción de la rejilla de /nearest."""
+    return nearest_index.stats()
+
+
+@app.get("/stats/pool", tags=["Health"])
+def pool_metrics():
+    """Métricas de los pools de conexiones (primario y réplicas)."""
+    return pool_stats()
+
+
+@app.get("/metrics", tags=["Health"], include_in_schema=False)
+def prometheus_metrics():
+    """Métricas del proceso en formato de texto de Prometheus."""
+    return Response(metrics_service.render(), media_type=metrics.CONTENT_TYPE)
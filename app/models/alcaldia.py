@@ -0,0 +1,22 @@
+from sqlalchemy import Column, String, Integer, DateTime, func
+
+from app.database import Base
+
+
+class Alcaldia(Base):
+    """
+    Agregado de alcaldías con su número de puntos.
+    
+    Se recalcula completo en cada importación; las lecturas no tocan
+    wifi_points.
+    """
+    
+    __tablename__ = "alcaldias"
+    
+    key = Column(String(100), primary_key=True)
+    nombre = Column(String(100), nullable=False)
+    total = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self) -> str:
+        return f"<Alcaldia(key={self.key}, total={self.total})>"
@@ -0,0 +1,21 @@
+from sqlalchemy import Column, BigInteger, Integer, DateTime, func
+
+from app.database import Base
+
+
+class DatasetVersion(Base):
+    """
+    Versión del dataset visible para todos los procesos.
+    
+    Una sola fila (id = 1); cada importación que cambia puntos incrementa
+    version en su misma transacción.
+    """
+    
+    __tablename__ = "dataset_version"
+    
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self) -> str:
+        return f"<DatasetVersion(version={self.version})>"
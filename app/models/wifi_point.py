@@ -1,7 +1,28 @@
-from sqlalchemy import Column, String, Numeric, DateTime, func
-from geoalchemy2 import Geometry
+from sqlalchemy import Column, Computed, String, Numeric, Double, DateTime, Index, cast, func
+from sqlalchemy.orm import validates
+from geoalchemy2 import Geometry, Geography
 
+from app.config import settings
 from app.database import Base
+from app.utils.text import normalize_key
+
+# Geometría a partir de las coordenadas (la misma que arma la importación)
+LOCATION_EXPRESSION = "ST_SetSRID(ST_MakePoint(longitud, latitud), 4326)"
+
+
+def coordinate_column() -> Column:
+    """numeric(10, 6) o, con COORDINATE_STORAGE=float, double precision."""
+    if settings.coordinate_storage == "float":
+        return Column(Double, nullable=False)
+    return Column(Numeric(10, 6), nullable=False)
+
+
+def location_column() -> Column:
+    """Geometría del punto; con COORDINATE_STORAGE=float es una columna generada."""
+    geometry = Geometry("POINT", srid=4326, spatial_index=False)
+    if settings.coordinate_storage == "float":
+        return Column(geometry, Computed(LOCATION_EXPRESSION, persisted=True))
+    return Column(geometry)
 
 
 class WifiPoint(Base):
@@ -11,12 +32,32 @@ class WifiPoint(Base):
     
     id = Column(String(100), primary_key=True)
     programa = Column(String(255), nullable=False)
-    latitud = Column(Numeric(10, 6), nullable=False)
-    longitud = Column(Numeric(10, 6), nullable=False)
+    latitud = coordinate_column()
+    longitud = coordinate_column()
     alcaldia = Column(String(100), nullable=False)
-    location = Column(Geometry("POINT", srid=4326))
+    # Alcaldía normalizada (sin acentos ni mayúsculas) para filtrar por índice
+    alcaldia_key = Column(String(100), nullable=False)
+    location = location_column()
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
+    __table_args__ = (
+        # Filtro por alcaldía ordenado por id (incluye el keyset id > after)
+        Index("idx_wifi_points_alcaldia_key", alcaldia_key, id),
+        # Filtros por envolvente (&&) sobre la geometría
+        Index("idx_wifi_points_location", location, postgresql_using="gist"),
+        # KNN (<->) y ST_DWithin en metros sobre la esfera
+        Index(
+            "idx_wifi_points_location_geog",
+            cast(location, Geography("POINT", srid=4326)),
+            postgresql_using="gist",
+        ),
+    )
+    
+    @validates("alcaldia")
+    def set_alcaldia_key(self, key: str, alcaldia: str) -> str:
+        self.alcaldia_key = normalize_key(alcaldia)
+        return alcaldia
+    
     def __repr__(self) -> str:
-        return f"<WifiPoint(id={self.id}, alcaldia={self.alcaldia})>"
\ No newline at end of file
+        return f"<WifiPoint(id={self.id}, alcaldia={self.alcaldia})>"
@@ -1,15 +1,152 @@
-from sqlalchemy import func
+import csv
+import io
+import uuid
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from typing import NamedTuple
+
+from sqlalchemy import (
+    Boolean, Float, Integer, Numeric, Row, Select, String, Subquery, and_, any_, bindparam, case,
+    cast, column, delete, exists, func, literal_column, or_, select, table, text, true,
+    tuple_, values,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert as pg_insert
 from sqlalchemy.orm import Session
-from geoalchemy2.functions import ST_SetSRID, ST_MakePoint, ST_DistanceSphere
+from sqlalchemy.sql.expression import TableClause
+from geoalchemy2 import Geography
+from geoalchemy2.functions import (
+    ST_AsMVT, ST_AsMVTGeom, ST_DistanceSphere, ST_DWithin, ST_MakeEnvelope, ST_MakePoint,
+    ST_SetSRID, ST_TileEnvelope, ST_Transform, ST_X, ST_Y,
+)
 
+from app.models.alcaldia import Alcaldia
+from app.models.dataset_version import DatasetVersion
 from app.models.wifi_point import WifiPoint
+from app.utils.text import normalize_key
+
+# Debe coincidir con la expresión del índice idx_wifi_points_location_geog
+GEOGRAPHY = Geography("POINT", srid=4326)
+
+# Columnas que llegan de la importación; location se calcula en la BD
+RECORD_COLUMNS = ("id", "programa", "latitud", "longitud", "alcaldia")
+
+STAGING_TABLE = "wifi_points_staging"
+# Staging lleva además la clave normalizada de la alcaldía
+STAGING_COLUMNS = (*RECORD_COLUMNS, "alcaldia_key")
+staging = table(STAGING_TABLE, *(column(name) for name in STAGING_COLUMNS))
+
+# Staging compartido de la importación en paralelo: una tabla UNLOGGED por
+# importación, con el bloque (shard) y la fila dentro del bloque
+SHARD_COLUMNS = ("shard", "row_index", *STAGING_COLUMNS)
+SHARD_TABLE_PREFIX = "wifi_points_import_"
+
+# IDs presentes en el archivo que se importa (para borrar los que faltan)
+SOURCE_IDS_TABLE = "wifi_points_source_ids"
+source_ids = table(SOURCE_IDS_TABLE, column("id"))
+
+# Columnas que se comparan en modo diff; alcaldia_key y location se derivan de ellas
+CONTENT_COLUMNS = ("programa", "latitud", "longitud", "alcaldia")
+
+
+# Con COORDINATE_STORAGE=float la BD genera location: no se escribe
+LOCATION_GENERATED = WifiPoint.__table__.c.location.computed is not None
+
+
+def coordinate_text(coordinate):
+    """
+    Coordenada double precision como texto con 6 decimales.
+    
+    Es el mismo texto que da numeric(10, 6) (los valores se guardaron
+    redondeados a 6 decimales), así que las respuestas no cambian y el
+    driver entrega un str en lugar de construir un Decimal o un float.
+    """
+    return cast(cast(coordinate, Numeric(10, 6)), String).label(coordinate.key)
+
+
+# Columnas que necesitan las respuestas de lectura; se piden como tuplas
+# (Row) para no construir entidades del ORM
+RESPONSE_COLUMNS = (
+    WifiPoint.id,
+    WifiPoint.programa,
+    coordinate_text(WifiPoint.latitud) if LOCATION_GENERATED else WifiPoint.latitud,
+    coordinate_text(WifiPoint.longitud) if LOCATION_GENERATED else WifiPoint.longitud,
+    WifiPoint.alcaldia,
+    WifiPoint.created_at,
+    WifiPoint.updated_at,
+)
+
+
+class BBox(NamedTuple):
+    """Rectángulo en grados (lng/lat, SRID 4326)."""
+    min_lng: float
+    min_lat: float
+    max_lng: float
+    max_lat: float
+
+
+class BulkWriteResult(NamedTuple):
+    """Conteos de una escritura masiva."""
+    inserted: int
+    updated: int
+    skipped: int
+    unchanged: int = 0
 
 
 def get_by_id(db: Session, wifi_id: str) -> WifiPoint | None:
     return db.query(WifiPoint).filter(WifiPoint.id == wifi_id).first() 
 
 
-def get_all(db: Session, page: int, limit: int) -> tuple[list[WifiPoint], int]:
+# Las lecturas se arman como sentencias aparte de su ejecución para que el
+# repositorio async (wifi_repository_async) use exactamente las mismas.
+
+def row_by_id_statement(wifi_id: str) -> Select:
+    return select(*RESPONSE_COLUMNS).where(WifiPoint.id == wifi_id)
+
+
+def rows_by_ids_statement(wifi_ids: list[str]) -> Select:
+    return select(*RESPONSE_COLUMNS).where(
+        WifiPoint.id == any_(bindparam("wifi_ids", wifi_ids, type_=ARRAY(String)))
+    )
+
+
+def get_row_by_id(db: Session, wifi_id: str) -> Row | None:
+    """Obtiene las columnas de respuesta de un punto WiFi."""
+    return db.execute(row_by_id_statement(wifi_id)).first()
+
+
+def get_rows_by_ids(db: Session, wifi_ids: list[str]) -> dict[str, Row]:
+    """Obtiene las columnas de respuesta de varios puntos WiFi, indexadas por ID."""
+    if not wifi_ids:
+        return {}
+    
+    rows = db.execute(rows_by_ids_statement(wifi_ids))
+    return {row.id: row for row in rows}
+
+
+def paginate_by_id(stmt: Select, page: int, limit: int, after: str | None) -> Select:
+    """
+    Aplica la paginación ordenada por id.
+    
+    Con after se busca por keyset (id > after) y se ignora page; sin él se
+    usa OFFSET. En ambos casos se pide una fila extra para saber si hay más.
+    """
+    if after is not None:
+        stmt = stmt.where(WifiPoint.id > after)
+    else:
+        stmt = stmt.offset((page - 1) * limit)
+    
+    return stmt.order_by(WifiPoint.id).limit(limit + 1)
+
+
+def all_statement(page: int, limit: int, after: str | None = None) -> Select:
+    return paginate_by_id(select(*RESPONSE_COLUMNS), page, limit, after)
+
+
+def alcaldia_statement(alcaldia: str, page: int, limit: int, after: str | None = None) -> Select:
+    stmt = select(*RESPONSE_COLUMNS).where(WifiPoint.alcaldia_key == normalize_key(alcaldia))
+    return paginate_by_id(stmt, page, limit, after)
+
+
+def get_all(db: Session, page: int, limit: int, after: str | None = None) -> list[Row]:
     """
     Obtiene lista paginada de puntos WiFi.
     
@@ -17,62 +154,251 @@ def get_all(db: Session, page: int, limit: int) -> tuple[list[WifiPoint], int]:
         db: Sesión de base de datos
         page: Número de página (1-indexed)
         limit: Elementos por página
-        
+        after: ID del último elemento ya entregado (paginación por keyset)
+    
     Returns:
-        Tupla con (lista de puntos, total de registros)
+        Hasta limit + 1 filas (columnas de respuesta) ordenadas por id;
+        la fila extra indica que hay más resultados.
     """
-    offset = (page - 1) * limit
-    
-    total = db.query(func.count(WifiPoint.id)).scalar()
-    points = (
-        db.query(WifiPoint)
-        .order_by(WifiPoint.id)
-        .offset(offset)
-        .limit(limit)
-        .all()
-    )
-    
-    return points, total
+    return db.execute(all_statement(page, limit, after)).all()
 
 
-def get_by_alcaldia(db: Session, alcaldia: str, page: int, limit: int) -> tuple[list[WifiPoint], int]:
+def get_by_alcaldia(
+    db: Session,
+    alcaldia: str,
+    page: int,
+    limit: int,
+    after: str | None = None
+) -> list[Row]:
     """
     Obtiene puntos WiFi filtrados por alcaldía.
     
     Args:
         db: Sesión de base de datos
-        alcaldia: Nombre de la alcaldía
+        alcaldia: Nombre de la alcaldía (sin distinguir acentos ni mayúsculas)
         page: Número de página
         limit: Elementos por página
-        
+        after: ID del último elemento ya entregado (paginación por keyset)
+    
     Returns:
-        Tupla con (lista de puntos, total de registros en esa alcaldía)
+        Hasta limit + 1 filas (columnas de respuesta) ordenadas por id;
+        la fila extra indica que hay más resultados.
     """
-    offset = (page - 1) * limit
+    return db.execute(alcaldia_statement(alcaldia, page, limit, after)).all()
+
+
+def iter_all(db: Session, batch_size: int) -> Iterator[list[Row]]:
+    """
+    Recorre todos los puntos ordenados por id en lotes de batch_size.
     
-    base_query = db.query(WifiPoint).filter(
-        func.lower(WifiPoint.alcaldia) == func.lower(alcaldia)
+    Usa un cursor del lado del servidor (yield_per), así que la memoria no
+    depende del tamaño de la tabla.
+    """
+    result = db.execute(
+        select(*RESPONSE_COLUMNS)
+        .order_by(WifiPoint.id)
+        .execution_options(yield_per=batch_size)
     )
+    for partition in result.partitions():
+        yield partition
+
+
+COUNT_ALL = select(func.count(WifiPoint.id))
+COUNT_BY_ALCALDIA = select(Alcaldia.key, Alcaldia.total)
+ALCALDIAS = select(Alcaldia.key, Alcaldia.nombre, Alcaldia.total).order_by(Alcaldia.nombre)
+ESTIMATE_COUNT = text(
+    "SELECT reltuples FROM pg_class WHERE oid = CAST(:table AS regclass)"
+).bindparams(table=WifiPoint.__tablename__)
+
+
+def count_all(db: Session) -> int:
+    """Cuenta exacta de puntos WiFi."""
+    return db.execute(COUNT_ALL).scalar()
+
+
+def count_by_alcaldia(db: Session) -> dict[str, int]:
+    """Cuenta de puntos por clave de alcaldía, leída del agregado."""
+    return {key: total for key, total in db.execute(COUNT_BY_ALCALDIA)}
+
+
+def get_alcaldias(db: Session) -> list[Row]:
+    """Alcaldías del agregado con su número de puntos, ordenadas por nombre."""
+    return db.execute(ALCALDIAS).all()
+
+
+LOCK_ALCALDIAS = text(f"LOCK TABLE {Alcaldia.__tablename__} IN EXCLUSIVE MODE")
+
+
+def refresh_alcaldias(db: Session) -> None:
+    """
+    Recalcula el agregado de alcaldías sin confirmar la transacción.
     
-    total = base_query.count()
-    points = (
-        base_query
-        .order_by(WifiPoint.id)
-        .offset(offset)
-        .limit(limit)
-        .all()
+    Como nombre se usa la escritura más frecuente de cada clave. Dos
+    importaciones pueden terminar a la vez: el lock (hasta el fin de la
+    transacción) hace que la segunda espere a la primera en lugar de chocar
+    con sus claves; las lecturas de alcaldias no se bloquean.
+    """
+    db.execute(LOCK_ALCALDIAS)
+    db.execute(delete(Alcaldia))
+    db.execute(
+        pg_insert(Alcaldia).from_select(
+            ["key", "nombre", "total"],
+            select(
+                WifiPoint.alcaldia_key,
+                func.mode().within_group(WifiPoint.alcaldia),
+                func.count()
+            ).group_by(WifiPoint.alcaldia_key)
+        )
     )
+
+
+def bump_dataset_version_statement():
+    """Incrementa la versión del dataset (crea la fila la primera vez) y la retorna."""
+    stmt = pg_insert(DatasetVersion).values(id=1, version=1)
+    return stmt.on_conflict_do_update(
+        index_elements=[DatasetVersion.id],
+        set_={"version": DatasetVersion.version + 1, "updated_at": func.now()}
+    ).returning(DatasetVersion.version)
+
+
+def bump_dataset_version(db: Session) -> int:
+    """Incrementa la versión del dataset sin confirmar la transacción."""
+    return db.execute(bump_dataset_version_statement()).scalar_one()
+
+
+def get_dataset_version(db: Session) -> int:
+    """Versión del dataset; 0 si nunca hubo una importación."""
+    version = db.execute(select(DatasetVersion.version).where(DatasetVersion.id == 1)).scalar()
+    return version or 0
+
+
+def estimate_count(db: Session) -> int:
+    """
+    Cantidad estimada de filas según el planner (pg_class.reltuples).
     
-    return points, total
+    Retorna -1 si la tabla aún no tiene estadísticas.
+    """
+    estimate = db.execute(ESTIMATE_COUNT).scalar()
+    return int(estimate) if estimate is not None else -1
+
+
+def count_within_statement(lat: float, lng: float, radius_m: float) -> Select:
+    reference_geog = cast(ST_SetSRID(ST_MakePoint(lng, lat), 4326), GEOGRAPHY)
+    location_geog = cast(WifiPoint.location, GEOGRAPHY)
+    
+    return select(func.count(WifiPoint.id)).where(
+        ST_DWithin(location_geog, reference_geog, radius_m, False)
+    )
+
+
+def count_within(db: Session, lat: float, lng: float, radius_m: float) -> int:
+    """Cuenta los puntos a radius_m metros o menos de una coordenada."""
+    return db.execute(count_within_statement(lat, lng, radius_m)).scalar()
+
+
+class NearbyQuery(NamedTuple):
+    """Sentencias de una búsqueda por proximidad."""
+    page: Select
+    ties: Callable[[float], Select]
+    offset: int
+
+
+def nearby_query(
+    lat: float,
+    lng: float,
+    limit: int,
+    offset: int = 0,
+    radius_m: float | None = None,
+    after: tuple[float, str] | None = None
+) -> NearbyQuery:
+    """
+    Arma la consulta de proximidad y la de empates en la frontera.
+    
+    El orden usa el operador KNN (<->) sobre la geografía, que recorre el
+    índice GiST en orden de distancia en lugar de ordenar la tabla completa.
+    La distancia KNN de geography es esférica, así que el orden coincide con
+    el de ST_DistanceSphere.
+    """
+    reference_point = ST_SetSRID(ST_MakePoint(lng, lat), 4326)
+    reference_geog = cast(reference_point, GEOGRAPHY)
+    location_geog = cast(WifiPoint.location, GEOGRAPHY)
+    
+    knn = location_geog.op("<->", return_type=Float)(reference_geog)
+    distance = ST_DistanceSphere(WifiPoint.location, reference_point)
+    
+    base = select(
+        *RESPONSE_COLUMNS,
+        distance.label("distancia_metros"),
+        knn.label("distancia_knn")
+    )
+    
+    if radius_m is not None:
+        base = base.where(ST_DWithin(location_geog, reference_geog, radius_m, False))
+    
+    if after is not None:
+        after_distance, after_id = after
+        base = base.where(or_(
+            knn > after_distance,
+            and_(knn == after_distance, WifiPoint.id > after_id)
+        ))
+        offset = 0
+    
+    def ties(boundary: float) -> Select:
+        return base.where(
+            ST_DWithin(location_geog, reference_geog, boundary + 1e-6, False),
+            knn == boundary
+        )
+    
+    if offset:
+        # Con OFFSET las páginas anteriores no se ven: el id desempata en
+        # la BD (orden incremental sobre el recorrido KNN)
+        page = base.order_by(knn, WifiPoint.id).offset(offset)
+    else:
+        page = base.order_by(knn)
+    return NearbyQuery(page.limit(limit + 1), ties, offset)
+
+
+def tie_boundary(results: list[Row], limit: int, offset: int) -> float | None:
+    """
+    Distancia del grupo de empates a completar, o None si no hace falta.
+    
+    El índice solo ordena por distancia. Si la fila extra empata con la
+    última de la página, el grupo de empates puede venir incompleto y el
+    cursor (distancia, id) saltaría elementos. Las páginas con offset ya
+    vienen ordenadas por (distancia, id).
+    """
+    if (
+        offset == 0
+        and len(results) > limit
+        and results[limit].distancia_knn == results[limit - 1].distancia_knn
+    ):
+        return results[limit].distancia_knn
+    return None
+
+
+def finish_nearby(
+    results: list[Row],
+    limit: int,
+    boundary: float | None = None,
+    ties: list[Row] | None = None
+) -> list[Row]:
+    """Reemplaza el grupo de empates completo y ordena por (distancia_knn, id)."""
+    if boundary is not None:
+        results = [row for row in results if row.distancia_knn < boundary] + ties
+    
+    results.sort(key=lambda row: (row.distancia_knn, row.id))
+    return results[:limit + 1]
 
 
 def get_nearby(
     db: Session, 
     lat: float, 
     lng: float, 
-    page: int, 
-    limit: int
-) -> tuple[list[tuple[WifiPoint, float]], int]:
+    limit: int,
+    offset: int = 0,
+    radius_m: float | None = None,
+    after: tuple[float, str] | None = None
+) -> list[Row]:
     """
     Obtiene puntos WiFi ordenados por proximidad a una coordenada.
     
@@ -80,28 +406,209 @@ def get_nearby(
         db: Sesión de base de datos
         lat: Latitud del punto de referencia
         lng: Longitud del punto de referencia
-        page: Número de página
         limit: Elementos por página
-        
+        offset: Elementos a saltar (solo sin cursor)
+        radius_m: Radio máximo de búsqueda en metros
+        after: Cursor (distancia_knn, id) del último elemento ya entregado
+    
     Returns:
-        Tupla con (lista de tuplas (punto, distancia_metros), total)
+        Filas con las columnas de respuesta más distancia_metros y
+        distancia_knn; hasta limit + 1 filas ordenadas por (distancia_knn, id).
+        La fila extra indica que hay más resultados.
     """
-    offset = (page - 1) * limit
+    query = nearby_query(lat, lng, limit, offset, radius_m, after)
+    results = db.execute(query.page).all()
+    
+    boundary = tie_boundary(results, limit, query.offset)
+    if boundary is None:
+        return finish_nearby(results, limit)
+    return finish_nearby(results, limit, boundary, db.execute(query.ties(boundary)).all())
+
+
+def nearby_batch_statement(queries: list[tuple[float, float, int, float | None]]) -> Select:
+    """
+    KNN para muchas coordenadas en una sola consulta.
+    
+    Las coordenadas van en una lista VALUES (idx, lat, lng, k, radius_m) y
+    cada una hace su propio recorrido KNN del índice con un JOIN LATERAL.
+    """
+    q = values(
+        column("idx", Integer),
+        column("lat", Float),
+        column("lng", Float),
+        column("k", Integer),
+        column("radius_m", Float),
+        name="q"
+    ).data([(idx, *query) for idx, query in enumerate(queries)])
+    
+    # Postgres infiere los tipos de VALUES de los literales (un radio
+    # siempre NULL quedaría como text): se fijan con CAST
+    lat, lng = cast(q.c.lat, Float), cast(q.c.lng, Float)
+    radius_m = cast(q.c.radius_m, Float)
     
     reference_point = ST_SetSRID(ST_MakePoint(lng, lat), 4326)
-    distance = ST_DistanceSphere(WifiPoint.location, reference_point).label("distancia_metros")
+    reference_geog = cast(reference_point, GEOGRAPHY)
+    location_geog = cast(WifiPoint.location, GEOGRAPHY)
+    knn = location_geog.op("<->", return_type=Float)(reference_geog)
+    
+    nearest = (
+        select(
+            *RESPONSE_COLUMNS,
+            ST_DistanceSphere(WifiPoint.location, reference_point).label("distancia_metros"),
+            knn.label("distancia_knn")
+        )
+        .where(or_(
+            radius_m.is_(None),
+            ST_DWithin(location_geog, reference_geog, radius_m, False)
+        ))
+        .order_by(knn)
+        .limit(cast(q.c.k, Integer))
+        .lateral("nearest")
+    )
+    
+    return (
+        select(q.c.idx, nearest)
+        .select_from(q)
+        .join(nearest, true())
+        .order_by(q.c.idx, nearest.c.distancia_knn, nearest.c.id)
+    )
+
+
+def get_nearby_batch(
+    db: Session,
+    queries: list[tuple[float, float, int, float | None]]
+) -> list[Row]:
+    """
+    Puntos más cercanos para varias coordenadas (lat, lng, k, radius_m).
+    
+    Returns:
+        Filas con idx (posición de la coordenada), las columnas de respuesta,
+        distancia_metros y distancia_knn, ordenadas por (idx, distancia_knn, id)
+    """
+    return db.execute(nearby_batch_statement(queries)).all()
+
+
+def in_bbox(bbox: BBox):
+    """Filtro && contra la envolvente: lo resuelve el índice GiST de location."""
+    return WifiPoint.location.op("&&")(ST_MakeEnvelope(*bbox, 4326))
+
+
+def viewport_points_statement(bbox: BBox, limit: int) -> Select:
+    return (
+        select(*RESPONSE_COLUMNS)
+        .where(in_bbox(bbox))
+        .order_by(WifiPoint.id)
+        .limit(limit + 1)
+    )
+
+
+def viewport_clusters_statement(bbox: BBox, cell_deg: float) -> Select:
+    """
+    Agrupa los puntos del rectángulo en celdas de cell_deg grados.
+    
+    La rejilla parte de (0, 0), así que una celda es la misma al desplazar
+    el mapa. Cada celda trae su cantidad, su centroide y el id si tiene
+    un solo punto.
+    """
+    lng, lat = ST_X(WifiPoint.location), ST_Y(WifiPoint.location)
+    count = func.count()
     
-    total = db.query(func.count(WifiPoint.id)).scalar()
+    return (
+        select(
+            count.label("count"),
+            func.avg(lat).label("lat"),
+            func.avg(lng).label("lng"),
+            case((count == 1, func.min(WifiPoint.id))).label("id")
+        )
+        .where(in_bbox(bbox))
+        .group_by(func.floor(lng / cell_deg), func.floor(lat / cell_deg))
+    )
+
+
+def get_viewport_points(db: Session, bbox: BBox, limit: int) -> list[Row]:
+    """
+    Puntos dentro del rectángulo ordenados por id.
+    
+    Retorna hasta limit + 1 filas; la fila extra indica que hay más.
+    """
+    return db.execute(viewport_points_statement(bbox, limit)).all()
+
+
+def get_viewport_clusters(db: Session, bbox: BBox, cell_deg: float) -> list[Row]:
+    """Celdas (count, lat, lng, id) con puntos dentro del rectángulo."""
+    return db.execute(viewport_clusters_statement(bbox, cell_deg)).all()
+
+
+TILE_LAYER = "wifi_points"
+
+# Cambia con cada importación que modifica puntos (refresh_alcaldias
+# reescribe la tabla); sirve para distinguir datasets entre procesos
+DATASET_FINGERPRINT = select(func.count(), func.sum(Alcaldia.total), func.max(Alcaldia.updated_at))
+
+DATASET_EXTENT = select(
+    func.min(ST_X(WifiPoint.location)),
+    func.min(ST_Y(WifiPoint.location)),
+    func.max(ST_X(WifiPoint.location)),
+    func.max(ST_Y(WifiPoint.location)),
+)
+
+
+def tile_statement(z: int, x: int, y: int, bbox: BBox, extent: int, buffer: int) -> Select:
+    """
+    Tile MVT de la capa wifi_points con el id de cada punto como atributo.
+    
+    bbox es el tile más su buffer en grados: filtra con el índice de
+    location antes de proyectar a Web Mercator.
+    """
+    features = (
+        select(
+            WifiPoint.id,
+            ST_AsMVTGeom(
+                ST_Transform(WifiPoint.location, 3857), ST_TileEnvelope(z, x, y), extent, buffer, True
+            ).label("geom")
+        )
+        .where(in_bbox(bbox))
+        .order_by(WifiPoint.id)
+        .subquery("features")
+    )
+    return select(ST_AsMVT(features.table_valued(), TILE_LAYER, extent, "geom"))
+
+
+def get_tile(db: Session, z: int, x: int, y: int, bbox: BBox, extent: int, buffer: int) -> bytes:
+    """Tile MVT generado por PostGIS; b"" si no tiene puntos."""
+    tile = db.execute(tile_statement(z, x, y, bbox, extent, buffer)).scalar()
+    return bytes(tile) if tile else b""
+
+
+def get_dataset_fingerprint(db: Session) -> tuple:
+    """Cantidad de alcaldías, total de puntos y fecha del último recálculo."""
+    return tuple(db.execute(DATASET_FINGERPRINT).one())
+
+
+def get_extent(db: Session) -> BBox | None:
+    """Rectángulo que contiene todos los puntos, o None si no hay puntos."""
+    extent = db.execute(DATASET_EXTENT).one()
+    return BBox(*extent) if extent[0] is not None else None
+
+
+def get_coordinates(db: Session) -> tuple[list[str], list[float], list[float]]:
+    """
+    Obtiene id, latitud y longitud de todos los puntos WiFi.
     
-    results = (
-        db.query(WifiPoint, distance)
-        .order_by(distance)
-        .offset(offset)
-        .limit(limit)
-        .all()
+    Returns:
+        Tupla con (ids, latitudes, longitudes) en el mismo orden
+    """
+    rows = db.execute(
+        select(WifiPoint.id, cast(WifiPoint.latitud, Float), cast(WifiPoint.longitud, Float))
+        .execution_options(yield_per=10_000)
     )
     
-    return results, total
+    ids, lats, lngs = [], [], []
+    for wifi_id, lat, lng in rows:
+        ids.append(wifi_id)
+        lats.append(lat)
+        lngs.append(lng)
+    return ids, lats, lngs
 
 
 def create(db: Session, wifi_point: WifiPoint) -> WifiPoint:
@@ -112,27 +619,286 @@ def create(db: Session, wifi_point: WifiPoint) -> WifiPoint:
     return wifi_point
 
 
-def create_multiple(db: Session, wifi_points: list[WifiPoint]) -> int:
-    """Crea múltiples puntos WiFi en una transacción."""
-    db.add_all(wifi_points)
-    db.commit()
-    return len(wifi_points)
+def get_existing_ids(db: Session, wifi_ids: list[str]) -> set[str]:
+    """Retorna cuáles de los IDs dados ya existen, en una sola consulta."""
+    if not wifi_ids:
+        return set()
+    
+    rows = db.query(WifiPoint.id).filter(
+        WifiPoint.id == any_(bindparam("wifi_ids", wifi_ids, type_=ARRAY(String)))
+    )
+    return {wifi_id for (wifi_id,) in rows}
 
 
-def exists(db: Session, wifi_id: str) -> bool:
-    """Verifica si existe un punto WiFi con el ID dado."""
-    return db.query(
-        db.query(WifiPoint).filter(WifiPoint.id == wifi_id).exists()
-    ).scalar()
+def copy_to_staging(db: Session, records: list[dict]) -> int:
+    """
+    Carga registros en la tabla temporal de staging con COPY.
+    
+    La tabla vive hasta el final de la transacción y se vacía en cada
+    llamada, así que solo contiene el lote actual.
+    """
+    db.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} ("
+        "id varchar(100), programa varchar(255), "
+        "latitud numeric(10, 6), longitud numeric(10, 6), "
+        "alcaldia varchar(100), alcaldia_key varchar(100)"
+        ") ON COMMIT DROP"
+    ))
+    db.execute(text(f"TRUNCATE {STAGING_TABLE}"))
+    
+    copy_rows(db, STAGING_TABLE, STAGING_COLUMNS, (
+        [*(record[name] for name in RECORD_COLUMNS), normalize_key(record["alcaldia"])]
+        for record in records
+    ))
+    return len(records)
 
 
-def update(db: Session, wifi_point: WifiPoint) -> WifiPoint:
-    """Actualiza un punto WiFi existente."""
-    db.commit()
-    db.refresh(wifi_point)
-    return wifi_point
+def copy_rows(db: Session, target: str, columns: Sequence[str], rows: Iterable[Sequence]) -> None:
+    """
+    Carga filas con COPY ... FROM STDIN en formato CSV.
+    
+    Las columnas de texto obligatorias (id, programa, alcaldia,
+    alcaldia_key) se cargan con FORCE_NOT_NULL: un texto vacío no es NULL.
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    
+    not_null = [name for name in ("id", "programa", "alcaldia", "alcaldia_key") if name in columns]
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {target} ({', '.join(columns)}) FROM STDIN "
+            f"WITH (FORMAT csv, FORCE_NOT_NULL ({', '.join(not_null)}))",
+            buffer
+        )
+    finally:
+        cursor.close()
 
-def update_multiple(db: Session, wifi_points: list[WifiPoint]) -> int:
-    """Actualiza múltiples puntos WiFi en una transacción."""
-    db.commit()
-    return len(wifi_points)
\ No newline at end of file
+
+def merge_statement(source, on_duplicate: str):
+    """
+    Construye el INSERT ... SELECT desde `source` hacia wifi_points.
+    
+    - update: ON CONFLICT (id) DO UPDATE
+    - diff: ON CONFLICT (id) DO UPDATE solo si cambió alguna columna de
+      CONTENT_COLUMNS; las filas iguales no se escriben
+    - fail: INSERT simple, un duplicado lanza IntegrityError
+    - cualquier otro valor: ON CONFLICT (id) DO NOTHING
+    
+    La geometría se arma en la BD a partir de latitud/longitud: aquí con
+    ST_MakePoint, o la genera la columna con COORDINATE_STORAGE=float. El
+    SELECT resultante retorna (insertados, actualizados).
+    """
+    columns = [source.c[name] for name in STAGING_COLUMNS]
+    if not LOCATION_GENERATED:
+        columns.append(ST_SetSRID(ST_MakePoint(source.c.longitud, source.c.latitud), 4326))
+    stmt = pg_insert(WifiPoint).from_select(
+        [*STAGING_COLUMNS] if LOCATION_GENERATED else [*STAGING_COLUMNS, "location"],
+        select(*columns)
+    )
+    
+    if on_duplicate in ("update", "diff"):
+        changed = None
+        if on_duplicate == "diff":
+            stored = tuple_(*(WifiPoint.__table__.c[name] for name in CONTENT_COLUMNS))
+            incoming = tuple_(*(stmt.excluded[name] for name in CONTENT_COLUMNS))
+            changed = stored.is_distinct_from(incoming)
+        assignments = {
+            "programa": stmt.excluded.programa,
+            "latitud": stmt.excluded.latitud,
+            "longitud": stmt.excluded.longitud,
+            "alcaldia": stmt.excluded.alcaldia,
+            "alcaldia_key": stmt.excluded.alcaldia_key,
+            "updated_at": func.now(),
+        }
+        if not LOCATION_GENERATED:
+            assignments["location"] = stmt.excluded.location
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[WifiPoint.id],
+            set_=assignments,
+            where=changed
+        )
+    elif on_duplicate != "fail":
+        stmt = stmt.on_conflict_do_nothing(index_elements=[WifiPoint.id])
+    
+    # xmax = 0 solo en filas recién insertadas
+    merged = stmt.returning(
+        literal_column("wifi_points.xmax = 0", Boolean).label("inserted")
+    ).cte("merged")
+    
+    return select(
+        func.count().filter(merged.c.inserted),
+        func.count().filter(~merged.c.inserted)
+    )
+
+
+def bulk_write(db: Session, records: list[dict], on_duplicate: str) -> BulkWriteResult:
+    """
+    Escribe un lote de registros sin confirmar la transacción.
+    
+    Carga el lote con COPY a staging y lo fusiona con un solo
+    INSERT ... ON CONFLICT según on_duplicate. Los IDs del lote deben
+    ser únicos. En modo diff las filas que no se escribieron cuentan como
+    sin cambios en lugar de omitidas.
+    """
+    if not records:
+        return BulkWriteResult(0, 0, 0)
+    
+    copy_to_staging(db, records)
+    inserted, updated = db.execute(merge_statement(staging, on_duplicate)).one()
+    
+    untouched = len(records) - inserted - updated
+    if on_duplicate == "diff":
+        return BulkWriteResult(inserted, updated, 0, untouched)
+    return BulkWriteResult(inserted, updated, untouched)
+
+
+def record_source_ids(db: Session, wifi_ids: list[str]) -> None:
+    """
+    Agrega IDs a la tabla temporal de IDs del archivo con COPY.
+    
+    La tabla vive hasta el final de la transacción y acumula todos los
+    bloques; puede tener repetidos.
+    """
+    db.execute(text(
+        f"CREATE TEMP TABLE IF NOT EXISTS {SOURCE_IDS_TABLE} (id varchar(100)) ON COMMIT DROP"
+    ))
+    if not wifi_ids:
+        return
+    
+    copy_rows(db, SOURCE_IDS_TABLE, ("id",), ([wifi_id] for wifi_id in wifi_ids))
+
+
+def delete_missing_statement():
+    """DELETE de los puntos cuyo ID no está en la tabla de IDs del archivo."""
+    return delete(WifiPoint).where(
+        ~exists().where(source_ids.c.id == WifiPoint.id)
+    )
+
+
+def delete_missing(db: Session) -> int:
+    """
+    Borra los puntos cuyo ID no apareció en el archivo, sin confirmar.
+    
+    Requiere haber llamado a record_source_ids en la misma transacción.
+    Retorna la cantidad de puntos borrados.
+    """
+    db.execute(text(f"ANALYZE {SOURCE_IDS_TABLE}"))
+    return db.execute(delete_missing_statement()).rowcount
+
+
+def shard_staging(schema: str, name: str) -> TableClause:
+    return table(name, *(column(c) for c in SHARD_COLUMNS), schema=schema)
+
+
+def staging_name(db: Session, staging: TableClause) -> str:
+    """Nombre calificado y entre comillas si hace falta, para SQL en texto."""
+    return db.get_bind().dialect.identifier_preparer.format_table(staging)
+
+
+def create_shard_staging(db: Session) -> TableClause:
+    """
+    Crea la tabla UNLOGGED de staging de una importación en paralelo.
+    
+    Es una tabla normal (no temporal) para que la vean las conexiones de
+    todos los procesos; queda en el esquema actual de la sesión. Hay que
+    confirmar la transacción antes de usarla desde otra conexión y
+    borrarla con drop_shard_staging al terminar.
+    """
+    schema = db.execute(select(func.current_schema())).scalar_one()
+    staging = shard_staging(schema, SHARD_TABLE_PREFIX + uuid.uuid4().hex[:12])
+    db.execute(text(
+        f"CREATE UNLOGGED TABLE {staging_name(db, staging)} ("
+        "shard integer, row_index integer, "
+        "id varchar(100), programa varchar(255), "
+        "latitud numeric(10, 6), longitud numeric(10, 6), "
+        "alcaldia varchar(100), alcaldia_key varchar(100)"
+        ")"
+    ))
+    return staging
+
+
+def drop_shard_staging(db: Session, staging: TableClause) -> None:
+    db.execute(text(f"DROP TABLE IF EXISTS {staging_name(db, staging)}"))
+
+
+def copy_shard(db: Session, staging: TableClause, shard: int, records: list[dict]) -> None:
+    """Carga las filas válidas de un bloque (con su row_index) con COPY, sin confirmar."""
+    copy_rows(db, staging_name(db, staging), SHARD_COLUMNS, (
+        [
+            shard, record["row_index"],
+            *(record[name] for name in RECORD_COLUMNS), normalize_key(record["alcaldia"]),
+        ]
+        for record in records
+    ))
+
+
+def staged_duplicates_statement(staging: TableClause) -> Select:
+    """
+    Filas de staging que no se insertarían en modo skip o fail.
+    
+    Son las que traen un ID ya guardado (in_db) y las repeticiones de un
+    ID dentro del archivo después de su primera aparición, como
+    (shard, row_index, id, in_db) en el orden del archivo.
+    """
+    in_db = exists().where(WifiPoint.id == staging.c.id)
+    ranked = select(
+        staging.c.shard,
+        staging.c.row_index,
+        staging.c.id,
+        in_db.label("in_db"),
+        func.row_number().over(
+            partition_by=staging.c.id, order_by=(staging.c.shard, staging.c.row_index)
+        ).label("position")
+    ).subquery("ranked")
+    return (
+        select(ranked.c.shard, ranked.c.row_index, ranked.c.id, ranked.c.in_db)
+        .where(or_(ranked.c.in_db, ranked.c.position > 1))
+        .order_by(ranked.c.shard, ranked.c.row_index)
+    )
+
+
+def staged_duplicates(db: Session, staging: TableClause) -> list[Row]:
+    """Ejecuta staged_duplicates_statement."""
+    return db.execute(staged_duplicates_statement(staging)).all()
+
+
+def staged_source(staging: TableClause, on_duplicate: str) -> Subquery:
+    """
+    Una fila por ID de staging: la última aparición en update y diff, la
+    primera en los demás modos, donde además se descartan los IDs ya
+    guardados (staged_duplicates los reporta).
+    """
+    order = (staging.c.shard, staging.c.row_index)
+    rows = select(*(staging.c[name] for name in STAGING_COLUMNS))
+    if on_duplicate in ("update", "diff"):
+        rows = rows.order_by(staging.c.id, *(c.desc() for c in order))
+    else:
+        rows = rows.where(~exists().where(WifiPoint.id == staging.c.id))
+        rows = rows.order_by(staging.c.id, *order)
+    return rows.distinct(staging.c.id).subquery("source")
+
+
+def merge_staged(db: Session, staging: TableClause, on_duplicate: str) -> BulkWriteResult:
+    """
+    Fusiona una tabla de staging de shards con wifi_points, sin confirmar.
+    
+    Escribe las filas de staged_source; los conteos son como los de
+    bulk_write sobre esas filas.
+    """
+    source = staged_source(staging, on_duplicate)
+    
+    total = db.execute(select(func.count()).select_from(source)).scalar_one()
+    inserted, updated = db.execute(merge_statement(source, on_duplicate)).one()
+    
+    untouched = total - inserted - updated
+    if on_duplicate == "diff":
+        return BulkWriteResult(inserted, updated, 0, untouched)
+    return BulkWriteResult(inserted, updated, untouched)
+
+
+def record_staged_source_ids(db: Session, staging: TableClause) -> None:
+    """Agrega los IDs de staging a la tabla de IDs del archivo (ver record_source_ids)."""
+    record_source_ids(db, [])
+    db.execute(source_ids.insert().from_select(["id"], select(staging.c.id)))
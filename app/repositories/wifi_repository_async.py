@@ -0,0 +1,112 @@
+"""
+Lecturas de puntos WiFi sobre AsyncSession.
+
+Ejecuta las mismas sentencias que wifi_repository; solo cambia la forma
+de ejecutarlas.
+"""
+from sqlalchemy import Row
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.repositories import wifi_repository as repo
+
+
+async def get_row_by_id(db: AsyncSession, wifi_id: str) -> Row | None:
+    """Obtiene las columnas de respuesta de un punto WiFi."""
+    return (await db.execute(repo.row_by_id_statement(wifi_id))).first()
+
+
+async def get_rows_by_ids(db: AsyncSession, wifi_ids: list[str]) -> dict[str, Row]:
+    """Obtiene las columnas de respuesta de varios puntos WiFi, indexadas por ID."""
+    if not wifi_ids:
+        return {}
+    
+    rows = await db.execute(repo.rows_by_ids_statement(wifi_ids))
+    return {row.id: row for row in rows}
+
+
+async def get_all(db: AsyncSession, page: int, limit: int, after: str | None = None) -> list[Row]:
+    """Ver wifi_repository.get_all."""
+    return (await db.execute(repo.all_statement(page, limit, after))).all()
+
+
+async def get_by_alcaldia(
+    db: AsyncSession,
+    alcaldia: str,
+    page: int,
+    limit: int,
+    after: str | None = None
+) -> list[Row]:
+    """Ver wifi_repository.get_by_alcaldia."""
+    return (await db.execute(repo.alcaldia_statement(alcaldia, page, limit, after))).all()
+
+
+async def count_all(db: AsyncSession) -> int:
+    return (await db.execute(repo.COUNT_ALL)).scalar()
+
+
+async def count_by_alcaldia(db: AsyncSession) -> dict[str, int]:
+    return {key: total for key, total in await db.execute(repo.COUNT_BY_ALCALDIA)}
+
+
+async def get_alcaldias(db: AsyncSession) -> list[Row]:
+    return (await db.execute(repo.ALCALDIAS)).all()
+
+
+async def estimate_count(db: AsyncSession) -> int:
+    estimate = (await db.execute(repo.ESTIMATE_COUNT)).scalar()
+    return int(estimate) if estimate is not None else -1
+
+
+async def count_within(db: AsyncSession, lat: float, lng: float, radius_m: float) -> int:
+    return (await db.execute(repo.count_within_statement(lat, lng, radius_m))).scalar()
+
+
+async def get_nearby(
+    db: AsyncSession,
+    lat: float,
+    lng: float,
+    limit: int,
+    offset: int = 0,
+    radius_m: float | None = None,
+    after: tuple[float, str] | None = None
+) -> list[Row]:
+    """Ver wifi_repository.get_nearby."""
+    query = repo.nearby_query(lat, lng, limit, offset, radius_m, after)
+    results = (await db.execute(query.page)).all()
+    
+    boundary = repo.tie_boundary(results, limit, query.offset)
+    if boundary is None:
+        return repo.finish_nearby(results, limit)
+    ties = (await db.execute(query.ties(boundary))).all()
+    return repo.finish_nearby(results, limit, boundary, ties)
+
+
+async def get_nearby_batch(
+    db: AsyncSession,
+    queries: list[tuple[float, float, int, float | None]]
+) -> list[Row]:
+    """Ver wifi_repository.get_nearby_batch."""
+    return (await db.execute(repo.nearby_batch_statement(queries))).all()
+
+
+async def get_viewport_points(db: AsyncSession, bbox: repo.BBox, limit: int) -> list[Row]:
+    """Ver wifi_repository.get_viewport_points."""
+    return (await db.execute(repo.viewport_points_statement(bbox, limit))).all()
+
+
+async def get_viewport_clusters(db: AsyncSession, bbox: repo.BBox, cell_deg: float) -> list[Row]:
+    """Ver wifi_repository.get_viewport_clusters."""
+    return (await db.execute(repo.viewport_clusters_statement(bbox, cell_deg))).all()
+
+
+async def get_tile(
+    db: AsyncSession, z: int, x: int, y: int, bbox: repo.BBox, extent: int, buffer: int
+) -> bytes:
+    """Ver wifi_repository.get_tile."""
+    tile = (await db.execute(repo.tile_statement(z, x, y, bbox, extent, buffer))).scalar()
+    return bytes(tile) if tile else b""
+
+
+async def get_dataset_fingerprint(db: AsyncSession) -> tuple:
+    """Ver wifi_repository.get_dataset_fingerprint."""
+    return tuple((await db.execute(repo.DATASET_FINGERPRINT)).one())
@@ -0,0 +1,13 @@
+"""
+Schemas del catálogo de alcaldías.
+"""
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class AlcaldiaResponse(BaseModel):
+    """Alcaldía con su número de puntos WiFi."""
+    key: str = Field(..., description="Clave normalizada (sin acentos ni mayúsculas)")
+    nombre: str = Field(..., description="Nombre de la alcaldía")
+    total: int = Field(..., description="Puntos WiFi en la alcaldía")
+    
+    model_config = ConfigDict(from_attributes=True)
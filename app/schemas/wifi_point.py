@@ -35,12 +35,56 @@ class WifiPointWithDistance(WifiPointResponse):
     distancia_metros: float = Field(..., description="Distancia en metros al punto de referencia")
 
 
+class NearbyBatchQuery(BaseModel):
+    """Una coordenada de la búsqueda por proximidad en lote."""
+    lat: float = Field(..., ge=-90, le=90, description="Latitud")
+    lng: float = Field(..., ge=-180, le=180, description="Longitud")
+    k: int = Field(10, ge=1, le=100, description="Puntos más cercanos a devolver")
+    radius_m: float | None = Field(None, gt=0, description="Radio máximo en metros")
+
+
+class NearbyBatchRequest(BaseModel):
+    """Coordenadas a resolver en una sola consulta."""
+    queries: list[NearbyBatchQuery] = Field(..., min_length=1, description="Coordenadas de consulta")
+
+
+class NearbyBatchResult(BaseModel):
+    """Puntos más cercanos a una coordenada, en el mismo orden de la petición."""
+    lat: float
+    lng: float
+    data: list[WifiPointWithDistance]
+
+
+class NearbyBatchResponse(BaseModel):
+    """Resultados agrupados por coordenada de entrada."""
+    results: list[NearbyBatchResult]
+
+
+class ViewportCluster(BaseModel):
+    """Celda de la rejilla con los puntos que caen en ella."""
+    lat: float = Field(..., description="Latitud del centroide")
+    lng: float = Field(..., description="Longitud del centroide")
+    count: int = Field(..., description="Puntos en la celda")
+    id: str | None = Field(None, description="ID del punto si la celda tiene uno solo")
+
+
+class ViewportResponse(BaseModel):
+    """Contenido de un rectángulo del mapa: puntos o clusters."""
+    zoom: int = Field(..., description="Nivel de zoom pedido")
+    clustered: bool = Field(..., description="true si se devuelven clusters en lugar de puntos")
+    cell_deg: float | None = Field(None, description="Tamaño de celda en grados (solo con clusters)")
+    total: int = Field(..., description="Puntos dentro del rectángulo")
+    points: list[WifiPointResponse] = Field(default_factory=list)
+    clusters: list[ViewportCluster] = Field(default_factory=list)
+
+
 class PaginationMeta(BaseModel):
     """Metadata de paginación."""
     page: int = Field(..., description="Página actual")
     limit: int = Field(..., description="Elementos por página")
-    total: int = Field(..., description="Total de elementos")
-    pages: int = Field(..., description="Total de páginas")
+    total: int | None = Field(..., description="Total de elementos (null con include_total=false)")
+    pages: int | None = Field(..., description="Total de páginas (null con include_total=false)")
+    next_cursor: str | None = Field(None, description="Cursor para pedir la siguiente página")
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
@@ -56,9 +100,36 @@ class ImportError(BaseModel):
     reason: str = Field(..., description="Motivo del error")
 
 
+class ImportChunkProgress(BaseModel):
+    """Avance de la importación por bloque de filas."""
+    chunk: int = Field(..., description="Número de bloque (1-indexed)")
+    rows: int = Field(..., description="Filas leídas en el bloque")
+    imported: int = Field(..., description="Registros importados en el bloque")
+    skipped: int = Field(..., description="Registros omitidos en el bloque")
+    unchanged: int = Field(0, description="Registros iguales a los guardados en el bloque (modo diff)")
+
+
 class ImportResponse(BaseModel):
     """Respuesta de la importación de datos."""
     status: str = Field(..., description="Estado: 'success', 'partial', 'failed'")
     imported: int = Field(..., description="Registros importados exitosamente")
+    inserted: int = Field(0, description="Registros nuevos")
+    updated: int = Field(0, description="Registros existentes actualizados")
+    unchanged: int = Field(0, description="Registros iguales a los guardados, sin escribir (modo diff)")
+    deleted: int = Field(0, description="Registros borrados por no venir en el archivo")
     skipped: int = Field(..., description="Registros omitidos")
-    errors: list[ImportError] = Field(default_factory=list, description="Lista de errores")
\ No newline at end of file
+    errors: list[ImportError] = Field(default_factory=list, description="Lista de errores")
+    chunks: list[ImportChunkProgress] = Field(default_factory=list, description="Avance por bloque")
+
+
+class ImportJob(BaseModel):
+    """Estado de una importación en segundo plano."""
+    job_id: str = Field(..., description="Identificador del trabajo")
+    status: str = Field(..., description="Estado: 'queued', 'running', 'done', 'failed'")
+    filename: str = Field(..., description="Nombre del archivo subido")
+    created_at: datetime = Field(..., description="Fecha de creación")
+    started_at: datetime | None = Field(None, description="Inicio del procesamiento")
+    finished_at: datetime | None = Field(None, description="Fin del procesamiento")
+    rows_processed: int = Field(0, description="Filas procesadas hasta ahora")
+    chunks: list[ImportChunkProgress] = Field(default_factory=list, description="Avance por bloque")
+    result: ImportResponse | None = Field(None, description="Resultado final de la importación")
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+Catálogo de alcaldías a partir del agregado que se recalcula al importar.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.repositories import wifi_repository as repo
+from app.repositories import wifi_repository_async as repo_async
+from app.schemas.alcaldia import AlcaldiaResponse
+from app.services import response_cache
+from app.services.response_cache import CachedResponse
+from app.utils import json_encoder
+
+
+def get_all(db: Session) -> list[AlcaldiaResponse]:
+    """Lista las alcaldías con su número de puntos."""
+    return [AlcaldiaResponse.model_validate(row) for row in repo.get_alcaldias(db)]
+
+
+def get_all_json(db: Session) -> bytes:
+    """get_all serializado directo a JSON."""
+    return json_encoder.dumps([row._asdict() for row in repo.get_alcaldias(db)])
+
+
+def get_all_cached(db: Session) -> CachedResponse:
+    """get_all serializado y guardado en la caché de respuestas."""
+    return response_cache.get_or_build(("alcaldias",), lambda: get_all_json(db))
+
+
+async def get_all_cached_async(db: AsyncSession) -> CachedResponse:
+    """Variante async de get_all_cached; comparten la caché."""
+    async def build() -> bytes:
+        return json_encoder.dumps([row._asdict() for row in await repo_async.get_alcaldias(db)])
+    
+    return await response_cache.get_or_build_async(("alcaldias",), build)
@@ -0,0 +1,75 @@
+"""
+Estado del dataset de puntos WiFi dentro del proceso.
+
+El dataset solo cambia con las importaciones. Cada importación confirmada
+incrementa la generación y avisa a los suscriptores (índices, cachés)
+para que se reconstruyan o descarten lo que tengan guardado.
+
+La generación es local al proceso. Las importaciones además incrementan
+la versión del dataset en la BD (tabla dataset_version); dataset_sync la
+consulta y marca el cambio cuando la importó otro proceso.
+"""
+import logging
+import threading
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+_generation = 0
+# Última versión de la BD que refleja la generación (None = aún no se leyó)
+_db_version: int | None = None
+_listeners: list[Callable[[int], None]] = []
+_lock = threading.Lock()
+
+
+def current_generation() -> int:
+    """Generación actual del dataset."""
+    return _generation
+
+
+def subscribe(listener: Callable[[int], None]) -> None:
+    """Registra una función que recibe la nueva generación tras cada cambio."""
+    with _lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def mark_changed(db_version: int | None = None) -> int:
+    """
+    Incrementa la generación y notifica a los suscriptores.
+    
+    db_version es la versión de la BD que dejó la importación, para que
+    sync_version no vuelva a marcar el mismo cambio.
+    """
+    global _generation, _db_version
+    with _lock:
+        _generation += 1
+        generation = _generation
+        if db_version is not None and (_db_version is None or db_version > _db_version):
+            _db_version = db_version
+        listeners = list(_listeners)
+    
+    for listener in listeners:
+        try:
+            listener(generation)
+        except Exception:
+            logger.exception("Error notificando cambio de dataset a %r", listener)
+    
+    return generation
+
+
+def sync_version(db_version: int) -> bool:
+    """
+    Registra la versión leída de la BD y marca el cambio si es más nueva.
+    
+    La primera lectura solo se registra: lo que haya en memoria se cargó
+    después. Retorna si hubo cambio.
+    """
+    global _db_version
+    with _lock:
+        changed = _db_version is not None and db_version > _db_version
+        if _db_version is None or changed:
+            _db_version = db_version
+    if changed:
+        mark_changed()
+    return changed
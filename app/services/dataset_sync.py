@@ -0,0 +1,67 @@
+"""
+Sincroniza la generación del dataset entre procesos.
+
+Cada importación incrementa la versión de la tabla dataset_version en su
+misma transacción. Los procesos que sirven lecturas la consultan cada
+DATASET_POLL_SECONDS (una fila por clave primaria, en el primario) y, si
+cambió, marcan el cambio en dataset_state como si la importación hubiera
+corrido en el mismo proceso: se vacían las cachés y se reconstruyen los
+índices. Una importación hecha por otro worker o por un script se ve a lo
+más DATASET_POLL_SECONDS después.
+"""
+import logging
+import threading
+
+from app.config import settings
+from app.database import SessionLocal
+from app.repositories import wifi_repository as repo
+from app.services import dataset_state
+
+logger = logging.getLogger(__name__)
+
+_stop = threading.Event()
+_thread: threading.Thread | None = None
+
+
+def enabled() -> bool:
+    return settings.dataset_poll_seconds > 0 and settings.app_role != "ingest"
+
+
+def check() -> bool:
+    """Lee la versión de la BD; retorna si el dataset cambió desde la última lectura."""
+    db = SessionLocal()
+    try:
+        version = repo.get_dataset_version(db)
+    finally:
+        db.close()
+    return dataset_state.sync_version(version)
+
+
+def start() -> None:
+    """
+    Lee la versión actual y arranca la consulta periódica.
+    
+    Hay que llamarla antes de construir los índices, para que la primera
+    lectura no se tome como un cambio.
+    """
+    global _thread
+    try:
+        check()
+    except Exception:
+        logger.warning("No se pudo leer la versión del dataset al arrancar", exc_info=True)
+    _stop.clear()
+    _thread = threading.Thread(target=run, name="dataset-sync", daemon=True)
+    _thread.start()
+
+
+def stop() -> None:
+    _stop.set()
+
+
+def run() -> None:
+    while not _stop.wait(settings.dataset_poll_seconds):
+        try:
+            if check():
+                logger.info("El dataset cambió en otro proceso; se descartan cachés e índices")
+        except Exception:
+            logger.exception("No se pudo leer la versión del dataset")
@@ -0,0 +1,81 @@
+"""
+Exportación completa del catálogo en NDJSON o CSV.
+
+Las filas salen de un cursor del lado del servidor y se escriben por
+lotes, así que la memoria no depende del tamaño de la tabla.
+"""
+import csv
+import io
+from collections.abc import Iterable, Iterator
+
+from sqlalchemy import Row
+
+from app.config import settings
+from app.database import get_read_router
+from app.repositories import wifi_repository as repo
+from app.services.wifi_service import to_dict
+from app.utils import json_encoder
+from app.utils.db_router import ReadSession
+
+
+EXPORT_COLUMNS = ("id", "programa", "latitud", "longitud", "alcaldia", "created_at", "updated_at")
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def ndjson_chunks(batches: Iterable[list[Row]]) -> Iterator[bytes]:
+    """Un objeto JSON por línea; un bloque de bytes por lote."""
+    for batch in batches:
+        yield b"".join(json_encoder.dumps(to_dict(row)) + b"\n" for row in batch)
+
+
+def csv_value(value) -> str:
+    if value is None:
+        return ""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return str(value)
+
+
+def csv_chunks(batches: Iterable[list[Row]]) -> Iterator[bytes]:
+    """CSV con encabezado; un bloque de bytes por lote."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    
+    for batch in batches:
+        writer.writerows(
+            [csv_value(getattr(row, name)) for name in EXPORT_COLUMNS]
+            for row in batch
+        )
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+    
+    # Tabla vacía: al menos el encabezado
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+CHUNK_WRITERS = {
+    "ndjson": ndjson_chunks,
+    "csv": csv_chunks,
+}
+
+
+def stream(fmt: str) -> Iterator[bytes]:
+    """
+    Genera la exportación completa en el formato pedido.
+    
+    Abre su propia sesión de lectura (réplica si hay): la de la petición
+    ya está cerrada cuando la respuesta empieza a enviarse.
+    """
+    db = ReadSession(get_read_router())
+    try:
+        batches = repo.iter_all(db, settings.export_batch_size)
+        yield from CHUNK_WRITERS[fmt](batches)
+    finally:
+        db.close()
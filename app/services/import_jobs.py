@@ -0,0 +1,143 @@
+"""
+Importaciones en segundo plano.
+
+El archivo subido se guarda en disco, se responde de inmediato con un ID
+de trabajo y la importación corre en un pool de hilos con su propia
+sesión de BD, sin bloquear al worker que atiende las lecturas.
+
+Los trabajos se registran en la memoria del proceso: la consulta de un
+trabajo tiene que llegar al worker que lo recibió (un solo worker de
+ingesta o ruteo fijo de /import/*) y un reinicio los pierde.
+"""
+import functools
+import os
+import shutil
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import BinaryIO
+
+from app.config import settings
+from app.database import SessionLocal
+from app.schemas.wifi_point import ImportChunkProgress, ImportJob
+from app.services import import_service, parallel_import
+
+_executor = ThreadPoolExecutor(
+    max_workers=settings.import_max_concurrency,
+    thread_name_prefix="import-job"
+)
+_jobs: OrderedDict[str, ImportJob] = OrderedDict()
+_lock = threading.Lock()
+
+
+def now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def spool_to_disk(stream: BinaryIO, filename: str) -> str:
+    """Copia el archivo subido a un temporal en disco y retorna su ruta."""
+    suffix = os.path.splitext(filename)[1]
+    with tempfile.NamedTemporaryFile(
+        delete=False, suffix=suffix, dir=settings.import_spool_dir
+    ) as spooled:
+        shutil.copyfileobj(stream, spooled)
+        return spooled.name
+
+
+def submit(
+    stream: BinaryIO,
+    filename: str,
+    on_error: str,
+    on_duplicate: str,
+    delete_missing: bool = False,
+    parallel: bool = False
+) -> ImportJob:
+    """
+    Encola una importación y retorna su estado inicial.
+    
+    Con parallel el CSV se importa con parallel_import (varios procesos);
+    los demás formatos se importan igual que sin la opción.
+    """
+    path = spool_to_disk(stream, filename)
+    job = ImportJob(
+        job_id=uuid.uuid4().hex,
+        status="queued",
+        filename=filename,
+        created_at=now()
+    )
+    
+    with _lock:
+        _jobs[job.job_id] = job
+        prune_finished()
+        snapshot = job.model_copy(deep=True)
+    
+    _executor.submit(
+        run_job, job.job_id, path, filename, on_error, on_duplicate, delete_missing, parallel
+    )
+    return snapshot
+
+
+def get(job_id: str) -> ImportJob | None:
+    """Retorna una copia del estado actual del trabajo."""
+    with _lock:
+        job = _jobs.get(job_id)
+        return job.model_copy(deep=True) if job else None
+
+
+def prune_finished() -> None:
+    """Descarta los trabajos terminados más antiguos por encima de la retención."""
+    finished = [job_id for job_id, job in _jobs.items() if job.finished_at]
+    for job_id in finished[:max(len(finished) - settings.import_job_retention, 0)]:
+        del _jobs[job_id]
+
+
+def record_chunk(job_id: str, progress: ImportChunkProgress) -> None:
+    with _lock:
+        job = _jobs[job_id]
+        job.chunks.append(progress)
+        job.rows_processed += progress.rows
+
+
+def run_job(
+    job_id: str,
+    path: str,
+    filename: str,
+    on_error: str,
+    on_duplicate: str,
+    delete_missing: bool = False,
+    parallel: bool = False
+) -> None:
+    """Ejecuta la importación en un hilo del pool."""
+    with _lock:
+        _jobs[job_id].status = "running"
+        _jobs[job_id].started_at = now()
+    
+    on_chunk = functools.partial(record_chunk, job_id)
+    db = SessionLocal()
+    try:
+        if parallel:
+            result = parallel_import.import_parallel(
+                db, path, filename, on_error, on_duplicate,
+                on_chunk=on_chunk, delete_missing=delete_missing
+            )
+        else:
+            with open(path, "rb") as stream:
+                result = import_service.import_stream(
+                    db, stream, filename, on_error, on_duplicate,
+                    on_chunk=on_chunk, delete_missing=delete_missing
+                )
+    except Exception as e:
+        db.rollback()
+        result = import_service.failed_response(f"Error inesperado: {e}")
+    finally:
+        db.close()
+        os.remove(path)
+    
+    with _lock:
+        job = _jobs[job_id]
+        job.result = result
+        job.status = "failed" if result.status == "failed" else "done"
+        job.finished_at = now()
@@ -1,62 +1,76 @@
+from collections.abc import Callable, Iterable
+from typing import BinaryIO
+
 import pandas as pd
 from sqlalchemy.orm import Session
 
-from app.models.wifi_point import WifiPoint
+from app.config import settings
 from app.repositories import wifi_repository as repo
-from app.schemas.wifi_point import ImportResponse, ImportError
-from app.utils.file_reader import read_file, parse_decimal
+from app.services import dataset_state
+from app.schemas.wifi_point import ImportResponse, ImportError, ImportChunkProgress
+from app.utils.file_reader import read_file, iter_chunks, parse_decimal_series
+from app.utils.instrumentation import stage
 
 REQUIRED_COLUMNS = {"id", "programa", "latitud", "longitud", "alcaldia"}
 
-def validate_row(row: pd.Series) -> str | None:
-    """Valida una fila. Retorna None si ok, mensaje si error."""
-    if pd.isna(row.get("id")) or str(row.get("id")).strip() == "":
-        return "ID es requerido"
-    if pd.isna(row.get("programa")):
-        return "Programa es requerido"
-    if pd.isna(row.get("alcaldia")):
-        return "Alcaldía es requerida"
-    
-    lat = parse_decimal(row.get("latitud"))
-    lng = parse_decimal(row.get("longitud"))
-    
-    if lat is None:
-        return "Latitud inválida"
-    if lng is None:
-        return "Longitud inválida"
-    if not -90 <= lat <= 90:
-        return f"Latitud fuera de rango: {lat}"
-    if not -180 <= lng <= 180:
-        return f"Longitud fuera de rango: {lng}"
-    
-    return None
+# Modos en los que un ID existente se actualiza (diff solo si cambió)
+UPSERT_MODES = ("update", "diff")
+
+def strip_series(values: pd.Series) -> pd.Series:
+    """Convierte a texto sin espacios en los extremos; None donde falta el valor."""
+    if isinstance(values.dtype, pd.StringDtype):
+        # Texto de Arrow (lector de pyarrow): se recorta sin pasar por objetos de Python
+        return values.str.strip().astype(object).where(values.notna(), None)
+    return values.astype(str).str.strip().where(values.notna(), None)
 
 
-def row_to_wifi_point(row: pd.Series) -> WifiPoint:
-    """Convierte fila a WifiPoint."""
-    lat = parse_decimal(row["latitud"])
-    lng = parse_decimal(row["longitud"])
+def validate_frame(df: pd.DataFrame) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Valida y normaliza todas las filas de un bloque a la vez.
     
-    return WifiPoint(
-        id=str(row["id"]).strip(),
-        programa=str(row["programa"]).strip(),
-        latitud=lat,
-        longitud=lng,
-        alcaldia=str(row["alcaldia"]).strip(),
-        location=f"SRID=4326;POINT({lng} {lat})"
-    )
+    Aplica las mismas reglas y mensajes que una validación fila por fila:
+    por cada fila se reporta solo el primer problema encontrado.
+    
+    Returns:
+        Tupla con (bloque normalizado, motivos). El bloque trae las columnas
+        de importación con textos recortados y coordenadas como float; los
+        motivos son None en las filas válidas.
+    """
+    df = df.reindex(columns=list(repo.RECORD_COLUMNS))
+    
+    clean = pd.DataFrame({
+        "id": strip_series(df["id"]),
+        "programa": strip_series(df["programa"]),
+        "latitud": parse_decimal_series(df["latitud"]),
+        "longitud": parse_decimal_series(df["longitud"]),
+        "alcaldia": strip_series(df["alcaldia"]),
+    }, index=df.index)
+    
+    lat, lng = clean["latitud"], clean["longitud"]
+    lat_out = ~lat.between(-90, 90)
+    lng_out = ~lng.between(-180, 180)
+    checks = [
+        (clean["id"].isna() | (clean["id"] == ""), "ID es requerido"),
+        (clean["programa"].isna(), "Programa es requerido"),
+        (clean["alcaldia"].isna(), "Alcaldía es requerida"),
+        (lat.isna(), "Latitud inválida"),
+        (lng.isna(), "Longitud inválida"),
+        (lat_out, "Latitud fuera de rango: " + lat[lat_out].astype(str)),
+        (lng_out, "Longitud fuera de rango: " + lng[lng_out].astype(str)),
+    ]
+    
+    # Se aplican de la última a la primera para que gane la regla más prioritaria
+    reasons = pd.Series(None, index=df.index, dtype=object)
+    for failed, reason in reversed(checks):
+        reasons = reasons.mask(failed, reason)
+    
+    return clean, reasons.where(reasons.notna(), None)
 
 
-def update_wifi_point(existing: WifiPoint, row: pd.Series) -> None:
-    """Actualiza un WifiPoint existente."""
-    lat = parse_decimal(row["latitud"])
-    lng = parse_decimal(row["longitud"])
-    
-    existing.programa = str(row["programa"]).strip()
-    existing.latitud = lat
-    existing.longitud = lng
-    existing.alcaldia = str(row["alcaldia"]).strip()
-    existing.location = f"SRID=4326;POINT({lng} {lat})"
+def validate_row(row: pd.Series) -> str | None:
+    """Valida una fila. Retorna None si ok, mensaje si error."""
+    _, reasons = validate_frame(row.to_frame().T)
+    return reasons.iloc[0]
 
 
 def handle_error(
@@ -84,86 +98,242 @@ def handle_error(
     return None
 
 
-def import_file(
+def failed_response(reason: str) -> ImportResponse:
+    """Respuesta para un error que aborta toda la importación."""
+    return ImportResponse(
+        status="failed", imported=0, skipped=0,
+        errors=[ImportError(row=0, id=None, reason=reason)]
+    )
+
+
+def import_chunk(
     db: Session,
-    content: bytes,
-    filename: str,
-    on_error: str = "fail",      # fail | skip 
-    on_duplicate: str = "skip"     # fail | skip | update
+    df: pd.DataFrame,
+    on_error: str,
+    on_duplicate: str,
+    errors: list[ImportError],
+    seen: set[str],
+    delete_missing: bool = False
+) -> repo.BulkWriteResult | ImportResponse:
+    """
+    Valida y escribe un bloque de filas sin confirmar la transacción.
+    
+    Los duplicados contra la BD se resuelven con una consulta por bloque y
+    los duplicados dentro del archivo con `seen`, que acumula los IDs ya
+    aceptados en bloques anteriores. En modo update o diff no hace falta
+    consultar: el ON CONFLICT de la escritura masiva decide entre insertar
+    y actualizar. Con delete_missing se guardan los IDs del bloque, incluso
+    los de filas con error, para no borrar puntos que sí vienen en el archivo.
+    
+    Returns:
+        Conteos (insertados, actualizados, omitidos, sin cambios), o
+        ImportResponse si la estrategia 'fail' detuvo la importación.
+    """
+    # Validar estructura
+    with stage("import_validate"):
+        clean, reasons = validate_frame(df)
+    valid = reasons.isna()
+    ids = clean["id"]
+    
+    if delete_missing:
+        with stage("import_write"):
+            repo.record_source_ids(db, ids[ids.notna() & (ids != "")].unique().tolist())
+    
+    with stage("import_dedupe"):
+        if on_duplicate in UPSERT_MODES:
+            # La última aparición de cada ID es la que queda
+            accepted = clean[valid].drop_duplicates("id", keep="last")
+            replaced = int(valid.sum()) - len(accepted)
+        else:
+            # Resolver duplicados contra el archivo y contra la BD en bloque
+            in_file = valid & ids.isin(seen)
+            existing_ids = repo.get_existing_ids(db, ids[valid & ~in_file].unique().tolist())
+            in_db = valid & ~in_file & ids.isin(existing_ids)
+            candidates = valid & ~in_file & ~in_db
+            in_file |= candidates & ids.where(candidates).duplicated()
+            
+            reasons = reasons.mask(in_file, "ID duplicado en el archivo").mask(in_db, "ID duplicado")
+            accepted = clean[candidates & ~in_file]
+            replaced = 0
+    
+    # Reportar errores en orden de fila; 'fail' se detiene en el primero
+    failed = reasons.notna()
+    for idx, row_id, reason, is_valid in zip(
+        df.index[failed], ids[failed], reasons[failed], valid[failed]
+    ):
+        strategy = on_duplicate if is_valid else on_error
+        response = handle_error(reason, idx + 2, row_id, strategy, errors)
+        if response:
+            return response
+    
+    if on_duplicate not in UPSERT_MODES:
+        seen.update(accepted["id"])
+    
+    with stage("import_write"):
+        result = repo.bulk_write(db, accepted.to_dict("records"), on_duplicate)
+    
+    # Las apariciones reemplazadas por una posterior del mismo ID cuentan como
+    # actualizadas en update y como sin cambios en diff (no se escriben)
+    return repo.BulkWriteResult(
+        inserted=result.inserted,
+        updated=result.updated + (replaced if on_duplicate == "update" else 0),
+        skipped=result.skipped + int(failed.sum()),
+        unchanged=result.unchanged + (replaced if on_duplicate == "diff" else 0)
+    )
+
+
+def import_frames(
+    db: Session,
+    frames: Iterable[pd.DataFrame],
+    on_error: str = "fail",
+    on_duplicate: str = "skip",
+    on_chunk: Callable[[ImportChunkProgress], None] | None = None,
+    delete_missing: bool = False
 ) -> ImportResponse:
-    """Importa puntos WiFi desde CSV/Excel."""
+    """
+    Importa una secuencia de bloques en una sola transacción.
+    
+    Cada bloque se escribe con COPY + INSERT ... ON CONFLICT antes de leer
+    el siguiente, así que la memoria depende del tamaño del bloque.
+    on_chunk, si se da, recibe el avance de cada bloque procesado. Con
+    delete_missing, al final se borran los puntos cuyo ID no vino en el
+    archivo (solo si se aceptó al menos una fila).
+    """
     errors: list[ImportError] = []
-    to_insert: list[WifiPoint] = []
-    to_update: list[WifiPoint] = []
+    chunks: list[ImportChunkProgress] = []
+    seen: set[str] = set()
+    inserted = 0
+    updated = 0
     skipped = 0
+    unchanged = 0
+    frames = iter(frames)
     
-    # Leer archivo
-    try:
-        df = read_file(content, filename)
-    except Exception as e:
-        return ImportResponse(
-            status="failed", imported=0, skipped=0,
-            errors=[ImportError(row=0, id=None, reason=f"Error leyendo archivo: {e}")]
-        )
-    
-    # Validar columnas
-    missing = REQUIRED_COLUMNS - set(df.columns)
-    if missing:
-        return ImportResponse(
-            status="failed", imported=0, skipped=0,
-            errors=[ImportError(row=0, id=None, reason=f"Columnas faltantes: {missing}")]
-        )
-    
-    # Procesar filas
-    for idx, row in df.iterrows():
-        row_num = idx + 2
-        row_id = str(row.get("id", "")).strip() if pd.notna(row.get("id")) else None
+    while True:
+        # Leer bloque
+        try:
+            with stage("import_read"):
+                df = next(frames, None)
+        except Exception as e:
+            db.rollback()
+            return failed_response(f"Error leyendo archivo: {e}")
+        if df is None:
+            break
         
-        # Validar estructura
-        error_msg = validate_row(row)
-        if error_msg:
-            response = handle_error(error_msg, row_num, row_id, on_error, errors)
-            if response:
-                return response
-            skipped += 1
-            continue
+        # Validar columnas
+        missing = REQUIRED_COLUMNS - set(df.columns)
+        if missing:
+            db.rollback()
+            return failed_response(f"Columnas faltantes: {missing}")
         
-        # Verificar duplicado
-        if repo.exists(db, row_id):
-            if on_duplicate == "update":
-                existing = repo.get_by_id(db, row_id)
-                update_wifi_point(existing, row)
-                to_update.append(existing)
-                continue
-            
-            # fail o skip: misma lógica que errores
-            response = handle_error("ID duplicado", row_num, row_id, on_duplicate, errors)
-            if response:
-                return response
-            skipped += 1
-            continue
+        # Procesar filas
+        try:
+            result = import_chunk(db, df, on_error, on_duplicate, errors, seen, delete_missing)
+        except Exception as e:
+            db.rollback()
+            return failed_response(f"Error en BD: {e}")
+        if isinstance(result, ImportResponse):
+            db.rollback()
+            return result
         
-        to_insert.append(row_to_wifi_point(row))
+        inserted += result.inserted
+        updated += result.updated
+        skipped += result.skipped
+        unchanged += result.unchanged
+        progress = ImportChunkProgress(
+            chunk=len(chunks) + 1,
+            rows=len(df),
+            imported=result.inserted + result.updated,
+            skipped=result.skipped,
+            unchanged=result.unchanged
+        )
+        chunks.append(progress)
+        if on_chunk:
+            on_chunk(progress)
+    
+    return finish_import(
+        db, inserted, updated, skipped, unchanged, errors, chunks, delete_missing
+    )
+
+
+def finish_import(
+    db: Session,
+    inserted: int,
+    updated: int,
+    skipped: int,
+    unchanged: int,
+    errors: list[ImportError],
+    chunks: list[ImportChunkProgress],
+    delete_missing: bool = False
+) -> ImportResponse:
+    """
+    Confirma una importación ya escrita y arma la respuesta.
     
-    # Aplicar cambios
+    Con delete_missing borra los puntos que no vinieron en el archivo (solo
+    si se aceptó al menos una fila), recalcula las alcaldías e incrementa
+    la versión del dataset si algo cambió, y avisa del cambio a las cachés.
+    """
+    imported = inserted + updated
+    deleted = 0
+    version = None
     try:
-        if to_insert:
-            repo.create_multiple(db, to_insert)
-        if to_update:
-            repo.update_multiple(db, to_update)
+        with stage("import_commit"):
+            if delete_missing and imported + unchanged:
+                deleted = repo.delete_missing(db)
+            if imported + deleted:
+                repo.refresh_alcaldias(db)
+                version = repo.bump_dataset_version(db)
+            db.commit()
     except Exception as e:
         db.rollback()
-        return ImportResponse(
-            status="failed", imported=0, skipped=0,
-            errors=[ImportError(row=0, id=None, reason=f"Error en BD: {e}")]
-        )
+        return failed_response(f"Error en BD: {e}")
     
-    imported = len(to_insert) + len(to_update)
-    status = "failed" if imported == 0 and skipped > 0 else "partial" if skipped > 0 else "success"
+    if version is not None:
+        dataset_state.mark_changed(version)
+    accepted = imported + unchanged
+    status = "failed" if accepted == 0 and skipped > 0 else "partial" if skipped > 0 else "success"
     
     return ImportResponse(
         status=status,
         imported=imported,
+        inserted=inserted,
+        updated=updated,
+        unchanged=unchanged,
+        deleted=deleted,
         skipped=skipped,
-        errors=errors
-    )
\ No newline at end of file
+        errors=errors,
+        chunks=chunks
+    )
+
+
+def import_file(
+    db: Session,
+    content: bytes,
+    filename: str,
+    on_error: str = "fail",      # fail | skip 
+    on_duplicate: str = "skip",    # fail | skip | update | diff
+    delete_missing: bool = False
+) -> ImportResponse:
+    """Importa puntos WiFi desde CSV (también comprimido), Parquet, Arrow o Excel."""
+    # Leer archivo
+    try:
+        with stage("import_read"):
+            df = read_file(content, filename, repo.RECORD_COLUMNS)
+    except Exception as e:
+        return failed_response(f"Error leyendo archivo: {e}")
+    
+    return import_frames(db, [df], on_error, on_duplicate, delete_missing=delete_missing)
+
+
+def import_stream(
+    db: Session,
+    stream: BinaryIO,
+    filename: str,
+    on_error: str = "fail",
+    on_duplicate: str = "skip",
+    chunk_size: int = settings.import_chunk_size,
+    on_chunk: Callable[[ImportChunkProgress], None] | None = None,
+    delete_missing: bool = False
+) -> ImportResponse:
+    """Importa puntos WiFi leyendo el archivo por bloques de chunk_size filas."""
+    frames = iter_chunks(stream, filename, chunk_size, repo.RECORD_COLUMNS)
+    return import_frames(db, frames, on_error, on_duplicate, on_chunk, delete_missing)
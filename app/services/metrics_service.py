@@ -0,0 +1,71 @@
+"""
+Contenido de /metrics.
+
+Los histogramas y contadores de instrumentation se acumulan durante la
+vida del proceso; el estado de los pools y de las cachés se lee al
+momento de cada scrape: lo que sube y baja como gauges y lo acumulado
+desde el arranque como counters (<nombre>_total).
+"""
+from app.database import pool_stats
+from app.services import response_cache, tile_service
+from app.utils import metrics
+from app.utils.instrumentation import METRICS
+
+# Cifra de pool_metrics.pool_stats -> (métrica, ayuda)
+POOL_GAUGES = {
+    "size": ("db_pool_size", "Tamaño configurado del pool"),
+    "checkedout": ("db_pool_checked_out", "Conexiones en uso"),
+    "overflow": ("db_pool_overflow", "Conexiones abiertas por encima del tamaño del pool"),
+}
+POOL_COUNTERS = {
+    "checkouts": ("db_pool_checkouts", "Conexiones entregadas desde el arranque"),
+    "timeouts": ("db_pool_timeouts", "Esperas de conexión agotadas desde el arranque"),
+    "wait_total_s": ("db_pool_wait_seconds", "Tiempo total esperando una conexión"),
+}
+CACHE_GAUGES = {
+    "entries": ("cache_entries", "Entradas en la caché"),
+}
+CACHE_COUNTERS = {
+    "hits": ("cache_hits", "Aciertos de la caché desde el arranque"),
+    "misses": ("cache_misses", "Fallos de la caché desde el arranque"),
+    "evictions": ("cache_evictions", "Entradas descartadas por tamaño desde el arranque"),
+}
+
+
+def scrape_metrics(
+    gauges: dict[str, tuple[str, str]],
+    counters: dict[str, tuple[str, str]],
+    labelnames: tuple[str, ...]
+) -> dict[str, metrics.Gauge | metrics.Counter]:
+    """Una métrica por cifra de las estadísticas, para llenarla en este scrape."""
+    return {
+        **{stat: metrics.Gauge(name, doc, labelnames) for stat, (name, doc) in gauges.items()},
+        **{stat: metrics.Counter(name, doc, labelnames) for stat, (name, doc) in counters.items()},
+    }
+
+
+def pool_metrics() -> list[metrics.Metric]:
+    series = scrape_metrics(POOL_GAUGES, POOL_COUNTERS, ("stack", "engine"))
+    for stack, router_stats in pool_stats().items():
+        engines = [("primary", router_stats["primary"])]
+        engines.extend(
+            (f"replica{i}", replica) for i, replica in enumerate(router_stats["replicas"])
+        )
+        for engine, stats in engines:
+            for stat, metric in series.items():
+                if stat in stats:
+                    metric.set(stats[stat], stack, engine)
+    return list(series.values())
+
+
+def cache_metrics() -> list[metrics.Metric]:
+    series = scrape_metrics(CACHE_GAUGES, CACHE_COUNTERS, ("cache",))
+    for cache, stats in (("responses", response_cache.stats()), ("tiles", tile_service.stats())):
+        for stat, metric in series.items():
+            metric.set(stats[stat], cache)
+    return list(series.values())
+
+
+def render() -> str:
+    """Texto de Prometheus con las métricas del proceso."""
+    return metrics.render([*METRICS, *pool_metrics(), *cache_metrics()])
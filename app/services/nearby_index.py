@@ -0,0 +1,70 @@
+"""
+Índice en memoria para /nearby/ (NEARBY_BACKEND=memory).
+
+Se construye al arrancar desde wifi_repository y se reconstruye después
+de cada importación confirmada. El índice nuevo se arma aparte y se
+reemplaza de una sola vez, así que las consultas nunca ven uno a medias.
+"""
+import logging
+import threading
+
+from app.config import settings
+from app.database import SessionLocal
+from app.repositories import wifi_repository as repo
+from app.services import dataset_state
+from app.utils.spatial_index import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+_index: SpatialIndex | None = None
+# Generación del dataset con la que se construyó _index
+_index_generation = -1
+_build_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return settings.nearby_backend == "memory" and settings.app_role != "ingest"
+
+
+def current() -> SpatialIndex | None:
+    """Índice vigente, o None si está deshabilitado o aún no se construye."""
+    return _index if enabled() else None
+
+
+def is_fresh() -> bool:
+    """Si el índice ya refleja la última importación (se reconstruye en segundo plano)."""
+    return _index_generation == dataset_state.current_generation()
+
+
+def rebuild() -> SpatialIndex:
+    """Construye el índice desde la BD y lo publica."""
+    global _index, _index_generation
+    with _build_lock:
+        generation = dataset_state.current_generation()
+        db = SessionLocal()
+        try:
+            ids, lats, lngs = repo.get_coordinates(db)
+        finally:
+            db.close()
+        
+        index = SpatialIndex(ids, lats, lngs, cell_deg=settings.nearby_index_cell_deg)
+        _index, _index_generation = index, generation
+        logger.info("Índice de proximidad construido con %d puntos", len(index))
+        return index
+
+
+def on_dataset_changed(generation: int) -> None:
+    """Reconstruye en segundo plano para no demorar la respuesta de la importación."""
+    if not enabled():
+        return
+    threading.Thread(target=safe_rebuild, name="nearby-index", daemon=True).start()
+
+
+def safe_rebuild() -> None:
+    try:
+        rebuild()
+    except Exception:
+        logger.exception("No se pudo reconstruir el índice de proximidad")
+
+
+dataset_state.subscribe(on_dataset_changed)
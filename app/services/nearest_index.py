@@ -0,0 +1,103 @@
+"""
+Rejilla precalculada para /nearest (NEAREST_GRID_ENABLED).
+
+Se construye al arrancar y después de cada importación confirmada, a
+partir del índice de /nearby/ si está al día o de las coordenadas de la
+BD. Como el índice de proximidad, la rejilla nueva se arma aparte y se
+publica de una sola vez; mientras no refleje la última importación las
+consultas usan la búsqueda normal para que el resultado siga siendo exacto.
+"""
+import logging
+import threading
+
+from app.config import settings
+from app.database import SessionLocal
+from app.repositories import wifi_repository as repo
+from app.services import dataset_state, nearby_index
+from app.utils.nearest_grid import NearestGrid
+from app.utils.spatial_index import SpatialIndex
+
+logger = logging.getLogger(__name__)
+
+_grid: NearestGrid | None = None
+# Generación del dataset con la que se construyó _grid
+_grid_generation = -1
+_build_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return settings.nearest_grid_enabled and settings.app_role != "ingest"
+
+
+def current() -> NearestGrid | None:
+    """Rejilla vigente, o None si está deshabilitada, no se construyó o está atrasada."""
+    if not enabled() or _grid_generation != dataset_state.current_generation():
+        return None
+    return _grid
+
+
+def source_index() -> SpatialIndex:
+    """El índice de nearby_index si está al día, o uno nuevo desde la BD."""
+    index = nearby_index.current()
+    if index is not None and nearby_index.is_fresh():
+        return index
+    
+    db = SessionLocal()
+    try:
+        ids, lats, lngs = repo.get_coordinates(db)
+    finally:
+        db.close()
+    return SpatialIndex(ids, lats, lngs, cell_deg=settings.nearby_index_cell_deg)
+
+
+def rebuild() -> NearestGrid:
+    """Construye la rejilla y la publica."""
+    global _grid, _grid_generation
+    with _build_lock:
+        generation = dataset_state.current_generation()
+        grid = NearestGrid(
+            source_index(),
+            k=settings.nearest_grid_k,
+            cell_deg=settings.nearest_grid_cell_deg,
+            max_cells=settings.nearest_grid_max_cells,
+            max_candidates=settings.nearest_grid_max_candidates
+        )
+        _grid, _grid_generation = grid, generation
+        stats = grid.stats()
+        logger.info(
+            "Rejilla de vecinos construida: %d celdas, %d sin lista, %.1f KiB en %.2f s",
+            stats["cells"], stats["fallback_cells"], stats["memory_bytes"] / 1024,
+            stats["build_seconds"]
+        )
+        return grid
+
+
+def stats() -> dict:
+    """Cifras de la rejilla publicada para /stats/nearest."""
+    if not enabled():
+        return {"enabled": False}
+    if _grid is None:
+        return {"enabled": True, "built": False}
+    return {
+        "enabled": True,
+        "built": True,
+        "fresh": _grid_generation == dataset_state.current_generation(),
+        **_grid.stats(),
+    }
+
+
+def on_dataset_changed(generation: int) -> None:
+    """Reconstruye en segundo plano para no demorar la respuesta de la importación."""
+    if not enabled():
+        return
+    threading.Thread(target=safe_rebuild, name="nearest-grid", daemon=True).start()
+
+
+def safe_rebuild() -> None:
+    try:
+        rebuild()
+    except Exception:
+        logger.exception("No se pudo reconstruir la rejilla de vecinos")
+
+
+dataset_state.subscribe(on_dataset_changed)
@@ -0,0 +1,362 @@
+"""
+Importación en paralelo de CSV grandes.
+
+El archivo se parte en rangos de bytes que terminan en un salto de línea
+fuera de comillas. Un pool de procesos lee y valida cada rango y, con su
+propia conexión, copia las filas válidas con COPY a una tabla UNLOGGED de
+staging compartida. Al final, en una sola transacción, se resuelven los
+duplicados con las mismas reglas de on_duplicate que la importación
+secuencial y se fusiona con wifi_points. Los errores llevan el número de
+fila del archivo completo.
+
+Solo aplica a CSV sin comprimir: un .gz o un .zip no se puede partir sin
+descomprimirlo entero, así que los demás formatos van por
+import_service.import_stream.
+"""
+import math
+import multiprocessing
+import os
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+from typing import BinaryIO, NamedTuple
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+from sqlalchemy.sql.expression import TableClause
+
+from app.config import settings
+from app.repositories import wifi_repository as repo
+from app.schemas.wifi_point import ImportChunkProgress, ImportError, ImportResponse
+from app.services.import_service import (
+    REQUIRED_COLUMNS, UPSERT_MODES, failed_response, finish_import, handle_error,
+    import_stream, validate_frame,
+)
+from app.utils import file_reader
+from app.utils.instrumentation import stage
+
+# Bytes que se leen por vez al buscar los cortes
+SPLIT_BLOCK_SIZE = 16 * 1024 * 1024
+
+# Motor de cada proceso del pool (se crea en init_worker)
+_worker_engine: Engine | None = None
+
+
+class ShardResult(NamedTuple):
+    """Resultado de un bloque: filas leídas, válidas y errores de validación."""
+    shard: int
+    rows: int
+    valid: int
+    # (fila dentro del bloque, id, motivo)
+    errors: list[tuple[int, str | None, str]]
+
+
+def workers_count(workers: int | None = None) -> int:
+    """Procesos a usar: el valor dado, IMPORT_PARALLEL_WORKERS o los núcleos."""
+    return workers or settings.import_parallel_workers or os.cpu_count() or 1
+
+
+def supports(filename: str) -> bool:
+    """Si el archivo se puede partir: CSV sin comprimir."""
+    return file_reader.detect_format(filename) == ("csv", None)
+
+
+def record_starts(stream: BinaryIO, start: int, targets: list[int]) -> list[int]:
+    """
+    Inicio del primer registro en o después de cada posición de targets.
+    
+    Un salto de línea separa registros solo si la cantidad de comillas
+    antes de él es par; los saltos dentro de un campo entre comillas se
+    saltan. targets debe estar ordenada y ser mayor o igual que start.
+    Retorna posiciones crecientes sin repetir (puede haber menos que
+    targets si el archivo se acaba).
+    """
+    starts: list[int] = []
+    pending = iter(targets)
+    target = next(pending, None)
+    position = start
+    quotes = 0
+    stream.seek(start)
+    
+    while target is not None:
+        block = stream.read(SPLIT_BLOCK_SIZE)
+        if not block:
+            break
+        
+        search = max(target - position, 0)
+        while target is not None and search < len(block):
+            newline = block.find(b"\n", search)
+            if newline < 0:
+                break
+            if (quotes + block.count(b'"', 0, newline)) % 2 == 0:
+                starts.append(position + newline + 1)
+                # Los objetivos que quedaron antes de este corte ya están cubiertos
+                while target is not None and target < starts[-1]:
+                    target = next(pending, None)
+                if target is not None:
+                    search = max(target - position, newline + 1)
+            else:
+                search = newline + 1
+        
+        quotes += block.count(b'"')
+        position += len(block)
+    
+    return starts
+
+
+def plan_shards(
+    stream: BinaryIO, size: int, shard_bytes: int, min_shards: int = 1
+) -> tuple[bytes, list[tuple[int, int]]]:
+    """
+    Encabezado del CSV y rangos (inicio, fin) de bytes de cada bloque.
+    
+    Los bloques son de shard_bytes aproximadamente y al menos min_shards
+    (uno por proceso) si el archivo alcanza; todos empiezan al inicio de
+    un registro, así que cada uno se lee como un CSV con el encabezado
+    adelante.
+    """
+    stream.seek(0)
+    header = stream.readline()
+    data_start = len(header)
+    data_size = size - data_start
+    if data_size <= 0:
+        return header, []
+    
+    count = max(min_shards, math.ceil(data_size / shard_bytes))
+    targets = [data_start + data_size * i // count for i in range(1, count)]
+    bounds = [data_start, *record_starts(stream, data_start, targets), size]
+    ranges = [(begin, end) for begin, end in zip(bounds, bounds[1:]) if end > begin]
+    return header, ranges
+
+
+def read_shard(
+    stream: BinaryIO,
+    header: bytes,
+    start: int,
+    end: int,
+    dialect: tuple[str, str, list[str]]
+) -> pd.DataFrame:
+    """Lee un bloque como CSV con el encabezado y el formato del archivo completo."""
+    stream.seek(start)
+    content = header + stream.read(end - start)
+    return file_reader.read_csv(BytesIO(content), repo.RECORD_COLUMNS, dialect)
+
+
+def parse_shard(df: pd.DataFrame) -> tuple[list[dict], list[tuple[int, str | None, str]]]:
+    """
+    Valida un bloque.
+    
+    Returns:
+        Registros válidos (con row_index, su posición en el bloque) y los
+        errores (row_index, id, motivo) en orden de fila.
+    """
+    clean, reasons = validate_frame(df)
+    positions = pd.RangeIndex(len(df))
+    valid = reasons.isna().to_numpy()
+    
+    records = clean[valid].assign(row_index=positions[valid]).to_dict("records")
+    failed = ~valid
+    errors = list(zip(
+        positions[failed].tolist(), clean["id"][failed].tolist(), reasons[failed].tolist()
+    ))
+    return records, errors
+
+
+def init_worker(database_url: str) -> None:
+    global _worker_engine
+    _worker_engine = create_engine(database_url, poolclass=NullPool)
+
+
+def import_shard(
+    path: str,
+    shard: int,
+    start: int,
+    end: int,
+    header: bytes,
+    dialect: tuple[str, str, list[str]],
+    staging: tuple[str, str]
+) -> ShardResult:
+    """Lee, valida y copia un bloque a staging; corre en un proceso del pool."""
+    with open(path, "rb") as stream:
+        df = read_shard(stream, header, start, end, dialect)
+    records, errors = parse_shard(df)
+    
+    with Session(_worker_engine) as db:
+        repo.copy_shard(db, repo.shard_staging(*staging), shard, records)
+        db.commit()
+    return ShardResult(shard, len(df), len(records), errors)
+
+
+def run_shards(
+    path: str,
+    header: bytes,
+    ranges: list[tuple[int, int]],
+    dialect: tuple[str, str, list[str]],
+    staging: tuple[str, str],
+    workers: int,
+    database_url: str,
+    on_chunk: Callable[[ImportChunkProgress], None] | None = None
+) -> list[ShardResult]:
+    """
+    Procesa los bloques en un pool de procesos y retorna sus resultados en orden.
+    
+    Los procesos se crean con spawn: no heredan conexiones ni hilos del
+    proceso que importa. on_chunk recibe cada bloque a medida que termina;
+    imported queda en 0 porque lo insertado se conoce recién en la fusión.
+    """
+    results: list[ShardResult] = []
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(ranges)),
+        mp_context=context,
+        initializer=init_worker,
+        initargs=(database_url,)
+    ) as executor:
+        futures = [
+            executor.submit(import_shard, path, shard, start, end, header, dialect, staging)
+            for shard, (start, end) in enumerate(ranges)
+        ]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_chunk:
+                on_chunk(ImportChunkProgress(
+                    chunk=result.shard + 1,
+                    rows=result.rows,
+                    imported=0,
+                    skipped=len(result.errors)
+                ))
+    return sorted(results)
+
+
+def shard_offsets(results: list[ShardResult]) -> list[int]:
+    """Filas del archivo antes de cada bloque (para numerar los errores)."""
+    offsets = [0]
+    for result in results[:-1]:
+        offsets.append(offsets[-1] + result.rows)
+    return offsets
+
+
+def merge_shards(
+    db: Session,
+    staging: TableClause,
+    results: list[ShardResult],
+    on_error: str,
+    on_duplicate: str,
+    delete_missing: bool
+) -> ImportResponse:
+    """Aplica on_error y on_duplicate sobre lo que dejaron los bloques y confirma."""
+    offsets = shard_offsets(results)
+    # (fila en el archivo desde 0, id, motivo, estrategia)
+    problems = [
+        (offsets[result.shard] + row_index, row_id, reason, on_error)
+        for result in results
+        for row_index, row_id, reason in result.errors
+    ]
+    
+    duplicates = 0
+    if on_duplicate not in UPSERT_MODES:
+        with stage("import_dedupe"):
+            for shard, row_index, row_id, in_db in repo.staged_duplicates(db, staging):
+                reason = "ID duplicado" if in_db else "ID duplicado en el archivo"
+                problems.append((offsets[shard] + row_index, row_id, reason, on_duplicate))
+                duplicates += 1
+    
+    # Mismo orden que la importación secuencial: 'fail' se detiene en el primero
+    errors: list[ImportError] = []
+    for row, row_id, reason, strategy in sorted(problems, key=lambda problem: problem[0]):
+        response = handle_error(reason, row + 2, row_id, strategy, errors)
+        if response:
+            db.rollback()
+            return response
+    
+    with stage("import_write"):
+        if delete_missing:
+            repo.record_source_ids(db, sorted({
+                row_id for result in results for _, row_id, _ in result.errors if row_id
+            }))
+            repo.record_staged_source_ids(db, staging)
+        result = repo.merge_staged(db, staging, on_duplicate)
+    
+    # Las apariciones reemplazadas por una posterior del mismo ID, como en import_chunk
+    valid = sum(shard.valid for shard in results)
+    replaced = valid - duplicates - sum(result)
+    return finish_import(
+        db,
+        inserted=result.inserted,
+        updated=result.updated + (replaced if on_duplicate == "update" else 0),
+        skipped=result.skipped + len(problems),
+        unchanged=result.unchanged + (replaced if on_duplicate == "diff" else 0),
+        errors=errors,
+        chunks=[],
+        delete_missing=delete_missing
+    )
+
+
+def import_parallel(
+    db: Session,
+    path: str,
+    filename: str,
+    on_error: str = "fail",
+    on_duplicate: str = "skip",
+    workers: int | None = None,
+    shard_bytes: int | None = None,
+    on_chunk: Callable[[ImportChunkProgress], None] | None = None,
+    delete_missing: bool = False,
+    database_url: str | None = None
+) -> ImportResponse:
+    """
+    Importa un CSV del disco repartiendo la lectura y la validación entre procesos.
+    
+    El resultado (conteos, errores y números de fila) es el mismo que el
+    de import_file con el mismo archivo, salvo chunks, que queda vacío.
+    database_url es la de los procesos del pool (por omisión DATABASE_URL);
+    la tabla de staging se crea en el esquema actual de `db`.
+    """
+    if not supports(filename):
+        with open(path, "rb") as stream:
+            return import_stream(
+                db, stream, filename, on_error, on_duplicate,
+                on_chunk=on_chunk, delete_missing=delete_missing
+            )
+    
+    workers = workers_count(workers)
+    with open(path, "rb") as stream:
+        dialect = file_reader.sniff_stream(stream)
+        header, ranges = plan_shards(
+            stream,
+            os.path.getsize(path),
+            shard_bytes or settings.import_parallel_shard_mb * 1024 * 1024,
+            workers
+        )
+    
+    missing = REQUIRED_COLUMNS - set(dialect[2])
+    if missing:
+        return failed_response(f"Columnas faltantes: {missing}")
+    if not ranges:
+        return finish_import(db, 0, 0, 0, 0, [], [], False)
+    
+    staging = repo.create_shard_staging(db)
+    db.commit()
+    try:
+        try:
+            with stage("import_shards"):
+                results = run_shards(
+                    path, header, ranges, dialect, (staging.schema, staging.name), workers,
+                    database_url or settings.database_url, on_chunk
+                )
+        except Exception as e:
+            return failed_response(f"Error procesando un bloque del archivo: {e}")
+        
+        try:
+            return merge_shards(db, staging, results, on_error, on_duplicate, delete_missing)
+        except Exception as e:
+            db.rollback()
+            return failed_response(f"Error en BD: {e}")
+    finally:
+        db.rollback()
+        repo.drop_shard_staging(db, staging)
+        db.commit()
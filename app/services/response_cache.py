@@ -0,0 +1,101 @@
+"""
+Caché de respuestas JSON ya serializadas.
+
+Las lecturas dan lo mismo entre importaciones, así que se guardan los
+bytes de la respuesta junto con su ETag. La clave incluye la generación
+del dataset y la caché se vacía cuando una importación la incrementa.
+"""
+import hashlib
+from collections.abc import Awaitable, Callable, Hashable
+from typing import NamedTuple
+
+from app.config import settings
+from app.services import dataset_state
+from app.utils.lru import LRUCache
+
+
+class CachedResponse(NamedTuple):
+    """Cuerpo JSON serializado y su ETag."""
+    body: bytes
+    etag: str
+
+
+_cache = LRUCache(settings.response_cache_max_entries)
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def wrap(body: bytes) -> CachedResponse:
+    return CachedResponse(body, make_etag(body))
+
+
+def get_or_build(
+    key: tuple[Hashable, ...],
+    build: Callable[[], bytes | None]
+) -> CachedResponse | None:
+    """
+    Retorna la respuesta guardada para key o la construye y la guarda.
+    
+    build retorna el cuerpo JSON; si retorna None (por ejemplo, un 404)
+    no se guarda nada.
+    """
+    if not settings.response_cache_enabled:
+        body = build()
+        return wrap(body) if body is not None else None
+    
+    full_key = (dataset_state.current_generation(), *key)
+    cached = _cache.get(full_key)
+    if cached is not None:
+        return cached
+    
+    body = build()
+    if body is None:
+        return None
+    
+    cached = wrap(body)
+    _cache.set(full_key, cached)
+    return cached
+
+
+async def get_or_build_async(
+    key: tuple[Hashable, ...],
+    build: Callable[[], Awaitable[bytes | None]]
+) -> CachedResponse | None:
+    """Igual que get_or_build con un build async; comparten la caché."""
+    if not settings.response_cache_enabled:
+        body = await build()
+        return wrap(body) if body is not None else None
+    
+    full_key = (dataset_state.current_generation(), *key)
+    cached = _cache.get(full_key)
+    if cached is not None:
+        return cached
+    
+    body = await build()
+    if body is None:
+        return None
+    
+    cached = wrap(body)
+    _cache.set(full_key, cached)
+    return cached
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evalúa un encabezado If-None-Match contra el ETag actual."""
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def stats() -> dict[str, int]:
+    return _cache.stats()
+
+
+def on_dataset_changed(generation: int) -> None:
+    _cache.clear()
+
+
+dataset_state.subscribe(on_dataset_changed)
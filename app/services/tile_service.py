@@ -0,0 +1,231 @@
+"""
+Tiles vectoriales (MVT) de los puntos WiFi.
+
+Con el índice en memoria (NEARBY_BACKEND=memory) el tile se arma en el
+proceso; si no, lo genera PostGIS con ST_AsMVT. Los tiles se guardan
+bajo una huella del dataset leída de la BD: en una LRU y, con
+TILE_CACHE_DIR, también en disco, donde la comparten los procesos y
+sobrevive a los reinicios. Una importación que cambia los puntos cambia la
+huella; cada proceso la vuelve a leer con cada cambio de generación y
+cuando pasan TILE_FINGERPRINT_TTL segundos, así que una importación de
+otro proceso se nota a lo más en ese tiempo.
+"""
+import hashlib
+import os
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+from app.repositories import wifi_repository as repo
+from app.repositories import wifi_repository_async as repo_async
+from app.services import dataset_state, nearby_index, response_cache
+from app.services.response_cache import CachedResponse
+from app.utils import mvt
+from app.utils.lru import LRUCache
+from app.utils.spatial_index import SpatialIndex
+
+
+class Fingerprint(NamedTuple):
+    """Última lectura de la huella del dataset."""
+    value: str
+    # Generación local y momento (time.monotonic) de la lectura
+    generation: int
+    read_at: float
+    # Primera huella leída en esta generación: si la actual es otra, la BD
+    # cambió y el proceso aún no lo sabe (ver dataset_sync)
+    first: str
+    
+    def behind(self) -> bool:
+        return self.value != self.first
+
+
+_cache = LRUCache(settings.tile_cache_max_entries)
+_fingerprint: Fingerprint | None = None
+
+
+def tile_bbox(z: int, x: int, y: int) -> repo.BBox:
+    """Rectángulo del tile más el buffer, en grados."""
+    return repo.BBox(*mvt.tile_bounds(z, x, y, settings.tile_buffer / settings.tile_extent))
+
+
+def build_from_index(index: SpatialIndex, z: int, x: int, y: int) -> bytes:
+    """Arma el tile con los puntos del índice, ordenados por id como en la BD."""
+    positions = index.within_bbox(*tile_bbox(z, x, y))
+    positions = positions[np.argsort(index.ids[positions], kind="stable")]
+    return mvt.encode_points(
+        repo.TILE_LAYER,
+        index.ids[positions],
+        index.lngs[positions],
+        index.lats[positions],
+        z, x, y,
+        settings.tile_extent,
+        settings.tile_buffer
+    )
+
+
+def fresh_index(fingerprint: Fingerprint) -> SpatialIndex | None:
+    """Índice en memoria si está al día con la última importación."""
+    index = nearby_index.current()
+    if index is None or not nearby_index.is_fresh() or fingerprint.behind():
+        return None
+    return index
+
+
+def build_tile(db: Session, fingerprint: Fingerprint, z: int, x: int, y: int) -> bytes:
+    index = fresh_index(fingerprint)
+    if index is not None:
+        return build_from_index(index, z, x, y)
+    return repo.get_tile(
+        db, z, x, y, tile_bbox(z, x, y), settings.tile_extent, settings.tile_buffer
+    )
+
+
+def fingerprint_of(values: tuple) -> str:
+    return hashlib.blake2b(repr(values).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def cached_fingerprint() -> Fingerprint | None:
+    """La huella guardada si es de esta generación y no tiene más de TILE_FINGERPRINT_TTL s."""
+    cached = _fingerprint
+    if (
+        cached is not None
+        and cached.generation == dataset_state.current_generation()
+        and time.monotonic() - cached.read_at < settings.tile_fingerprint_ttl
+    ):
+        return cached
+    return None
+
+
+def store_fingerprint(generation: int, values: tuple) -> Fingerprint:
+    global _fingerprint
+    value = fingerprint_of(values)
+    previous = _fingerprint
+    first = previous.first if previous is not None and previous.generation == generation else value
+    _fingerprint = Fingerprint(value, generation, time.monotonic(), first)
+    return _fingerprint
+
+
+def dataset_fingerprint(db: Session) -> Fingerprint:
+    """Huella del dataset; una consulta a alcaldias cuando vence la guardada."""
+    cached = cached_fingerprint()
+    if cached is not None:
+        return cached
+    generation = dataset_state.current_generation()
+    return store_fingerprint(generation, repo.get_dataset_fingerprint(db))
+
+
+def tile_path(fingerprint: str, z: int, x: int, y: int) -> Path:
+    return Path(settings.tile_cache_dir) / fingerprint / str(z) / str(x) / f"{y}.mvt"
+
+
+def read_disk(path: Path) -> bytes | None:
+    try:
+        return path.read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def write_disk(path: Path, body: bytes) -> None:
+    """Escribe a un temporal y lo renombra: nadie lee un tile a medias."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp.write_bytes(body)
+    os.replace(tmp, path)
+
+
+def get_tile(db: Session, z: int, x: int, y: int) -> CachedResponse:
+    """Tile z/x/y desde la memoria, el disco o recién generado."""
+    fingerprint = dataset_fingerprint(db)
+    key = (fingerprint.value, z, x, y)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    
+    path = tile_path(fingerprint.value, z, x, y) if settings.tile_cache_dir else None
+    body = read_disk(path) if path else None
+    if body is None:
+        body = build_tile(db, fingerprint, z, x, y)
+        if path:
+            write_disk(path, body)
+    
+    cached = response_cache.wrap(body)
+    _cache.set(key, cached)
+    return cached
+
+
+async def dataset_fingerprint_async(db: AsyncSession) -> Fingerprint:
+    """Variante async de dataset_fingerprint; comparten el valor guardado."""
+    cached = cached_fingerprint()
+    if cached is not None:
+        return cached
+    generation = dataset_state.current_generation()
+    return store_fingerprint(generation, await repo_async.get_dataset_fingerprint(db))
+
+
+async def build_tile_async(
+    db: AsyncSession, fingerprint: Fingerprint, z: int, x: int, y: int
+) -> bytes:
+    index = fresh_index(fingerprint)
+    if index is not None:
+        # Codificar un tile de zoom bajo toma milisegundos: fuera del event loop
+        return await run_in_threadpool(build_from_index, index, z, x, y)
+    return await repo_async.get_tile(
+        db, z, x, y, tile_bbox(z, x, y), settings.tile_extent, settings.tile_buffer
+    )
+
+
+async def get_tile_async(db: AsyncSession, z: int, x: int, y: int) -> CachedResponse:
+    """Variante async de get_tile; comparten la caché."""
+    fingerprint = await dataset_fingerprint_async(db)
+    key = (fingerprint.value, z, x, y)
+    cached = _cache.get(key)
+    if cached is not None:
+        return cached
+    
+    path = tile_path(fingerprint.value, z, x, y) if settings.tile_cache_dir else None
+    body = await run_in_threadpool(read_disk, path) if path else None
+    if body is None:
+        body = await build_tile_async(db, fingerprint, z, x, y)
+        if path:
+            await run_in_threadpool(write_disk, path, body)
+    
+    cached = response_cache.wrap(body)
+    _cache.set(key, cached)
+    return cached
+
+
+def seed(db: Session, min_zoom: int, max_zoom: int) -> int:
+    """
+    Genera los tiles de min_zoom a max_zoom que tocan el dataset.
+    
+    Pensado para llenar la caché en disco antes de abrir el mapa; retorna
+    la cantidad de tiles generados.
+    """
+    extent = repo.get_extent(db)
+    if extent is None:
+        return 0
+    
+    count = 0
+    for z in range(min_zoom, max_zoom + 1):
+        for x, y in mvt.tiles_covering(*extent, z):
+            get_tile(db, z, x, y)
+            count += 1
+    return count
+
+
+def stats() -> dict[str, int]:
+    return _cache.stats()
+
+
+def on_dataset_changed(generation: int) -> None:
+    _cache.clear()
+
+
+dataset_state.subscribe(on_dataset_changed)
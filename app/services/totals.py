@@ -0,0 +1,117 @@
+"""
+Totales para la paginación.
+
+El conteo global y los conteos por alcaldía (tabla alcaldias) se leen
+una vez por generación del dataset (una importación los invalida), en
+lugar de correr un COUNT junto a cada página. Para tablas muy grandes se puede
+usar la estimación del planner (TOTALS_USE_ESTIMATE).
+"""
+import threading
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.repositories import wifi_repository as repo
+from app.repositories import wifi_repository_async as repo_async
+from app.services import dataset_state
+from app.utils.text import normalize_key
+
+_total: int | None = None
+_by_alcaldia: dict[str, int] | None = None
+_lock = threading.Lock()
+
+
+def store(
+    generation: int, total: int | None = None, by_alcaldia: dict[str, int] | None = None
+) -> None:
+    """
+    Guarda conteos leídos en la generación dada.
+    
+    Si una importación confirmó mientras se contaba, el conteo puede ser
+    del dataset anterior y se descarta.
+    """
+    global _total, _by_alcaldia
+    with _lock:
+        if generation != dataset_state.current_generation():
+            return
+        if total is not None:
+            _total = total
+        if by_alcaldia is not None:
+            _by_alcaldia = by_alcaldia
+
+
+def total_all(db: Session) -> int:
+    """Total de puntos WiFi."""
+    if settings.totals_use_estimate:
+        estimate = repo.estimate_count(db)
+        if estimate >= settings.totals_estimate_threshold:
+            return estimate
+    
+    total = _total
+    if total is None:
+        generation = dataset_state.current_generation()
+        total = repo.count_all(db)
+        store(generation, total=total)
+    return total
+
+
+def total_by_alcaldia(db: Session, alcaldia: str) -> int:
+    """Total de puntos WiFi en una alcaldía (sin distinguir acentos ni mayúsculas)."""
+    counts = _by_alcaldia
+    if counts is None:
+        generation = dataset_state.current_generation()
+        counts = repo.count_by_alcaldia(db)
+        store(generation, by_alcaldia=counts)
+    return counts.get(normalize_key(alcaldia), 0)
+
+
+def total_nearby(db: Session, lat: float, lng: float, radius_m: float | None) -> int:
+    """Total de resultados de una búsqueda por proximidad."""
+    if radius_m is None:
+        return total_all(db)
+    return repo.count_within(db, lat, lng, radius_m)
+
+
+async def total_all_async(db: AsyncSession) -> int:
+    """Variante async de total_all; comparte los valores guardados."""
+    if settings.totals_use_estimate:
+        estimate = await repo_async.estimate_count(db)
+        if estimate >= settings.totals_estimate_threshold:
+            return estimate
+    
+    total = _total
+    if total is None:
+        generation = dataset_state.current_generation()
+        total = await repo_async.count_all(db)
+        store(generation, total=total)
+    return total
+
+
+async def total_by_alcaldia_async(db: AsyncSession, alcaldia: str) -> int:
+    """Variante async de total_by_alcaldia."""
+    counts = _by_alcaldia
+    if counts is None:
+        generation = dataset_state.current_generation()
+        counts = await repo_async.count_by_alcaldia(db)
+        store(generation, by_alcaldia=counts)
+    return counts.get(normalize_key(alcaldia), 0)
+
+
+async def total_nearby_async(
+    db: AsyncSession, lat: float, lng: float, radius_m: float | None
+) -> int:
+    """Variante async de total_nearby."""
+    if radius_m is None:
+        return await total_all_async(db)
+    return await repo_async.count_within(db, lat, lng, radius_m)
+
+
+def on_dataset_changed(generation: int) -> None:
+    global _total, _by_alcaldia
+    with _lock:
+        _total = None
+        _by_alcaldia = None
+
+
+dataset_state.subscribe(on_dataset_changed)
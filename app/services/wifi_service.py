@@ -2,17 +2,31 @@
 Servicio de lógica de negocio para puntos WiFi.
 Enfoque funcional: funciones puras, composición, inmutabilidad.
 """
+from typing import NamedTuple
+
+from sqlalchemy import Row
 from sqlalchemy.orm import Session
 
-from app.models.wifi_point import WifiPoint
 from app.repositories import wifi_repository as repo
 from app.schemas.wifi_point import (
     WifiPointResponse,
     WifiPointWithDistance,
     PaginatedResponse,
     PaginationMeta,
+    NearbyBatchQuery,
+    NearbyBatchResponse,
+    NearbyBatchResult,
+    ViewportCluster,
+    ViewportResponse,
 )
 from app.config import settings
+from app.services import nearby_index, nearest_index, response_cache, totals
+from app.services.response_cache import CachedResponse
+from app.utils import json_encoder
+from app.utils.cursor import InvalidCursorError, decode_cursor, encode_cursor
+from app.utils.instrumentation import timed
+from app.utils.spatial_index import SpatialIndex
+from app.utils.text import normalize_key
 
 
 def calculate_pages(total: int, limit: int) -> int:
@@ -25,13 +39,13 @@ def max_limit(limit: int) -> int:
     return min(limit, settings.max_page_size)
 
 
-def to_response(point: WifiPoint) -> WifiPointResponse:
-    """Transforma un WifiPoint a WifiPointResponse."""
+def to_response(point: Row) -> WifiPointResponse:
+    """Transforma una fila de punto WiFi a WifiPointResponse."""
     return WifiPointResponse.model_validate(point)
 
 
-def to_response_with_distance(point: WifiPoint, distance: float) -> WifiPointWithDistance:
-    """Transforma un WifiPoint a WifiPointWithDistance."""
+def to_response_with_distance(point: Row, distance: float) -> WifiPointWithDistance:
+    """Transforma una fila de punto WiFi a WifiPointWithDistance."""
     return WifiPointWithDistance(
         id=point.id,
         programa=point.programa,
@@ -44,54 +58,292 @@ def to_response_with_distance(point: WifiPoint, distance: float) -> WifiPointWit
     )
 
 
-def build_pagination(page: int, limit: int, total: int) -> PaginationMeta:
-    """Construye metadata de paginación."""
+def to_dict(point: Row) -> dict:
+    """
+    Transforma una fila de punto WiFi al dict que se serializa directo a JSON.
+    
+    Produce el mismo JSON que WifiPointResponse sin construir el modelo.
+    """
+    return {
+        "id": point.id,
+        "programa": point.programa,
+        "latitud": str(point.latitud),
+        "longitud": str(point.longitud),
+        "alcaldia": point.alcaldia,
+        "created_at": point.created_at,
+        "updated_at": point.updated_at,
+    }
+
+
+def to_dict_with_distance(point: Row, distance: float) -> dict:
+    """Equivalente de to_response_with_distance para la ruta sin modelos."""
+    item = to_dict(point)
+    item["distancia_metros"] = round(distance, 2)
+    return item
+
+
+@timed("serialize")
+def encode_page(data: list[dict], pagination: PaginationMeta) -> bytes:
+    """Serializa una página con la forma de PaginatedResponse."""
+    return json_encoder.dumps({"data": data, "pagination": pagination.model_dump()})
+
+
+def build_pagination(
+    page: int,
+    limit: int,
+    total: int | None,
+    next_cursor: str | None = None
+) -> PaginationMeta:
+    """Construye metadata de paginación. Sin total, pages también queda en None."""
     return PaginationMeta(
         page=page,
         limit=limit,
         total=total,
-        pages=calculate_pages(total, limit)
+        pages=calculate_pages(total, limit) if total is not None else None,
+        next_cursor=next_cursor
     )
 
 
+def encode_id_cursor(wifi_id: str) -> str:
+    """Genera el cursor de listados a partir del último ID de la página."""
+    return encode_cursor({"id": wifi_id})
+
+
+def decode_id_cursor(cursor: str) -> str:
+    """Extrae el ID de un cursor de listados."""
+    wifi_id = decode_cursor(cursor).get("id")
+    
+    if not isinstance(wifi_id, str):
+        raise InvalidCursorError("Cursor inválido")
+    
+    return wifi_id
+
+
+def split_page(rows: list[Row], limit: int) -> tuple[list[Row], str | None]:
+    """Separa la fila extra de la página y genera el cursor si hay más."""
+    if len(rows) > limit:
+        return rows[:limit], encode_id_cursor(rows[limit - 1].id)
+    return rows, None
+
+
+def encode_nearby_cursor(distance: float, wifi_id: str) -> str:
+    """Genera el cursor de proximidad a partir del último elemento de la página."""
+    return encode_cursor({"d": distance, "id": wifi_id})
+
+
+def decode_nearby_cursor(cursor: str) -> tuple[float, str]:
+    """Extrae (distancia_knn, id) de un cursor de proximidad."""
+    values = decode_cursor(cursor)
+    distance, wifi_id = values.get("d"), values.get("id")
+    
+    if not isinstance(distance, (int, float)) or isinstance(distance, bool) or not isinstance(wifi_id, str):
+        raise InvalidCursorError("Cursor inválido")
+    
+    return float(distance), wifi_id
+
+
+def fetch_by_id(db: Session, wifi_id: str) -> Row | None:
+    return repo.get_row_by_id(db, wifi_id)
+
+
 def get_by_id(db: Session, wifi_id: str) -> WifiPointResponse | None:
     """Obtiene un punto WiFi por su ID."""
-    point = repo.get_by_id(db, wifi_id)
+    point = fetch_by_id(db, wifi_id)
     return to_response(point) if point else None
 
 
+def get_by_id_json(db: Session, wifi_id: str) -> bytes | None:
+    """get_by_id serializado directo a JSON."""
+    point = fetch_by_id(db, wifi_id)
+    return json_encoder.dumps(to_dict(point)) if point else None
+
+
+def fetch_all(
+    db: Session,
+    page: int,
+    limit: int,
+    include_total: bool,
+    after: str | None = None
+) -> tuple[list[Row], PaginationMeta]:
+    """
+    Resuelve una página del listado general.
+    
+    Con after (cursor) se pagina por keyset sobre id y se ignora page.
+    Lanza InvalidCursorError si el cursor no es válido.
+    """
+    after_id = decode_id_cursor(after) if after else None
+    points, next_cursor = split_page(repo.get_all(db, page, limit, after_id), limit)
+    total = totals.total_all(db) if include_total else None
+    return points, build_pagination(page, limit, total, next_cursor)
+
+
 def get_all(
     db: Session, 
     page: int = 1, 
-    limit: int = settings.default_page_size
+    limit: int = settings.default_page_size,
+    include_total: bool = True,
+    after: str | None = None
 ) -> PaginatedResponse[WifiPointResponse]:
     """Obtiene lista paginada de todos los puntos WiFi."""
-    limit = max_limit(limit)
-    points, total = repo.get_all(db, page, limit)
-    
-    data = list(map(to_response, points))
-    
-    return PaginatedResponse(
-        data=data,
-        pagination=build_pagination(page, limit, total)
+    points, pagination = fetch_all(db, page, max_limit(limit), include_total, after)
+    return PaginatedResponse(data=list(map(to_response, points)), pagination=pagination)
+
+
+def get_all_json(
+    db: Session,
+    page: int = 1,
+    limit: int = settings.default_page_size,
+    include_total: bool = True,
+    after: str | None = None
+) -> bytes:
+    """get_all serializado directo a JSON."""
+    points, pagination = fetch_all(db, page, max_limit(limit), include_total, after)
+    return encode_page(list(map(to_dict, points)), pagination)
+
+
+def fetch_by_alcaldia(
+    db: Session,
+    alcaldia: str,
+    page: int,
+    limit: int,
+    include_total: bool,
+    after: str | None = None
+) -> tuple[list[Row], PaginationMeta]:
+    """Igual que fetch_all, filtrando por alcaldía."""
+    after_id = decode_id_cursor(after) if after else None
+    points, next_cursor = split_page(
+        repo.get_by_alcaldia(db, alcaldia, page, limit, after_id), limit
     )
+    total = totals.total_by_alcaldia(db, alcaldia) if include_total else None
+    return points, build_pagination(page, limit, total, next_cursor)
 
 
 def get_by_alcaldia(
     db: Session, 
     alcaldia: str, 
     page: int = 1, 
-    limit: int = settings.default_page_size
+    limit: int = settings.default_page_size,
+    include_total: bool = True,
+    after: str | None = None
 ) -> PaginatedResponse[WifiPointResponse]:
     """Obtiene puntos WiFi filtrados por alcaldía."""
+    points, pagination = fetch_by_alcaldia(
+        db, alcaldia, page, max_limit(limit), include_total, after
+    )
+    return PaginatedResponse(data=list(map(to_response, points)), pagination=pagination)
+
+
+def get_by_alcaldia_json(
+    db: Session,
+    alcaldia: str,
+    page: int = 1,
+    limit: int = settings.default_page_size,
+    include_total: bool = True,
+    after: str | None = None
+) -> bytes:
+    """get_by_alcaldia serializado directo a JSON."""
+    points, pagination = fetch_by_alcaldia(
+        db, alcaldia, page, max_limit(limit), include_total, after
+    )
+    return encode_page(list(map(to_dict, points)), pagination)
+
+
+def get_by_id_cached(db: Session, wifi_id: str) -> CachedResponse | None:
+    """get_by_id serializado y guardado en la caché de respuestas."""
+    return response_cache.get_or_build(
+        ("get_by_id", wifi_id),
+        lambda: get_by_id_json(db, wifi_id)
+    )
+
+
+def get_all_cached(
+    db: Session,
+    page: int = 1,
+    limit: int = settings.default_page_size,
+    include_total: bool = True,
+    after: str | None = None
+) -> CachedResponse:
+    """get_all serializado y guardado en la caché de respuestas."""
+    limit = max_limit(limit)
+    return response_cache.get_or_build(
+        ("get_all", page, limit, include_total, after),
+        lambda: get_all_json(db, page, limit, include_total, after)
+    )
+
+
+def get_by_alcaldia_cached(
+    db: Session,
+    alcaldia: str,
+    page: int = 1,
+    limit: int = settings.default_page_size,
+    include_total: bool = True,
+    after: str | None = None
+) -> CachedResponse:
+    """get_by_alcaldia serializado y guardado en la caché de respuestas."""
     limit = max_limit(limit)
-    points, total = repo.get_by_alcaldia(db, alcaldia, page, limit)
+    # El filtro no distingue acentos ni mayúsculas, así que comparten entrada
+    return response_cache.get_or_build(
+        ("get_by_alcaldia", normalize_key(alcaldia), page, limit, include_total, after),
+        lambda: get_by_alcaldia_json(db, alcaldia, page, limit, include_total, after)
+    )
+
+
+def fetch_nearby(
+    db: Session,
+    lat: float,
+    lng: float,
+    page: int,
+    limit: int,
+    radius_m: float | None,
+    cursor: str | None,
+    include_total: bool
+) -> tuple[list[tuple[Row, float]], PaginationMeta]:
+    """
+    Resuelve una página de proximidad como pares (fila, distancia_metros).
+    
+    Con cursor se pagina por keyset (distancia, id) y se ignora page.
+    Lanza InvalidCursorError si el cursor no es válido.
+    """
+    after = decode_nearby_cursor(cursor) if cursor else None
+    offset = 0 if after else (page - 1) * limit
     
-    data = list(map(to_response, points))
+    index = nearby_index.current()
+    if index is not None:
+        page_results, has_more, total = nearby_from_index(
+            db, index, lat, lng, limit, offset, radius_m, after, include_total
+        )
+    else:
+        results = repo.get_nearby(db, lat, lng, limit, offset, radius_m, after)
+        page_results, has_more = split_nearby(results, limit)
+        total = totals.total_nearby(db, lat, lng, radius_m) if include_total else None
+    
+    return nearby_page(page_results, has_more, page, limit, total)
+
+
+def split_nearby(results: list[Row], limit: int) -> tuple[list[tuple[Row, float, float]], bool]:
+    """Filas de get_nearby como (fila, distancia_metros, distancia_knn) y si hay más."""
+    page_results = [
+        (row, row.distancia_metros, row.distancia_knn) for row in results[:limit]
+    ]
+    return page_results, len(results) > limit
+
+
+def nearby_page(
+    page_results: list[tuple[Row, float, float]],
+    has_more: bool,
+    page: int,
+    limit: int,
+    total: int | None
+) -> tuple[list[tuple[Row, float]], PaginationMeta]:
+    """Arma la página de proximidad y el cursor a partir del último elemento."""
+    next_cursor = None
+    if has_more and page_results:
+        last_point, _, last_knn = page_results[-1]
+        next_cursor = encode_nearby_cursor(last_knn, last_point.id)
     
-    return PaginatedResponse(
-        data=data,
-        pagination=build_pagination(page, limit, total)
+    return (
+        [(point, distance) for point, distance, _ in page_results],
+        build_pagination(page, limit, total, next_cursor)
     )
 
 
@@ -100,15 +352,323 @@ def get_nearby(
     lat: float, 
     lng: float, 
     page: int = 1, 
-    limit: int = settings.default_page_size
+    limit: int = settings.default_page_size,
+    radius_m: float | None = None,
+    cursor: str | None = None,
+    include_total: bool = True
 ) -> PaginatedResponse[WifiPointWithDistance]:
     """Obtiene puntos WiFi ordenados por proximidad."""
-    limit = max_limit(limit)
-    results, total = repo.get_nearby(db, lat, lng, page, limit)
-    
+    results, pagination = fetch_nearby(
+        db, lat, lng, page, max_limit(limit), radius_m, cursor, include_total
+    )
     data = [to_response_with_distance(point, distance) for point, distance in results]
+    return PaginatedResponse(data=data, pagination=pagination)
+
+
+def get_nearby_json(
+    db: Session,
+    lat: float,
+    lng: float,
+    page: int = 1,
+    limit: int = settings.default_page_size,
+    radius_m: float | None = None,
+    cursor: str | None = None,
+    include_total: bool = True
+) -> bytes:
+    """get_nearby serializado directo a JSON."""
+    results, pagination = fetch_nearby(
+        db, lat, lng, page, max_limit(limit), radius_m, cursor, include_total
+    )
+    data = [to_dict_with_distance(point, distance) for point, distance in results]
+    return encode_page(data, pagination)
+
+
+def search_index(
+    index: SpatialIndex,
+    lat: float,
+    lng: float,
+    limit: int,
+    offset: int,
+    radius_m: float | None,
+    after: tuple[float, str] | None,
+    include_total: bool = True
+) -> tuple[list[tuple[str, float, float]], bool, int | None]:
+    """
+    Busca en el índice en memoria.
+    
+    Returns:
+        Tupla con ((id, distancia, knn) de la página, hay_más, total)
+    """
+    matches = index.nearest(lat, lng, limit + 1, offset, radius_m, after)
+    total = None
+    if include_total:
+        total = len(index) if radius_m is None else index.count_within(lat, lng, radius_m)
     
-    return PaginatedResponse(
-        data=data,
-        pagination=build_pagination(page, limit, total)
-    )
\ No newline at end of file
+    return matches[:limit], len(matches) > limit, total
+
+
+def attach_rows(
+    page_matches: list[tuple[str, float, float]],
+    points: dict[str, Row]
+) -> list[tuple[Row, float, float]]:
+    """Cambia cada ID del índice por su fila de la BD."""
+    # Un punto puede faltar si se borró después de construir el índice
+    return [
+        (points[wifi_id], distance, knn)
+        for wifi_id, distance, knn in page_matches
+        if wifi_id in points
+    ]
+
+
+def nearby_from_index(
+    db: Session,
+    index: SpatialIndex,
+    lat: float,
+    lng: float,
+    limit: int,
+    offset: int,
+    radius_m: float | None,
+    after: tuple[float, str] | None,
+    include_total: bool = True
+) -> tuple[list[tuple[Row, float, float]], bool, int | None]:
+    """
+    Resuelve la proximidad con el índice en memoria y solo consulta la BD
+    para traer los registros de la página.
+    
+    Returns:
+        Tupla con (filas de la página, hay_más, total)
+    """
+    page_matches, has_more, total = search_index(
+        index, lat, lng, limit, offset, radius_m, after, include_total
+    )
+    points = repo.get_rows_by_ids(db, [wifi_id for wifi_id, _, _ in page_matches])
+    return attach_rows(page_matches, points), has_more, total
+
+
+def batch_params(queries: list[NearbyBatchQuery]) -> list[tuple[float, float, int, float | None]]:
+    return [(q.lat, q.lng, max_limit(q.k), q.radius_m) for q in queries]
+
+
+def group_batch_rows(rows: list[Row], count: int) -> list[list[tuple[Row, float]]]:
+    """Reparte las filas de get_nearby_batch por coordenada de entrada."""
+    groups: list[list[tuple[Row, float]]] = [[] for _ in range(count)]
+    for row in rows:
+        groups[row.idx].append((row, row.distancia_metros))
+    return groups
+
+
+def search_index_batch(
+    index: SpatialIndex,
+    params: list[tuple[float, float, int, float | None]]
+) -> list[list[tuple[str, float, float]]]:
+    """Resuelve cada coordenada del lote con el índice en memoria."""
+    return [
+        index.nearest(lat, lng, k, 0, radius_m, None)
+        for lat, lng, k, radius_m in params
+    ]
+
+
+def attach_batch_rows(
+    matches: list[list[tuple[str, float, float]]],
+    points: dict[str, Row]
+) -> list[list[tuple[Row, float]]]:
+    return [
+        [(point, distance) for point, distance, _ in attach_rows(group, points)]
+        for group in matches
+    ]
+
+
+def batch_ids(matches: list[list[tuple[str, float, float]]]) -> list[str]:
+    """IDs distintos de todos los grupos, para traerlos en una sola consulta."""
+    return list({wifi_id for group in matches for wifi_id, _, _ in group})
+
+
+def fetch_nearby_batch(
+    db: Session,
+    queries: list[NearbyBatchQuery]
+) -> list[list[tuple[Row, float]]]:
+    """
+    Puntos más cercanos para cada coordenada, en una sola consulta.
+    
+    Con el índice en memoria la BD solo se consulta para traer las filas.
+    """
+    params = batch_params(queries)
+    
+    index = nearby_index.current()
+    if index is not None:
+        matches = search_index_batch(index, params)
+        return attach_batch_rows(matches, repo.get_rows_by_ids(db, batch_ids(matches)))
+    
+    return group_batch_rows(repo.get_nearby_batch(db, params), len(params))
+
+
+def get_nearby_batch(db: Session, queries: list[NearbyBatchQuery]) -> NearbyBatchResponse:
+    """Búsqueda por proximidad para varias coordenadas."""
+    groups = fetch_nearby_batch(db, queries)
+    return NearbyBatchResponse(results=[
+        NearbyBatchResult(
+            lat=query.lat,
+            lng=query.lng,
+            data=[to_response_with_distance(point, distance) for point, distance in group]
+        )
+        for query, group in zip(queries, groups)
+    ])
+
+
+@timed("serialize")
+def encode_batch(queries: list[NearbyBatchQuery], groups: list[list[tuple[Row, float]]]) -> bytes:
+    """Serializa los grupos con la forma de NearbyBatchResponse."""
+    return json_encoder.dumps({"results": [
+        {
+            "lat": query.lat,
+            "lng": query.lng,
+            "data": [to_dict_with_distance(point, distance) for point, distance in group],
+        }
+        for query, group in zip(queries, groups)
+    ]})
+
+
+def get_nearby_batch_json(db: Session, queries: list[NearbyBatchQuery]) -> bytes:
+    """get_nearby_batch serializado directo a JSON."""
+    return encode_batch(queries, fetch_nearby_batch(db, queries))
+
+
+def search_nearest(lat: float, lng: float, k: int) -> list[tuple[str, float, float]] | None:
+    """
+    Los k más cercanos desde la rejilla precalculada o el índice en memoria.
+    
+    None si ninguno puede resolver la consulta y hay que ir a PostGIS.
+    """
+    grid = nearest_index.current()
+    matches = grid.nearest(lat, lng, k) if grid is not None else None
+    if matches is None:
+        index = nearby_index.current()
+        if index is not None:
+            matches = index.nearest(lat, lng, k)
+    return matches
+
+
+def nearest_ids(matches: list[tuple[str, float, float]]) -> list[str]:
+    return [wifi_id for wifi_id, _, _ in matches]
+
+
+def nearest_pairs(
+    matches: list[tuple[str, float, float]],
+    points: dict[str, Row]
+) -> list[tuple[Row, float]]:
+    return [(point, distance) for point, distance, _ in attach_rows(matches, points)]
+
+
+def fetch_nearest(db: Session, lat: float, lng: float, k: int) -> list[tuple[Row, float]]:
+    """Los k puntos más cercanos como pares (fila, distancia_metros)."""
+    matches = search_nearest(lat, lng, k)
+    if matches is not None:
+        return nearest_pairs(matches, repo.get_rows_by_ids(db, nearest_ids(matches)))
+    
+    return [(row, row.distancia_metros) for row in repo.get_nearby(db, lat, lng, k)[:k]]
+
+
+@timed("serialize")
+def encode_nearest(lat: float, lng: float, group: list[tuple[Row, float]]) -> bytes:
+    """Serializa con la forma de NearbyBatchResult."""
+    return json_encoder.dumps({
+        "lat": lat,
+        "lng": lng,
+        "data": [to_dict_with_distance(point, distance) for point, distance in group],
+    })
+
+
+def get_nearest_json(db: Session, lat: float, lng: float, k: int) -> bytes:
+    """Los k puntos más cercanos a una coordenada, serializados a JSON."""
+    return encode_nearest(lat, lng, fetch_nearest(db, lat, lng, k))
+
+
+class Viewport(NamedTuple):
+    """Contenido de un rectángulo antes de serializar."""
+    clustered: bool
+    cell_deg: float | None
+    total: int
+    points: list[Row]
+    clusters: list[Row]
+
+
+def viewport_cell_deg(bbox: repo.BBox, zoom: int) -> float:
+    """
+    Tamaño de celda para agrupar: una fracción del tile del zoom, agrandada
+    si el rectángulo daría más de VIEWPORT_MAX_CELLS_PER_AXIS celdas por eje.
+    Así la cantidad de clusters queda acotada sin importar el rectángulo.
+    """
+    cell = 360 / 2 ** zoom / settings.viewport_cells_per_tile
+    extent = max(bbox.max_lng - bbox.min_lng, bbox.max_lat - bbox.min_lat)
+    return max(cell, extent / settings.viewport_max_cells_per_axis)
+
+
+def wants_points(zoom: int) -> bool:
+    return zoom >= settings.viewport_points_min_zoom
+
+
+def points_viewport(rows: list[Row]) -> Viewport | None:
+    """Viewport con puntos, o None si hay más de los permitidos."""
+    if len(rows) > settings.viewport_max_points:
+        return None
+    return Viewport(False, None, len(rows), rows, [])
+
+
+def clusters_viewport(clusters: list[Row], cell_deg: float) -> Viewport:
+    return Viewport(True, cell_deg, sum(cluster.count for cluster in clusters), [], clusters)
+
+
+def fetch_viewport(db: Session, bbox: repo.BBox, zoom: int) -> Viewport:
+    """
+    Puntos del rectángulo si el zoom es alto y no pasan de
+    VIEWPORT_MAX_POINTS; si no, clusters por celda.
+    """
+    if wants_points(zoom):
+        viewport = points_viewport(
+            repo.get_viewport_points(db, bbox, settings.viewport_max_points)
+        )
+        if viewport is not None:
+            return viewport
+    
+    cell_deg = viewport_cell_deg(bbox, zoom)
+    return clusters_viewport(repo.get_viewport_clusters(db, bbox, cell_deg), cell_deg)
+
+
+def cluster_to_dict(cluster: Row) -> dict:
+    return {
+        "lat": float(cluster.lat),
+        "lng": float(cluster.lng),
+        "count": cluster.count,
+        "id": cluster.id,
+    }
+
+
+def get_viewport(db: Session, bbox: repo.BBox, zoom: int) -> ViewportResponse:
+    """Puntos o clusters dentro de un rectángulo del mapa."""
+    viewport = fetch_viewport(db, bbox, zoom)
+    return ViewportResponse(
+        zoom=zoom,
+        clustered=viewport.clustered,
+        cell_deg=viewport.cell_deg,
+        total=viewport.total,
+        points=list(map(to_response, viewport.points)),
+        clusters=[ViewportCluster(**cluster_to_dict(cluster)) for cluster in viewport.clusters]
+    )
+
+
+@timed("serialize")
+def encode_viewport(viewport: Viewport, zoom: int) -> bytes:
+    """Serializa con la forma de ViewportResponse."""
+    return json_encoder.dumps({
+        "zoom": zoom,
+        "clustered": viewport.clustered,
+        "cell_deg": viewport.cell_deg,
+        "total": viewport.total,
+        "points": list(map(to_dict, viewport.points)),
+        "clusters": list(map(cluster_to_dict, viewport.clusters)),
+    })
+
+
+def get_viewport_json(db: Session, bbox: repo.BBox, zoom: int) -> bytes:
+    """get_viewport serializado directo a JSON."""
+    return encode_viewport(fetch_viewport(db, bbox, zoom), zoom)
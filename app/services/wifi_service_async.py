@@ -0,0 +1,194 @@
+"""
+Variantes async de las lecturas de wifi_service (DB_ASYNC=true).
+
+Solo cambia el acceso a datos: la paginación, los cursores, la
+serialización y la caché son las mismas funciones del servicio síncrono,
+así que las respuestas son idénticas byte a byte.
+"""
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.repositories import wifi_repository_async as repo
+from app.repositories.wifi_repository import BBox
+from app.services import nearby_index, response_cache, totals
+from app.services.response_cache import CachedResponse
+from app.schemas.wifi_point import NearbyBatchQuery
+from app.services.wifi_service import (
+    attach_batch_rows,
+    attach_rows,
+    batch_ids,
+    batch_params,
+    build_pagination,
+    clusters_viewport,
+    decode_id_cursor,
+    decode_nearby_cursor,
+    encode_batch,
+    encode_nearest,
+    encode_page,
+    encode_viewport,
+    group_batch_rows,
+    max_limit,
+    nearby_page,
+    nearest_ids,
+    nearest_pairs,
+    points_viewport,
+    search_index,
+    search_index_batch,
+    search_nearest,
+    split_nearby,
+    split_page,
+    to_dict,
+    to_dict_with_distance,
+    viewport_cell_deg,
+    wants_points,
+)
+from app.utils import json_encoder
+from app.utils.text import normalize_key
+
+
+async def get_by_id_json(db: AsyncSession, wifi_id: str) -> bytes | None:
+    point = await repo.get_row_by_id(db, wifi_id)
+    return json_encoder.dumps(to_dict(point)) if point else None
+
+
+async def get_all_json(
+    db: AsyncSession,
+    page: int,
+    limit: int,
+    include_total: bool,
+    after: str | None = None
+) -> bytes:
+    after_id = decode_id_cursor(after) if after else None
+    points, next_cursor = split_page(await repo.get_all(db, page, limit, after_id), limit)
+    total = await totals.total_all_async(db) if include_total else None
+    pagination = build_pagination(page, limit, total, next_cursor)
+    return encode_page(list(map(to_dict, points)), pagination)
+
+
+async def get_by_alcaldia_json(
+    db: AsyncSession,
+    alcaldia: str,
+    page: int,
+    limit: int,
+    include_total: bool,
+    after: str | None = None
+) -> bytes:
+    after_id = decode_id_cursor(after) if after else None
+    points, next_cursor = split_page(
+        await repo.get_by_alcaldia(db, alcaldia, page, limit, after_id), limit
+    )
+    total = await totals.total_by_alcaldia_async(db, alcaldia) if include_total else None
+    pagination = build_pagination(page, limit, total, next_cursor)
+    return encode_page(list(map(to_dict, points)), pagination)
+
+
+async def get_by_id_cached(db: AsyncSession, wifi_id: str) -> CachedResponse | None:
+    """Ver wifi_service.get_by_id_cached."""
+    return await response_cache.get_or_build_async(
+        ("get_by_id", wifi_id),
+        lambda: get_by_id_json(db, wifi_id)
+    )
+
+
+async def get_all_cached(
+    db: AsyncSession,
+    page: int = 1,
+    limit: int = settings.default_page_size,
+    include_total: bool = True,
+    after: str | None = None
+) -> CachedResponse:
+    """Ver wifi_service.get_all_cached."""
+    limit = max_limit(limit)
+    return await response_cache.get_or_build_async(
+        ("get_all", page, limit, include_total, after),
+        lambda: get_all_json(db, page, limit, include_total, after)
+    )
+
+
+async def get_by_alcaldia_cached(
+    db: AsyncSession,
+    alcaldia: str,
+    page: int = 1,
+    limit: int = settings.default_page_size,
+    include_total: bool = True,
+    after: str | None = None
+) -> CachedResponse:
+    """Ver wifi_service.get_by_alcaldia_cached."""
+    limit = max_limit(limit)
+    return await response_cache.get_or_build_async(
+        ("get_by_alcaldia", normalize_key(alcaldia), page, limit, include_total, after),
+        lambda: get_by_alcaldia_json(db, alcaldia, page, limit, include_total, after)
+    )
+
+
+async def get_nearby_json(
+    db: AsyncSession,
+    lat: float,
+    lng: float,
+    page: int = 1,
+    limit: int = settings.default_page_size,
+    radius_m: float | None = None,
+    cursor: str | None = None,
+    include_total: bool = True
+) -> bytes:
+    """Ver wifi_service.get_nearby_json."""
+    limit = max_limit(limit)
+    after = decode_nearby_cursor(cursor) if cursor else None
+    offset = 0 if after else (page - 1) * limit
+    
+    index = nearby_index.current()
+    if index is not None:
+        page_matches, has_more, total = search_index(
+            index, lat, lng, limit, offset, radius_m, after, include_total
+        )
+        points = await repo.get_rows_by_ids(db, [wifi_id for wifi_id, _, _ in page_matches])
+        page_results = attach_rows(page_matches, points)
+    else:
+        results = await repo.get_nearby(db, lat, lng, limit, offset, radius_m, after)
+        page_results, has_more = split_nearby(results, limit)
+        total = None
+        if include_total:
+            total = await totals.total_nearby_async(db, lat, lng, radius_m)
+    
+    results, pagination = nearby_page(page_results, has_more, page, limit, total)
+    data = [to_dict_with_distance(point, distance) for point, distance in results]
+    return encode_page(data, pagination)
+
+
+async def get_nearby_batch_json(db: AsyncSession, queries: list[NearbyBatchQuery]) -> bytes:
+    """Ver wifi_service.get_nearby_batch_json."""
+    params = batch_params(queries)
+    
+    index = nearby_index.current()
+    if index is not None:
+        matches = search_index_batch(index, params)
+        points = await repo.get_rows_by_ids(db, batch_ids(matches))
+        return encode_batch(queries, attach_batch_rows(matches, points))
+    
+    rows = await repo.get_nearby_batch(db, params)
+    return encode_batch(queries, group_batch_rows(rows, len(params)))
+
+
+async def get_nearest_json(db: AsyncSession, lat: float, lng: float, k: int) -> bytes:
+    """Ver wifi_service.get_nearest_json."""
+    matches = search_nearest(lat, lng, k)
+    if matches is not None:
+        points = await repo.get_rows_by_ids(db, nearest_ids(matches))
+        return encode_nearest(lat, lng, nearest_pairs(matches, points))
+    
+    rows = await repo.get_nearby(db, lat, lng, k)
+    return encode_nearest(lat, lng, [(row, row.distancia_metros) for row in rows[:k]])
+
+
+async def get_viewport_json(db: AsyncSession, bbox: BBox, zoom: int) -> bytes:
+    """Ver wifi_service.get_viewport_json."""
+    if wants_points(zoom):
+        viewport = points_viewport(
+            await repo.get_viewport_points(db, bbox, settings.viewport_max_points)
+        )
+        if viewport is not None:
+            return encode_viewport(viewport, zoom)
+    
+    cell_deg = viewport_cell_deg(bbox, zoom)
+    clusters = await repo.get_viewport_clusters(db, bbox, cell_deg)
+    return encode_viewport(clusters_viewport(clusters, cell_deg), zoom)
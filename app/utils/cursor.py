@@ -0,0 +1,31 @@
+"""
+Cursores opacos para paginación por keyset.
+
+El cliente solo ve una cadena base64; el contenido (distancia, id, ...)
+lo decide cada endpoint.
+"""
+import base64
+import json
+
+
+class InvalidCursorError(ValueError):
+    """El cursor recibido no se puede decodificar."""
+
+
+def encode_cursor(values: dict) -> str:
+    """Serializa un diccionario como cursor opaco (base64 url-safe)."""
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> dict:
+    """Decodifica un cursor generado con encode_cursor."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Cursor inválido") from e
+
+    if not isinstance(values, dict):
+        raise InvalidCursorError("Cursor inválido")
+    return values
@@ -0,0 +1,109 @@
+"""
+Reparto de lecturas entre réplicas.
+
+ReadRouter elige una réplica por turno (round_robin) o la que tiene menos
+conexiones en uso (least_busy). Si una réplica no acepta la conexión se
+marca caída durante retry_after segundos y se prueba la siguiente; si no
+queda ninguna, la lectura va al primario.
+
+ReadSession pide la conexión al router en su primera consulta, así que
+una respuesta servida desde la caché no toca ningún pool. Con
+AsyncSession se usa como sync_session_class y recibe los motores síncronos
+(AsyncEngine.sync_engine).
+"""
+import itertools
+import threading
+import time
+
+from sqlalchemy import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from app.utils.pool_metrics import pool_stats
+
+STRATEGIES = ("round_robin", "least_busy")
+
+
+class ReadRouter:
+    """Selección de motor para lecturas con respaldo en el primario."""
+    
+    def __init__(
+        self,
+        primary: Engine,
+        replicas: list[Engine],
+        strategy: str = "round_robin",
+        retry_after: float = 30.0
+    ):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Estrategia de réplicas no válida: {strategy}")
+        
+        self.primary = primary
+        self.replicas = replicas
+        self.strategy = strategy
+        self.retry_after = retry_after
+        self._turn = itertools.count()
+        self._down_until = [0.0] * len(replicas)
+        self._lock = threading.Lock()
+    
+    def candidates(self) -> list[int]:
+        """Índices de las réplicas disponibles, en el orden en que se prueban."""
+        now = time.monotonic()
+        available = [i for i, until in enumerate(self._down_until) if until <= now]
+        if not available:
+            return []
+        
+        if self.strategy == "least_busy":
+            return sorted(available, key=lambda i: self.replicas[i].pool.checkedout())
+        
+        start = next(self._turn) % len(available)
+        return available[start:] + available[:start]
+    
+    def mark_down(self, index: int) -> None:
+        with self._lock:
+            self._down_until[index] = time.monotonic() + self.retry_after
+    
+    def connect(self) -> Connection:
+        """Conexión de lectura desde una réplica, o desde el primario."""
+        for index in self.candidates():
+            try:
+                return self.replicas[index].connect()
+            except (DBAPIError, OSError):
+                self.mark_down(index)
+        return self.primary.connect()
+    
+    def stats(self) -> dict:
+        """Métricas del pool del primario y de cada réplica."""
+        now = time.monotonic()
+        return {
+            "primary": pool_stats(self.primary.pool),
+            "replicas": [
+                {
+                    "url": replica.url.render_as_string(hide_password=True),
+                    "down": self._down_until[i] > now,
+                    **pool_stats(replica.pool),
+                }
+                for i, replica in enumerate(self.replicas)
+            ],
+        }
+
+
+class ReadSession(Session):
+    """Sesión de solo lectura que toma su conexión del ReadRouter al primer uso."""
+    
+    def __init__(self, router: ReadRouter, **kwargs):
+        super().__init__(**kwargs)
+        self.router = router
+        self._read_connection: Connection | None = None
+    
+    def get_bind(self, *args, **kwargs) -> Connection:
+        if self._read_connection is None:
+            self._read_connection = self.router.connect()
+        return self._read_connection
+    
+    def close(self) -> None:
+        try:
+            super().close()
+        finally:
+            if self._read_connection is not None:
+                self._read_connection.close()
+                self._read_connection = None
@@ -1,29 +1,372 @@
-import pandas as pd
+"""
+Lectura de archivos de importación.
+
+Formatos aceptados según la extensión del nombre:
+
+- CSV (.csv), también comprimido (.csv.gz, .gz, .zip con un CSV adentro)
+- Parquet (.parquet, .pq) y Arrow IPC / Feather (.arrow, .feather, .ipc)
+- Excel (.xlsx, .xls)
+
+En los CSV la codificación y el separador se detectan una sola vez con una
+muestra del inicio. Con pyarrow instalado los CSV se leen con su lector
+(multihilo y sin objetos intermedios); si no, con el motor C de pandas.
+Si se pasan `columns` solo se leen esas columnas (las que existan) y los
+textos de los CSV quedan como str, sin inferir tipos: la validación de la
+importación se encarga de convertir las coordenadas.
+"""
+import codecs
+import csv
+import gzip
+import importlib.util
+import zipfile
+from collections.abc import Iterable, Iterator, Sequence
 from io import BytesIO
+from itertools import islice
+from typing import BinaryIO
+
+import pandas as pd
+
+# Bytes que se leen para detectar codificación y separador del CSV
+SNIFF_SIZE = 64 * 1024
+
+# Tamaño de bloque del lector de CSV de pyarrow
+ARROW_BLOCK_SIZE = 4 * 1024 * 1024
+
+# Números que acepta parse_decimal_arrow (ya con punto decimal)
+DECIMAL_PATTERN = r"^[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?$"
+
+# Extensión -> (formato, compresión); se revisan en orden
+FORMATS = (
+    (".csv.gz", ("csv", "gzip")),
+    (".csv.zip", ("csv", "zip")),
+    (".csv", ("csv", None)),
+    (".gz", ("csv", "gzip")),
+    (".zip", ("csv", "zip")),
+    (".parquet", ("parquet", None)),
+    (".pq", ("parquet", None)),
+    (".arrow", ("arrow", None)),
+    (".feather", ("arrow", None)),
+    (".ipc", ("arrow", None)),
+    (".xlsx", ("xlsx", None)),
+    (".xls", ("xls", None)),
+)
+
+
+def has_pyarrow() -> bool:
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def detect_format(filename: str) -> tuple[str, str | None]:
+    """
+    Formato y compresión a partir del nombre del archivo.
+    
+    Raises:
+        ValueError: si la extensión no está soportada
+    """
+    name = filename.lower()
+    for suffix, detected in FORMATS:
+        if name.endswith(suffix):
+            return detected
+    raise ValueError(f"Formato no soportado: {filename}")
+
+
+def select_columns(available: Sequence[str], columns: Sequence[str] | None) -> list[str] | None:
+    """Columnas pedidas que existen en el archivo, o None para leer todas."""
+    if columns is None:
+        return None
+    return [name for name in available if name in columns]
+
+
+def read_file(
+    content: bytes,
+    filename: str,
+    columns: Sequence[str] | None = None
+) -> pd.DataFrame:
+    """
+    Lee un archivo completo y retorna un DataFrame.
+    
+    Args:
+        content: Contenido del archivo
+        filename: Nombre del archivo (define el formato)
+        columns: Columnas a leer; las que falten en el archivo se omiten
+    """
+    stream = BytesIO(content)
+    fmt, compression = detect_format(filename)
+    
+    if fmt == "csv":
+        return read_csv(open_csv(stream, compression), columns)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        
+        parquet = pq.ParquetFile(stream)
+        present = select_columns(parquet.schema_arrow.names, columns)
+        return arrow_frame(parquet.read(columns=present))
+    if fmt == "arrow":
+        table = open_ipc(stream).read_all()
+        present = select_columns(table.column_names, columns)
+        return arrow_frame(table.select(present) if present is not None else table)
+    
+    return read_excel(stream, columns)
 
 
-def read_file(content: bytes, filename: str) -> pd.DataFrame:
+def iter_chunks(
+    stream: BinaryIO,
+    filename: str,
+    chunk_size: int,
+    columns: Sequence[str] | None = None
+) -> Iterator[pd.DataFrame]:
     """
-    Lee un archivo CSV o Excel y retorna un DataFrame.
+    Lee un archivo por bloques de chunk_size filas.
+    
+    El índice de cada bloque continúa el del anterior, igual que si se
+    hubiera leído todo con read_file.
     """
-    buffer = BytesIO(content)
+    fmt, compression = detect_format(filename)
+    
+    if fmt == "csv":
+        yield from iter_csv(open_csv(stream, compression), chunk_size, columns)
     
-    if filename.endswith(".csv"):
+    elif fmt == "parquet":
+        import pyarrow.parquet as pq
+        
+        parquet = pq.ParquetFile(stream)
+        present = select_columns(parquet.schema_arrow.names, columns)
+        yield from frames_from_batches(
+            parquet.iter_batches(batch_size=chunk_size, columns=present), chunk_size
+        )
+    
+    elif fmt == "arrow":
+        reader = open_ipc(stream)
+        present = select_columns(reader.schema.names, columns)
+        batches = iter_ipc_batches(reader)
+        if present is not None:
+            batches = (batch.select(present) for batch in batches)
+        yield from frames_from_batches(batches, chunk_size)
+    
+    elif fmt == "xlsx":
+        yield from _iter_excel_chunks(stream, chunk_size, columns)
+    
+    else:
+        df = read_excel(stream, columns)
+        for start in range(0, len(df), chunk_size):
+            yield df.iloc[start:start + chunk_size]
+
+
+def sniff_csv(sample: bytes) -> tuple[str, str]:
+    """
+    Detecta codificación y separador a partir de una muestra del CSV.
+    
+    Returns:
+        Tupla con (encoding, separador)
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        encoding = "utf-8-sig"
+    else:
         try:
-            return pd.read_csv(buffer, encoding="utf-8")
-        except:
-            buffer.seek(0) 
-            try:
-                return pd.read_csv(buffer, encoding="latin-1")
-            except:
-                buffer.seek(0)
-                return pd.read_csv(buffer, encoding="utf-8", sep=";")
+            sample.decode("utf-8")
+            encoding = "utf-8"
+        except UnicodeDecodeError as e:
+            # La muestra puede cortar un carácter multibyte al final
+            encoding = "utf-8" if e.start >= len(sample) - 3 else "latin-1"
+    
+    header = sample.split(b"\n", 1)[0]
+    sep = ";" if header.count(b";") > header.count(b",") else ","
+    return encoding, sep
+
+
+def csv_header(sample: bytes, encoding: str, sep: str) -> list[str]:
+    """Nombres de columna de la primera línea de la muestra."""
+    first_line = sample.split(b"\n", 1)[0].decode(encoding, errors="replace").rstrip("\r")
+    return next(csv.reader([first_line], delimiter=sep), [])
+
+
+def open_csv(stream: BinaryIO, compression: str | None) -> BinaryIO:
+    """Stream con el CSV descomprimido."""
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=stream)
+    
+    if compression == "zip":
+        archive = zipfile.ZipFile(stream)
+        members = [info for info in archive.infolist() if not info.is_dir()]
+        csv_members = [info for info in members if info.filename.lower().endswith(".csv")]
+        if len(csv_members) != 1 and len(members) != 1:
+            raise ValueError("El ZIP debe contener un solo archivo CSV")
+        return archive.open((csv_members or members)[0])
+    
+    return stream
+
+
+def sniff_stream(stream: BinaryIO) -> tuple[str, str, list[str]]:
+    """Codificación, separador y encabezado; deja el stream al inicio."""
+    sample = stream.read(SNIFF_SIZE)
+    stream.seek(0)
+    encoding, sep = sniff_csv(sample)
+    return encoding, sep, csv_header(sample, encoding, sep)
+
+
+def read_csv(
+    stream: BinaryIO,
+    columns: Sequence[str] | None,
+    dialect: tuple[str, str, list[str]] | None = None
+) -> pd.DataFrame:
+    """
+    Lee un CSV completo.
+    
+    dialect (encoding, separador, encabezado, como sniff_stream) evita
+    volver a detectarlos, p. ej. en cada parte de un archivo partido.
+    """
+    encoding, sep, header = dialect or sniff_stream(stream)
+    present = select_columns(header, columns)
+    
+    if has_pyarrow():
+        from pyarrow import csv as pa_csv
+        
+        return arrow_frame(pa_csv.read_csv(stream, *arrow_csv_options(encoding, sep, header, present)))
+    
+    return pd.read_csv(stream, encoding=encoding, sep=sep, usecols=present, dtype=str)
+
+
+def iter_csv(
+    stream: BinaryIO,
+    chunk_size: int,
+    columns: Sequence[str] | None
+) -> Iterator[pd.DataFrame]:
+    encoding, sep, header = sniff_stream(stream)
+    present = select_columns(header, columns)
+    
+    if has_pyarrow():
+        from pyarrow import csv as pa_csv
+        
+        reader = pa_csv.open_csv(stream, *arrow_csv_options(encoding, sep, header, present))
+        yield from frames_from_batches(reader, chunk_size)
+    else:
+        yield from pd.read_csv(
+            stream, encoding=encoding, sep=sep, usecols=present, dtype=str, chunksize=chunk_size
+        )
+
+
+def arrow_csv_options(encoding: str, sep: str, header: list[str], present: list[str] | None):
+    """
+    Opciones del lector de pyarrow equivalentes a read_csv(dtype=str).
+    
+    Todas las columnas se leen como texto y los vacíos (y "NA", "null",
+    etc.) como nulos, igual que en pandas.
+    """
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    
+    return (
+        pa_csv.ReadOptions(
+            # pyarrow descarta el BOM de UTF-8 por su cuenta
+            encoding="utf8" if encoding.startswith("utf-8") else encoding,
+            block_size=ARROW_BLOCK_SIZE
+        ),
+        pa_csv.ParseOptions(delimiter=sep),
+        pa_csv.ConvertOptions(
+            include_columns=present or [],
+            column_types={name: pa.string() for name in header},
+            strings_can_be_null=True
+        ),
+    )
+
+
+def open_ipc(stream: BinaryIO):
+    """Lector de Arrow IPC en formato archivo (Feather v2) o stream."""
+    import pyarrow as pa
+    
+    try:
+        return pa.ipc.open_file(stream)
+    except pa.ArrowInvalid:
+        stream.seek(0)
+        return pa.ipc.open_stream(stream)
+
+
+def iter_ipc_batches(reader) -> Iterator:
+    if hasattr(reader, "get_batch"):
+        return (reader.get_batch(i) for i in range(reader.num_record_batches))
+    return iter(reader)
+
+
+def arrow_frame(table, offset: int = 0) -> pd.DataFrame:
+    """
+    Convierte una tabla de Arrow a DataFrame con índice desde offset.
+    
+    Las columnas no decimales (ids numéricos, por ejemplo) pasan a texto
+    como en los CSV; las de punto flotante quedan como float.
+    """
+    import pyarrow as pa
+    
+    for i, field in enumerate(table.schema):
+        if not (pa.types.is_string(field.type) or pa.types.is_floating(field.type)):
+            table = table.set_column(i, field.name, table.column(i).cast(pa.string()))
+    
+    # Los textos quedan en memoria de Arrow (StringDtype "pyarrow"): sin un
+    # objeto de Python por celda y con las operaciones .str en C
+    df = table.to_pandas(types_mapper={pa.string(): pd.StringDtype("pyarrow")}.get)
+    df.index = pd.RangeIndex(offset, offset + len(df))
+    return df
+
+
+def frames_from_batches(batches: Iterable, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Reagrupa record batches de Arrow en DataFrames de chunk_size filas."""
+    import pyarrow as pa
     
-    elif filename.endswith((".xlsx", ".xls")):
-        return pd.read_excel(buffer)
+    pending = []
+    pending_rows = 0
+    offset = 0
+    for batch in batches:
+        pending.append(batch)
+        pending_rows += batch.num_rows
+        while pending_rows >= chunk_size:
+            table = pa.Table.from_batches(pending)
+            yield arrow_frame(table.slice(0, chunk_size), offset)
+            offset += chunk_size
+            rest = table.slice(chunk_size)
+            pending, pending_rows = rest.to_batches(), rest.num_rows
     
-    else: 
-        raise ValueError(f"Formato no soportado: {filename}")
+    if pending_rows:
+        yield arrow_frame(pa.Table.from_batches(pending), offset)
+
+
+def read_excel(stream: BinaryIO, columns: Sequence[str] | None) -> pd.DataFrame:
+    """Primera hoja completa; con python-calamine instalado se usa ese motor (mucho más rápido)."""
+    engine = "calamine" if importlib.util.find_spec("python_calamine") else None
+    usecols = (lambda name: name in columns) if columns is not None else None
+    return pd.read_excel(stream, engine=engine, usecols=usecols, dtype=str)
+
+
+def _iter_excel_chunks(
+    stream: BinaryIO,
+    chunk_size: int,
+    columns: Sequence[str] | None = None
+) -> Iterator[pd.DataFrame]:
+    """Recorre la primera hoja en modo read_only sin cargarla completa."""
+    from openpyxl import load_workbook
+    
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        
+        names = list(header)
+        present = select_columns(names, columns)
+        if present is None:
+            present = names
+        positions = [names.index(name) for name in present]
+        
+        offset = 0
+        while batch := list(islice(rows, chunk_size)):
+            # Texto como en read_excel(dtype=str): un id numérico no pasa por float
+            yield pd.DataFrame(
+                [[None if row[i] is None else str(row[i]) for i in positions] for row in batch],
+                columns=present,
+                index=range(offset, offset + len(batch))
+            )
+            offset += len(batch)
+    finally:
+        workbook.close()
 
 
 def parse_decimal(value) -> float | None:
@@ -33,4 +376,36 @@ def parse_decimal(value) -> float | None:
     try:
         return float(str(value).replace(",", "."))
     except (ValueError, TypeError):
-        return None
\ No newline at end of file
+        return None
+
+
+def parse_decimal_series(values: pd.Series) -> pd.Series:
+    """
+    Versión vectorizada de parse_decimal, como float64.
+    
+    Acepta coma decimal y deja NaN donde el valor falta, no es numérico o
+    no es finito (inf, nan). Los textos se aceptan con DECIMAL_PATTERN, así
+    que el resultado no depende de si el lector dejó texto de Arrow u objetos.
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        numbers = values.astype("float64")
+    elif isinstance(values.dtype, pd.StringDtype) and values.dtype.storage == "pyarrow":
+        numbers = parse_decimal_arrow(values)
+    else:
+        text = values.astype(str).str.strip().str.replace(",", ".", regex=False)
+        text = text.where(values.notna() & text.str.match(DECIMAL_PATTERN))
+        numbers = pd.to_numeric(text, errors="coerce").astype("float64")
+    # inf (1e999 en texto o una celda numérica) no es una coordenada
+    return numbers.where(numbers.abs() != float("inf"))
+
+
+def parse_decimal_arrow(values: pd.Series) -> pd.Series:
+    """parse_decimal_series para texto de Arrow, con pyarrow.compute en lugar de to_numeric."""
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    
+    text = pc.replace_substring(pc.utf8_trim_whitespace(pa.array(values.array)), ",", ".")
+    numbers = pc.if_else(pc.match_substring_regex(text, DECIMAL_PATTERN), text, None)
+    return pd.Series(
+        pc.cast(numbers, pa.float64()).to_numpy(zero_copy_only=False), index=values.index
+    )
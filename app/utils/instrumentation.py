@@ -0,0 +1,225 @@
+"""
+Instrumentación de peticiones, consultas SQL y etapas de trabajo.
+
+- TimingMiddleware mide cada petición y la cuenta por ruta (la plantilla,
+  p. ej. /api/v1/wifi-points/{wifi_id}, no la URL) y por status.
+- install_sql_hooks() escucha los eventos de cursor de SQLAlchemy en
+  todos los motores (también el sync_engine de cada AsyncEngine): tiempo
+  por tipo de sentencia, consultas lentas y el acumulado de la petición.
+- stage() / timed() miden etapas con nombre (lectura, validación,
+  escritura, serialización...).
+
+Lo de cada petición se acumula en un RequestTimings guardado en un
+ContextVar; run_in_threadpool y los greenlets del stack async copian el
+contexto, así que las consultas de las rutas síncronas y async llegan a
+la petición correcta. Con server_timing el middleware lo devuelve en la
+cabecera Server-Timing.
+"""
+import functools
+import logging
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from sqlalchemy import Engine, event
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.utils.metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Las etapas de importación van de milisegundos a minutos
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+# Primeras palabras de sentencia que se usan como etiqueta; el resto es OTHER
+OPERATIONS = frozenset(("SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "COPY", "CREATE",
+                        "DROP", "TRUNCATE", "ANALYZE", "BEGIN", "COMMIT", "ROLLBACK"))
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds",
+    "Duración de las peticiones HTTP por ruta",
+    ("method", "route", "status")
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Consultas SQL por petición",
+    ("route",),
+    QUERY_COUNT_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Tiempo en SQL por petición",
+    ("route",)
+)
+QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Duración de cada sentencia SQL por tipo",
+    ("operation",)
+)
+SLOW_QUERIES = Counter(
+    "db_slow_queries",
+    "Sentencias que superaron SLOW_QUERY_MS",
+    ("operation",)
+)
+STAGE_SECONDS = Histogram(
+    "stage_duration_seconds",
+    "Duración de las etapas de importación y serialización",
+    ("stage",),
+    STAGE_BUCKETS
+)
+
+METRICS = (REQUEST_SECONDS, REQUEST_QUERIES, REQUEST_DB_SECONDS, QUERY_SECONDS,
+           SLOW_QUERIES, STAGE_SECONDS)
+
+
+class RequestTimings:
+    """Consultas, tiempo en SQL y etapas de la petición en curso."""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.stages: dict[str, float] = {}
+    
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+    
+    def server_timing(self, now: float) -> str:
+        """Valor de la cabecera Server-Timing (duraciones en ms)."""
+        entries = [
+            f"app;dur={(now - self.start) * 1000:.2f}",
+            f'db;dur={self.db_seconds * 1000:.2f};desc="{self.queries} queries"',
+        ]
+        entries.extend(
+            f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.stages.items()
+        )
+        return ", ".join(entries)
+
+
+_current: ContextVar[RequestTimings | None] = ContextVar("request_timings", default=None)
+_hooks_installed = False
+
+
+def current() -> RequestTimings | None:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Mide una etapa: va al histograma y, dentro de una petición, a su Server-Timing."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, name)
+        timings = _current.get()
+        if timings is not None:
+            timings.add_stage(name, elapsed)
+
+
+def timed(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorador equivalente a envolver la función en stage(name)."""
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def statement_operation(statement: str) -> str:
+    words = statement.lstrip(" \t\n(").split(None, 1)
+    operation = words[0].upper() if words else ""
+    return operation if operation in OPERATIONS else "OTHER"
+
+
+def install_sql_hooks(slow_query_ms: float = 0) -> None:
+    """
+    Registra los eventos de cursor en la clase Engine (todos los motores).
+    
+    slow_query_ms > 0 escribe un warning con la sentencia cuando una
+    consulta tarda al menos eso. Las llamadas siguientes no hacen nada.
+    """
+    global _hooks_installed
+    if _hooks_installed:
+        return
+    _hooks_installed = True
+    
+    @event.listens_for(Engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+    
+    @event.listens_for(Engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        operation = statement_operation(statement)
+        QUERY_SECONDS.observe(elapsed, operation)
+        
+        timings = _current.get()
+        if timings is not None:
+            timings.queries += 1
+            timings.db_seconds += elapsed
+        
+        if slow_query_ms > 0 and elapsed * 1000 >= slow_query_ms:
+            SLOW_QUERIES.inc(operation)
+            logger.warning("Consulta lenta (%.1f ms): %s", elapsed * 1000, statement[:1000])
+    
+    @event.listens_for(Engine, "handle_error")
+    def handle_error(exception_context):
+        # after_cursor_execute no corre si la sentencia falla
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_start"):
+            connection.info["query_start"].pop()
+
+
+def route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+class TimingMiddleware:
+    """
+    Middleware ASGI que mide las peticiones HTTP.
+    
+    Con server_timing agrega la cabecera Server-Timing con el tiempo total
+    hasta el inicio de la respuesta, el tiempo en SQL y las etapas medidas.
+    """
+    
+    def __init__(self, app: ASGIApp, server_timing: bool = False):
+        self.app = app
+        self.server_timing = server_timing
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        timings = RequestTimings()
+        token = _current.set(timings)
+        status = 500
+        
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", timings.server_timing(time.perf_counter()))
+            await send(message)
+        
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = route_template(scope)
+            REQUEST_SECONDS.observe(
+                time.perf_counter() - timings.start, scope["method"], route, str(status)
+            )
+            REQUEST_QUERIES.observe(timings.queries, route)
+            REQUEST_DB_SECONDS.observe(timings.db_seconds, route)
@@ -0,0 +1,36 @@
+"""
+Serialización JSON rápida para las respuestas de lectura.
+
+Usa orjson si está instalado y si no la librería estándar. Decimal y
+datetime se escriben igual que en Pydantic, así que el JSON resultante
+es el mismo que el de los schemas.
+"""
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+
+def default(value: Any) -> Any:
+    """Tipos que el serializador no maneja por sí solo."""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat().replace("+00:00", "Z")
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """Serializa a JSON compacto en UTF-8."""
+    if orjson is not None:
+        return orjson.dumps(value, default=default, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        value, default=default, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
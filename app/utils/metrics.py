@@ -0,0 +1,194 @@
+"""
+Métricas en el formato de texto de Prometheus.
+
+Contadores, histogramas y gauges con etiquetas, seguros entre hilos, y
+render() para armar la respuesta de /metrics. Cubre solo lo que usa la
+aplicación (sin timestamps ni exemplars), así que no hace falta
+prometheus_client.
+"""
+import math
+import threading
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections.abc import Iterable, Sequence
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Segundos: de 5 ms a 10 s, como los buckets por omisión de Prometheus
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{escape(str(value))}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class Metric(ABC):
+    """Base: nombre, ayuda, nombres de etiquetas y un lock por métrica."""
+    
+    kind = "untyped"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+    
+    def _key(self, labels: Sequence[str]) -> tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} espera las etiquetas {self.labelnames}")
+        return tuple(str(label) for label in labels)
+    
+    @abstractmethod
+    def samples(self) -> Iterable[tuple[str, str, float]]:
+        """(sufijo del nombre, etiquetas ya formateadas, valor)."""
+    
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {escape(self.documentation)}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(
+            f"{self.name}{suffix}{labels} {format_value(value)}"
+            for suffix, labels, value in self.samples()
+        )
+        return "\n".join(lines) + "\n"
+
+
+class Counter(Metric):
+    """
+    Valor que solo crece; se publica como <nombre>_total.
+    
+    inc() lo acumula en la métrica; set() publica un total que ya lleva
+    otro objeto (los pools, las cachés) al momento del scrape.
+    """
+    
+    kind = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+    
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def set(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+    
+    def value(self, *labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+    
+    def samples(self) -> Iterable[tuple[str, str, float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [("_total", format_labels(self.labelnames, key), value) for key, value in values]
+
+
+class Gauge(Metric):
+    """Valor que sube y baja; en /metrics se llena al momento de leerlo."""
+    
+    kind = "gauge"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+    
+    def set(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+    
+    def samples(self) -> Iterable[tuple[str, str, float]]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [("", format_labels(self.labelnames, key), value) for key, value in values]
+
+
+class Histogram(Metric):
+    """
+    Distribución en buckets acumulados (le) más suma y conteo.
+    
+    Los conteos se guardan por bucket y se acumulan al renderizar, así que
+    observe() es una búsqueda binaria y dos sumas bajo el lock.
+    """
+    
+    kind = "histogram"
+    
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # counts, sum por combinación de etiquetas; el último bucket es +Inf
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+    
+    def observe(self, value: float, *labels: str) -> None:
+        key = self._key(labels)
+        position = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][position] += 1
+            series[1][0] += value
+    
+    def snapshot(self, *labels: str) -> tuple[list[int], float, int]:
+        """Conteos acumulados por bucket, suma y conteo de una serie."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            counts = list(series[0]) if series else [0] * (len(self.buckets) + 1)
+            total = series[1][0] if series else 0.0
+        cumulative = []
+        running = 0
+        for count in counts:
+            running += count
+            cumulative.append(running)
+        return cumulative, total, running
+    
+    def samples(self) -> Iterable[tuple[str, str, float]]:
+        with self._lock:
+            keys = sorted(self._series)
+        names = (*self.labelnames, "le")
+        bounds = [*map(format_value, self.buckets), "+Inf"]
+        out = []
+        for key in keys:
+            cumulative, total, count = self.snapshot(*key)
+            out.extend(
+                ("_bucket", format_labels(names, (*key, bound)), value)
+                for bound, value in zip(bounds, cumulative)
+            )
+            labels = format_labels(self.labelnames, key)
+            out.append(("_sum", labels, total))
+            out.append(("_count", labels, count))
+        return out
+
+
+def render(metrics: Iterable[Metric]) -> str:
+    """Texto de exposición de Prometheus (versión 0.0.4)."""
+    return "".join(metric.render() for metric in metrics)
@@ -0,0 +1,166 @@
+"""
+Rejilla precalculada para los k vecinos más cercanos.
+
+Cada celda de una rejilla fija sobre la extensión del dataset guarda los
+candidatos que pueden estar entre los k más cercanos de cualquier punto
+de la celda (una asignación tipo Voronoi). Una consulta busca su celda y
+solo calcula la distancia exacta a esos candidatos.
+
+Para una celda con centro c y radio h (distancia de c a su esquina más
+lejana), si d_k es la distancia de c a su k-ésimo vecino, los k vecinos
+de cualquier consulta q de la celda están a lo más a d_k + h de q, y por
+lo tanto a d_k + 2h de c. La celda guarda todos los puntos de ese
+círculo, así que el resultado (con los empates ordenados por id) es el
+mismo que el de SpatialIndex.nearest y repo.get_nearby. Las celdas con
+más de max_candidates quedan sin lista y la consulta cae a la búsqueda
+normal.
+"""
+import math
+import time
+
+import numpy as np
+
+from app.utils.spatial_index import (
+    KNN_EARTH_RADIUS, SPHERE_EARTH_RADIUS, SpatialIndex, central_angle,
+)
+
+# Holgura relativa del radio de candidatos por redondeo de punto flotante
+RADIUS_SLACK = 1e-9
+
+
+class NearestGrid:
+    """
+    Listas de candidatos por celda en formato CSR (offsets + posiciones).
+    
+    Las posiciones apuntan a los arreglos del SpatialIndex con el que se
+    construyó, que se comparten sin copiarlos.
+    """
+    
+    def __init__(
+        self,
+        index: SpatialIndex,
+        k: int,
+        cell_deg: float,
+        max_cells: int = 250_000,
+        max_candidates: int = 64
+    ):
+        started = time.perf_counter()
+        self.index = index
+        self.k = k
+        
+        if len(index):
+            self.lat0, self.lng0 = float(index.lats.min()), float(index.lngs.min())
+            lat_span = float(index.lats.max()) - self.lat0
+            lng_span = float(index.lngs.max()) - self.lng0
+        else:
+            self.lat0 = self.lng0 = lat_span = lng_span = 0.0
+        
+        # Celdas más grandes si la extensión pasa de max_cells
+        self.cell = max(cell_deg, math.sqrt(lat_span * lng_span / max_cells))
+        self.n_rows = int(lat_span / self.cell) + 1
+        self.n_cols = int(lng_span / self.cell) + 1
+        
+        offsets = np.zeros(self.n_rows * self.n_cols + 1, dtype=np.int64)
+        self.fallback = np.zeros(self.n_rows * self.n_cols, dtype=bool)
+        members: list[np.ndarray] = []
+        total = 0
+        for row in range(self.n_rows):
+            for col in range(self.n_cols):
+                cell = row * self.n_cols + col
+                candidates = self.cell_candidates(row, col, max_candidates) if len(index) else None
+                if candidates is None:
+                    self.fallback[cell] = len(index) > 0
+                else:
+                    members.append(candidates)
+                    total += len(candidates)
+                offsets[cell + 1] = total
+        
+        self.offsets = offsets
+        self.members = (
+            np.concatenate(members).astype(np.int32) if members else np.empty(0, dtype=np.int32)
+        )
+        self.build_seconds = time.perf_counter() - started
+    
+    def cell_center(self, row: int, col: int) -> tuple[float, float]:
+        return self.lat0 + (row + 0.5) * self.cell, self.lng0 + (col + 0.5) * self.cell
+    
+    def cell_radius(self, row: int, col: int) -> float:
+        """Distancia (m, esfera KNN) del centro de la celda a su esquina más lejana."""
+        lat, lng = self.cell_center(row, col)
+        half = self.cell / 2
+        corners_lat = np.array([lat - half, lat - half, lat + half, lat + half])
+        corners_lng = np.array([lng - half, lng + half, lng - half, lng + half])
+        return float(central_angle(lat, lng, corners_lat, corners_lng).max()) * KNN_EARTH_RADIUS
+    
+    def cell_candidates(self, row: int, col: int, max_candidates: int) -> np.ndarray | None:
+        """Posiciones de los puntos a d_k + 2h del centro, o None si son demasiados."""
+        index = self.index
+        lat, lng = self.cell_center(row, col)
+        kth = index.nearest(lat, lng, self.k)
+        if len(kth) < self.k:
+            # Menos de k puntos en total: todos son candidatos
+            return np.arange(len(index)) if len(index) <= max_candidates else None
+        
+        radius = (kth[-1][2] + 2 * self.cell_radius(row, col)) * (1 + RADIUS_SLACK)
+        center_row, center_col = index.cell_of(lat, lng)
+        found: list[np.ndarray] = []
+        count = 0
+        r = 0
+        while True:
+            ring = index.ring_members(center_row, center_col, r)
+            if len(ring):
+                dist = central_angle(lat, lng, index.lats[ring], index.lngs[ring]) * KNN_EARTH_RADIUS
+                inside = ring[dist <= radius]
+                found.append(inside)
+                count += len(inside)
+                if count > max_candidates:
+                    return None
+            if (
+                index.covers_grid(center_row, center_col, r)
+                or index.lower_bound(lat, lng, center_row, center_col, r) > radius
+            ):
+                break
+            r += 1
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+    
+    def nearest(self, lat: float, lng: float, k: int) -> list[tuple[str, float, float]] | None:
+        """
+        Los k más cercanos como (id, distancia_metros, distancia_knn).
+        
+        None si la consulta cae fuera de la rejilla, en una celda sin lista
+        o pide más de self.k: en esos casos hay que usar la búsqueda normal.
+        """
+        row = math.floor((lat - self.lat0) / self.cell)
+        col = math.floor((lng - self.lng0) / self.cell)
+        if k > self.k or not (0 <= row < self.n_rows and 0 <= col < self.n_cols):
+            return None
+        
+        cell = row * self.n_cols + col
+        if self.fallback[cell]:
+            return None
+        
+        candidates = self.members[self.offsets[cell]:self.offsets[cell + 1]]
+        index = self.index
+        dist = central_angle(lat, lng, index.lats[candidates], index.lngs[candidates]) * KNN_EARTH_RADIUS
+        ranked = sorted(zip(dist.tolist(), index.ids[candidates].tolist()))[:k]
+        scale = SPHERE_EARTH_RADIUS / KNN_EARTH_RADIUS
+        return [(wifi_id, knn * scale, knn) for knn, wifi_id in ranked]
+    
+    def memory_bytes(self) -> int:
+        """Memoria de la rejilla (sin los arreglos del índice, que se comparten)."""
+        return self.offsets.nbytes + self.members.nbytes + self.fallback.nbytes
+    
+    def stats(self) -> dict:
+        cells = self.n_rows * self.n_cols
+        sizes = np.diff(self.offsets)
+        return {
+            "points": len(self.index),
+            "k": self.k,
+            "cell_deg": self.cell,
+            "cells": cells,
+            "fallback_cells": int(self.fallback.sum()),
+            "candidates_avg": round(float(sizes.mean()), 2) if cells else 0.0,
+            "candidates_max": int(sizes.max()) if cells else 0,
+            "memory_bytes": self.memory_bytes(),
+            "build_seconds": round(self.build_seconds, 3),
+        }
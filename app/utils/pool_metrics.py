@@ -0,0 +1,85 @@
+"""
+Métricas de los pools de conexiones.
+
+instrumented() crea una subclase del pool que mide cuánto espera cada
+checkout (incluye abrir una conexión nueva si hace falta) y cuántos se
+agotan por timeout. El resto de las cifras sale del propio pool.
+"""
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool
+
+
+class WaitStats:
+    """Acumulado de esperas por una conexión."""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+    
+    def record(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+    
+    def snapshot(self) -> dict[str, float]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_total_s": round(self.wait_total, 6),
+                "wait_avg_s": round(self.wait_total / attempts, 6) if attempts else 0.0,
+                "wait_max_s": round(self.wait_max, 6),
+            }
+
+
+def instrumented(pool_class: type[Pool]) -> type[Pool]:
+    """
+    Subclase de pool_class que registra la espera de cada checkout.
+    
+    Las métricas viven en la clase para que sobrevivan a pool.recreate()
+    (dispose crea un pool nuevo de la misma clase): usar una subclase
+    por motor.
+    """
+    class InstrumentedPool(pool_class):
+        wait_stats = WaitStats()
+        
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except PoolTimeoutError:
+                self.wait_stats.record(time.perf_counter() - start, timed_out=True)
+                raise
+            self.wait_stats.record(time.perf_counter() - start)
+            return connection
+    
+    InstrumentedPool.__name__ = f"Instrumented{pool_class.__name__}"
+    return InstrumentedPool
+
+
+def pool_stats(pool: Pool) -> dict[str, float]:
+    """Estado actual del pool más las esperas acumuladas, si las hay."""
+    stats: dict[str, float] = {}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if method is not None:
+            stats[name] = method()
+    # QueuePool cuenta el overflow desde -size hasta que se llena el pool
+    if "overflow" in stats:
+        stats["overflow"] = max(stats["overflow"], 0)
+    
+    wait_stats = getattr(pool, "wait_stats", None)
+    if wait_stats is not None:
+        stats.update(wait_stats.snapshot())
+    return stats
@@ -0,0 +1,238 @@
+"""
+Índice espacial en memoria para búsquedas por proximidad.
+
+Los puntos se guardan en arreglos de numpy ordenados por celda de una
+rejilla regular (lat/lng en grados). Una búsqueda recorre anillos de
+celdas alrededor de la consulta hasta que ningún punto fuera de lo ya
+explorado puede quedar entre los resultados.
+"""
+import math
+
+import numpy as np
+
+# Radio de la esfera que usa geography en PostGIS (KNN <-> y ST_DWithin)
+KNN_EARTH_RADIUS = 6371008.7714
+# Radio que usa ST_DistanceSphere
+SPHERE_EARTH_RADIUS = 6370986.0
+
+METERS_PER_DEGREE = KNN_EARTH_RADIUS * math.pi / 180
+# Margen para la cota inferior en longitud (aproximación plana del arco)
+LNG_BOUND_FACTOR = 0.99
+# Límite de celdas por eje; si la extensión lo supera se agrandan las celdas
+MAX_CELLS_PER_AXIS = 2048
+
+
+def central_angle(lat: float, lng: float, lats: np.ndarray, lngs: np.ndarray) -> np.ndarray:
+    """Ángulo central (radianes) entre un punto y un arreglo de puntos (haversine)."""
+    lat1 = math.radians(lat)
+    lat2 = np.radians(lats)
+    dlat = lat2 - lat1
+    dlng = np.radians(lngs - lng)
+    h = np.sin(dlat / 2) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(dlng / 2) ** 2
+    return 2 * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+class SpatialIndex:
+    """
+    Rejilla de puntos (id, lat, lng) con búsqueda de vecinos más cercanos.
+    
+    Las distancias KNN usan la misma esfera que geography en PostGIS, así
+    que el orden y los cursores son compatibles con repo.get_nearby; la
+    distancia reportada se escala al radio de ST_DistanceSphere.
+    """
+    
+    def __init__(self, ids: list[str], lats, lngs, cell_deg: float = 0.01):
+        ids = np.asarray(ids, dtype=object)
+        lats = np.asarray(lats, dtype=np.float64)
+        lngs = np.asarray(lngs, dtype=np.float64)
+        
+        if len(ids):
+            self.lat0, self.lng0 = float(lats.min()), float(lngs.min())
+            lat_span = float(lats.max()) - self.lat0
+            lng_span = float(lngs.max()) - self.lng0
+            self.max_abs_lat = float(np.abs(lats).max())
+        else:
+            self.lat0 = self.lng0 = lat_span = lng_span = self.max_abs_lat = 0.0
+        
+        self.cell = max(cell_deg, max(lat_span, lng_span) / MAX_CELLS_PER_AXIS)
+        self.n_rows = int(lat_span / self.cell) + 1
+        self.n_cols = int(lng_span / self.cell) + 1
+        
+        rows = ((lats - self.lat0) / self.cell).astype(np.int64)
+        cols = ((lngs - self.lng0) / self.cell).astype(np.int64)
+        keys = rows * self.n_cols + cols
+        order = np.argsort(keys, kind="stable")
+        
+        self.ids = ids[order]
+        self.lats = lats[order]
+        self.lngs = lngs[order]
+        self.starts = np.searchsorted(
+            keys[order], np.arange(self.n_rows * self.n_cols + 1)
+        )
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def cell_of(self, lat: float, lng: float) -> tuple[int, int]:
+        """Celda (fila, columna) de una coordenada; puede caer fuera de la rejilla."""
+        return (
+            math.floor((lat - self.lat0) / self.cell),
+            math.floor((lng - self.lng0) / self.cell),
+        )
+    
+    def ring_members(self, row: int, col: int, r: int) -> np.ndarray:
+        """Posiciones de los puntos en el anillo de celdas a distancia r."""
+        row_lo, row_hi = max(row - r, 0), min(row + r, self.n_rows - 1)
+        col_lo, col_hi = max(col - r, 0), min(col + r, self.n_cols - 1)
+        if row_lo > row_hi or col_lo > col_hi:
+            return np.empty(0, dtype=np.int64)
+        
+        spans = []
+        for ring_row in range(row_lo, row_hi + 1):
+            if abs(ring_row - row) == r:
+                # Fila superior o inferior: todo el tramo de columnas
+                spans.append((ring_row, col_lo, col_hi))
+            else:
+                # Filas intermedias: solo las columnas de los bordes
+                for ring_col in {col - r, col + r}:
+                    if col_lo <= ring_col <= col_hi:
+                        spans.append((ring_row, ring_col, ring_col))
+        
+        members = [
+            np.arange(
+                self.starts[ring_row * self.n_cols + lo],
+                self.starts[ring_row * self.n_cols + hi + 1]
+            )
+            for ring_row, lo, hi in spans
+        ]
+        return np.concatenate(members) if members else np.empty(0, dtype=np.int64)
+    
+    def lower_bound(self, lat: float, lng: float, row: int, col: int, r: int) -> float:
+        """Distancia mínima (m) de la consulta a cualquier punto fuera de los anillos 0..r."""
+        south = lat - (self.lat0 + (row - r) * self.cell)
+        north = self.lat0 + (row + r + 1) * self.cell - lat
+        west = lng - (self.lng0 + (col - r) * self.cell)
+        east = self.lng0 + (col + r + 1) * self.cell - lng
+        
+        cos_lat = math.cos(math.radians(min(max(self.max_abs_lat, abs(lat)), 90.0)))
+        lat_gap = min(south, north) * METERS_PER_DEGREE
+        lng_gap = min(west, east) * METERS_PER_DEGREE * cos_lat * LNG_BOUND_FACTOR
+        return max(min(lat_gap, lng_gap), 0.0)
+    
+    def covers_grid(self, row: int, col: int, r: int) -> bool:
+        return (
+            row - r <= 0 and row + r >= self.n_rows - 1
+            and col - r <= 0 and col + r >= self.n_cols - 1
+        )
+    
+    def nearest(
+        self,
+        lat: float,
+        lng: float,
+        limit: int,
+        offset: int = 0,
+        radius_m: float | None = None,
+        after: tuple[float, str] | None = None
+    ) -> list[tuple[str, float, float]]:
+        """
+        Vecinos más cercanos ordenados por (distancia_knn, id).
+        
+        Args:
+            lat: Latitud de la consulta
+            lng: Longitud de la consulta
+            limit: Cantidad de resultados
+            offset: Resultados a saltar (se ignora con after)
+            radius_m: Radio máximo en metros
+            after: Cursor (distancia_knn, id) del último resultado entregado
+        
+        Returns:
+            Lista de tuplas (id, distancia_metros, distancia_knn)
+        """
+        if not len(self):
+            return []
+        if after is not None:
+            offset = 0
+        need = offset + limit
+        
+        row, col = self.cell_of(lat, lng)
+        found_idx: list[np.ndarray] = []
+        found_dist: list[np.ndarray] = []
+        count = 0
+        r = 0
+        
+        while True:
+            members = self.ring_members(row, col, r)
+            if len(members):
+                dist = central_angle(lat, lng, self.lats[members], self.lngs[members]) * KNN_EARTH_RADIUS
+                keep = self.keep_mask(members, dist, radius_m, after)
+                found_idx.append(members[keep])
+                found_dist.append(dist[keep])
+                count += int(keep.sum())
+            
+            if self.covers_grid(row, col, r):
+                break
+            bound = self.lower_bound(lat, lng, row, col, r)
+            if radius_m is not None and bound > radius_m:
+                break
+            if count >= need:
+                dist = np.concatenate(found_dist)
+                if np.partition(dist, need - 1)[need - 1] <= bound:
+                    break
+            r += 1
+        
+        if not count:
+            return []
+        
+        idx = np.concatenate(found_idx)
+        dist = np.concatenate(found_dist)
+        ranked = sorted(zip(dist.tolist(), self.ids[idx].tolist()))[offset:need]
+        scale = SPHERE_EARTH_RADIUS / KNN_EARTH_RADIUS
+        return [(wifi_id, knn * scale, knn) for knn, wifi_id in ranked]
+    
+    def keep_mask(
+        self,
+        members: np.ndarray,
+        dist: np.ndarray,
+        radius_m: float | None,
+        after: tuple[float, str] | None
+    ) -> np.ndarray:
+        """Filtra candidatos por radio y por cursor."""
+        keep = np.ones(len(members), dtype=bool)
+        if radius_m is not None:
+            keep &= dist <= radius_m
+        if after is not None:
+            after_distance, after_id = after
+            keep &= (dist > after_distance) | (
+                (dist == after_distance) & (self.ids[members] > after_id)
+            )
+        return keep
+    
+    def count_within(self, lat: float, lng: float, radius_m: float) -> int:
+        """Cantidad de puntos a radius_m metros o menos."""
+        if not len(self):
+            return 0
+        dist = central_angle(lat, lng, self.lats, self.lngs) * KNN_EARTH_RADIUS
+        return int((dist <= radius_m).sum())
+    
+    def within_bbox(self, min_lng: float, min_lat: float, max_lng: float, max_lat: float) -> np.ndarray:
+        """Posiciones de los puntos dentro del rectángulo (bordes incluidos)."""
+        if not len(self):
+            return np.empty(0, dtype=np.int64)
+        
+        row_lo, col_lo = self.cell_of(min_lat, min_lng)
+        row_hi, col_hi = self.cell_of(max_lat, max_lng)
+        row_lo, col_lo = max(row_lo, 0), max(col_lo, 0)
+        row_hi, col_hi = min(row_hi, self.n_rows - 1), min(col_hi, self.n_cols - 1)
+        if row_lo > row_hi or col_lo > col_hi:
+            return np.empty(0, dtype=np.int64)
+        
+        members = np.concatenate([
+            np.arange(
+                self.starts[row * self.n_cols + col_lo],
+                self.starts[row * self.n_cols + col_hi + 1]
+            )
+            for row in range(row_lo, row_hi + 1)
+        ])
+        lats, lngs = self.lats[members], self.lngs[members]
+        inside = (lats >= min_lat) & (lats <= max_lat) & (lngs >= min_lng) & (lngs <= max_lng)
+        return members[inside]
@@ -0,0 +1,20 @@
+"""
+Normalización de textos para búsquedas.
+
+La clave de una alcaldía no distingue mayúsculas, acentos, espacios ni
+signos: "Álvaro Obregón", "alvaro  obregon" y "alvaro-obregon" dan la
+misma clave.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+SEPARATORS = re.compile(r"[\W_]+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_key(value: str) -> str:
+    """Clave de búsqueda: sin acentos, en minúsculas y con un solo espacio."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    without_marks = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return SEPARATORS.sub(" ", without_marks.casefold()).strip()
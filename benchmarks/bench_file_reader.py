@@ -0,0 +1,86 @@
+"""
+Compara la lectura anterior de CSV con el lector actual.
+
+Uso:
+    python -m benchmarks.bench_file_reader [--rows 500000] [--repeat 3]
+
+La lectura anterior es pd.read_csv con inferencia de tipos y todas las
+columnas (el primer intento de la versión previa). El archivo sintético
+lleva, además de las cinco columnas de importación, columnas extra como
+el dataset publicado. Se mide la lectura sola y la lectura más
+validate_frame (lo que hace la importación con cada bloque). Imprime un
+JSON con el tiempo medio y la memoria del DataFrame leído.
+"""
+import argparse
+import gzip
+import json
+import time
+from collections.abc import Callable
+from io import BytesIO
+
+import pandas as pd
+
+from app.repositories.wifi_repository import RECORD_COLUMNS
+from app.services.import_service import validate_frame
+from app.utils import file_reader
+
+
+def make_csv(rows: int) -> bytes:
+    """CSV sintético con coma decimal, separador ';' y acentos (latin-1)."""
+    lines = ["id;programa;fecha_instalacion;latitud;longitud;colonia;alcaldia;observaciones"]
+    lines.extend(
+        f"MEX-{i:07d};MiCalle;2021-03-{i % 28 + 1:02d};19,{432608 + i % 99999};-99,{133209 + i % 99999};"
+        f"Centro;Álvaro Obregón;Poste {i % 500}"
+        for i in range(rows)
+    )
+    return ("\n".join(lines) + "\n").encode("latin-1")
+
+
+def legacy_read(content: bytes) -> pd.DataFrame:
+    return pd.read_csv(BytesIO(content), encoding="latin-1", sep=";")
+
+
+def measure(fn: Callable[[], object], repeat: int) -> float:
+    """Tiempo medio por llamada en milisegundos."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    content = make_csv(args.rows)
+    compressed = gzip.compress(content, compresslevel=1)
+    variants = {
+        "legacy": lambda: legacy_read(content),
+        "csv": lambda: file_reader.read_file(content, "puntos.csv", RECORD_COLUMNS),
+        "csv_gz": lambda: file_reader.read_file(compressed, "puntos.csv.gz", RECORD_COLUMNS),
+    }
+    
+    results = {}
+    for name, read in variants.items():
+        memory = int(read().memory_usage(deep=True).sum())
+        results[name] = {
+            "read_ms": round(measure(read, args.repeat), 1),
+            "read_validate_ms": round(measure(lambda: validate_frame(read()), args.repeat), 1),
+            "frame_mb": round(memory / 2**20, 1),
+        }
+    
+    print(json.dumps({
+        "benchmark": "file_reader",
+        "rows": args.rows,
+        "csv_mb": round(len(content) / 2**20, 1),
+        "pyarrow": file_reader.has_pyarrow(),
+        "results": results,
+        "speedup": round(results["legacy"]["read_validate_ms"] / results["csv"]["read_validate_ms"], 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Prueba de carga contra una instancia corriendo de la API.
+
+Uso:
+    # Stack síncrono (por defecto)
+    uvicorn app.main:app --port 8000
+    python -m benchmarks.bench_load --url http://localhost:8000 --clients 200
+    
+    # Stack async
+    DB_ASYNC=true uvicorn app.main:app --port 8000
+    python -m benchmarks.bench_load --url http://localhost:8000 --clients 200
+
+Cada cliente abre una conexión keep-alive y pide rutas en bucle durante
+--duration segundos. Imprime un JSON con peticiones por segundo y
+percentiles de latencia. Con RESPONSE_CACHE_ENABLED=false se mide la BD
+y no la caché.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = (
+    "/api/v1/wifi-points?limit=100&page={page}",
+    "/api/v1/wifi-points/nearby/?lat={lat}&lng={lng}&limit=50",
+    "/api/v1/wifi-points/alcaldia/cuauhtemoc?limit=100&page={page}",
+)
+
+
+def render_path(template: str) -> str:
+    """Rellena la ruta con valores aleatorios dentro de la CDMX."""
+    return template.format(
+        page=random.randint(1, 50),
+        lat=round(random.uniform(19.30, 19.55), 5),
+        lng=round(random.uniform(-99.25, -99.00), 5),
+    )
+
+
+async def request(
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+    host: str,
+    path: str
+) -> int:
+    """Manda un GET HTTP/1.1 y lee la respuesta completa. Retorna el status."""
+    writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode("ascii"))
+    await writer.drain()
+    
+    status_line = await reader.readline()
+    status = int(status_line.split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    if length:
+        await reader.readexactly(length)
+    return status
+
+
+async def client(
+    host: str,
+    port: int,
+    paths: tuple[str, ...],
+    deadline: float,
+    latencies: list[float],
+    errors: list[int]
+) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status = await request(reader, writer, host, render_path(random.choice(paths)))
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+async def run(url: str, clients: int, duration: float, paths: tuple[str, ...]) -> dict:
+    parts = urlsplit(url)
+    host, port = parts.hostname, parts.port or 80
+    latencies: list[float] = []
+    errors: list[int] = []
+    
+    deadline = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        client(host, port, paths, deadline, latencies, errors) for _ in range(clients)
+    ))
+    elapsed = time.perf_counter() - started
+    
+    return {
+        "benchmark": "load",
+        "url": url,
+        "clients": clients,
+        "duration_s": round(elapsed, 2),
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_s": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 0.50) * 1000, 2),
+            "p95": round(percentile(latencies, 0.95) * 1000, 2),
+            "p99": round(percentile(latencies, 0.99) * 1000, 2),
+        } if latencies else None,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Prueba de carga de la API")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--path", action="append", dest="paths",
+                        help="Ruta a pedir (se puede repetir); admite {page}, {lat}, {lng}")
+    args = parser.parse_args()
+    
+    paths = tuple(args.paths) if args.paths else DEFAULT_PATHS
+    print(json.dumps(asyncio.run(run(args.url, args.clients, args.duration, paths)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
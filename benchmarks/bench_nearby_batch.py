@@ -0,0 +1,77 @@
+"""
+Compara /nearby/ coordenada por coordenada contra /nearby/batch.
+
+Necesita una BD con datos (DATABASE_URL). Con NEARBY_BACKEND=memory se
+construye antes el índice en memoria y se miden los dos caminos con él.
+
+Uso:
+    python -m benchmarks.bench_nearby_batch [--queries 1000] [--k 10]
+
+Imprime un JSON con el costo por coordenada de cada camino.
+"""
+import argparse
+import json
+import random
+import time
+
+from app.database import SessionLocal
+from app.schemas.wifi_point import NearbyBatchQuery
+from app.services import nearby_index, wifi_service
+
+
+def random_queries(count: int, k: int, radius_m: float | None) -> list[NearbyBatchQuery]:
+    """Coordenadas aleatorias dentro de la CDMX."""
+    return [
+        NearbyBatchQuery(
+            lat=random.uniform(19.30, 19.55),
+            lng=random.uniform(-99.25, -99.00),
+            k=k,
+            radius_m=radius_m,
+        )
+        for _ in range(count)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Proximidad individual contra lote")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--radius-m", type=float, default=None)
+    parser.add_argument("--include-total", action="store_true",
+                        help="Calcular el total en las llamadas individuales (como /nearby/ por defecto)")
+    args = parser.parse_args()
+    
+    if nearby_index.enabled():
+        nearby_index.rebuild()
+    
+    queries = random_queries(args.queries, args.k, args.radius_m)
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        for query in queries:
+            wifi_service.get_nearby_json(
+                db, query.lat, query.lng, 1, query.k, query.radius_m,
+                include_total=args.include_total
+            )
+        individual = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        wifi_service.get_nearby_batch_json(db, queries)
+        batch = time.perf_counter() - start
+    finally:
+        db.close()
+    
+    print(json.dumps({
+        "benchmark": "nearby_batch",
+        "backend": "memory" if nearby_index.enabled() else "database",
+        "queries": args.queries,
+        "k": args.k,
+        "radius_m": args.radius_m,
+        "individual_ms_per_query": round(individual / args.queries * 1000, 4),
+        "batch_ms_per_query": round(batch / args.queries * 1000, 4),
+        "speedup": round(individual / batch, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Compara la serialización con modelos Pydantic contra la ruta directa a JSON.
+
+Uso:
+    python -m benchmarks.bench_serialization [--rows 100] [--repeat 200]
+
+Imprime un JSON con el tiempo medio por página de cada ruta.
+"""
+import argparse
+import json
+import time
+from collections.abc import Callable
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from pydantic import TypeAdapter
+
+from app.schemas.wifi_point import PaginatedResponse, WifiPointWithDistance
+from app.services import wifi_service
+
+
+def make_rows(count: int) -> list[SimpleNamespace]:
+    """Filas sintéticas con los mismos tipos que entrega la BD."""
+    created = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        SimpleNamespace(
+            id=f"MEX-{i:06d}",
+            programa="MiCalle",
+            latitud=Decimal("19.43260800") + Decimal(i) / 100000,
+            longitud=Decimal("-99.13320900") - Decimal(i) / 100000,
+            alcaldia="Cuauhtémoc",
+            created_at=created + timedelta(seconds=i),
+            updated_at=None,
+        )
+        for i in range(count)
+    ]
+
+
+def raw_rows(count: int) -> list[tuple]:
+    """Filas como texto, tal como llegan del servidor antes de que el driver las convierta."""
+    return [
+        (row.id, row.programa, f"{row.latitud:.6f}", f"{row.longitud:.6f}", row.alcaldia,
+         row.created_at, row.updated_at)
+        for row in make_rows(count)
+    ]
+
+
+def decode_rows(raw: list[tuple], coordinate: Callable[[str], object]) -> list[SimpleNamespace]:
+    """
+    Conversión del driver: Decimal para numeric(10, 6) o el texto tal cual
+    con COORDINATE_STORAGE=float (las coordenadas se leen como texto).
+    """
+    return [
+        SimpleNamespace(
+            id=row_id, programa=programa, latitud=coordinate(latitud),
+            longitud=coordinate(longitud), alcaldia=alcaldia,
+            created_at=created_at, updated_at=updated_at,
+        )
+        for row_id, programa, latitud, longitud, alcaldia, created_at, updated_at in raw
+    ]
+
+
+def model_path(rows: list[SimpleNamespace], adapter: TypeAdapter) -> bytes:
+    """Ruta anterior: un modelo por fila y revalidación contra response_model."""
+    pagination = wifi_service.build_pagination(1, len(rows), 1000)
+    response = PaginatedResponse(
+        data=[wifi_service.to_response_with_distance(row, i * 1.5) for i, row in enumerate(rows)],
+        pagination=pagination,
+    )
+    # FastAPI vuelve a validar el retorno contra response_model antes de serializar
+    return adapter.dump_json(adapter.validate_python(response, from_attributes=True))
+
+
+def lean_path(rows: list[SimpleNamespace]) -> bytes:
+    """Ruta directa: dicts serializados con json_encoder."""
+    pagination = wifi_service.build_pagination(1, len(rows), 1000)
+    data = [wifi_service.to_dict_with_distance(row, i * 1.5) for i, row in enumerate(rows)]
+    return wifi_service.encode_page(data, pagination)
+
+
+def measure(fn: Callable[[], bytes], repeat: int) -> float:
+    """Tiempo medio por llamada en milisegundos."""
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    
+    rows = make_rows(args.rows)
+    adapter = TypeAdapter(PaginatedResponse[WifiPointWithDistance])
+    
+    if model_path(rows, adapter) != lean_path(rows):
+        raise SystemExit("Las dos rutas no producen el mismo JSON")
+    
+    model_ms = measure(lambda: model_path(rows, adapter), args.repeat)
+    lean_ms = measure(lambda: lean_path(rows), args.repeat)
+    
+    print(json.dumps({
+        "benchmark": "serialization",
+        "rows": args.rows,
+        "repeat": args.repeat,
+        "model_ms": round(model_ms, 4),
+        "lean_ms": round(lean_ms, 4),
+        "speedup": round(model_ms / lean_ms, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Compara dos corridas de benchmarks.suite.
+
+Uso:
+    python -m benchmarks.compare base.json actual.json [--threshold 1.2]
+
+Empareja las mediciones por nombre y parámetros y calcula la razón
+actual / base de la mediana. Imprime un JSON con todas las razones y
+termina con código 1 si alguna supera --threshold (una regresión).
+"""
+import argparse
+import json
+import sys
+
+
+def key(entry: dict) -> str:
+    return entry["name"] + " " + json.dumps(entry["params"], sort_keys=True)
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare(base: dict, current: dict, threshold: float) -> dict:
+    base_entries = {key(entry): entry for entry in base["results"]}
+    rows = []
+    for entry in current["results"]:
+        previous = base_entries.get(key(entry))
+        if previous is None or not previous["median_ms"]:
+            continue
+        ratio = entry["median_ms"] / previous["median_ms"]
+        rows.append({
+            "benchmark": key(entry),
+            "base_ms": previous["median_ms"],
+            "current_ms": entry["median_ms"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > threshold,
+        })
+    
+    return {
+        "base_commit": base.get("commit"),
+        "current_commit": current.get("commit"),
+        "threshold": threshold,
+        "regressions": sum(row["regression"] for row in rows),
+        "results": rows,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara dos corridas de la suite")
+    parser.add_argument("base")
+    parser.add_argument("current")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="Razón actual/base a partir de la cual se marca regresión")
+    args = parser.parse_args()
+    
+    report = compare(load(args.base), load(args.current), args.threshold)
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if report["regressions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
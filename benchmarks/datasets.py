@@ -0,0 +1,95 @@
+"""
+Generadores de datasets sintéticos parecidos al de la CDMX.
+
+Los puntos se reparten entre las 16 alcaldías alrededor de un centro
+aproximado de cada una, con las mismas columnas que el archivo publicado
+(más columnas que la importación no usa). Con la misma semilla el
+resultado es idéntico, así que las mediciones son comparables entre
+commits.
+"""
+import gzip
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+
+# (nombre, latitud, longitud, dispersión en grados, peso)
+ALCALDIAS = (
+    ("Álvaro Obregón", 19.358, -99.227, 0.030, 8),
+    ("Azcapotzalco", 19.487, -99.185, 0.018, 5),
+    ("Benito Juárez", 19.372, -99.158, 0.014, 7),
+    ("Coyoacán", 19.328, -99.153, 0.022, 8),
+    ("Cuajimalpa de Morelos", 19.357, -99.299, 0.025, 3),
+    ("Cuauhtémoc", 19.433, -99.146, 0.015, 12),
+    ("Gustavo A. Madero", 19.494, -99.113, 0.030, 11),
+    ("Iztacalco", 19.395, -99.097, 0.013, 4),
+    ("Iztapalapa", 19.355, -99.061, 0.035, 14),
+    ("La Magdalena Contreras", 19.315, -99.242, 0.020, 3),
+    ("Miguel Hidalgo", 19.428, -99.204, 0.020, 7),
+    ("Milpa Alta", 19.192, -99.023, 0.045, 2),
+    ("Tláhuac", 19.286, -99.004, 0.030, 4),
+    ("Tlalpan", 19.244, -99.168, 0.050, 6),
+    ("Venustiano Carranza", 19.430, -99.099, 0.018, 5),
+    ("Xochimilco", 19.257, -99.104, 0.040, 4),
+)
+
+PROGRAMAS = ("MiCalle", "Escuelas", "Centros de Salud", "Parques", "Transporte")
+
+# Tamaños con nombre para --sizes
+SIZES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000, "5m": 5_000_000}
+
+
+def parse_size(value: str) -> int:
+    """Acepta un nombre de SIZES o un número de filas."""
+    return SIZES.get(value.lower()) or int(value.replace("_", ""))
+
+
+def generate_frame(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Dataset con `rows` puntos y las columnas del archivo publicado.
+    
+    Las coordenadas vienen redondeadas a 6 decimales como en la fuente.
+    """
+    rng = np.random.default_rng(seed)
+    weights = np.array([alcaldia[4] for alcaldia in ALCALDIAS], dtype=float)
+    which = rng.choice(len(ALCALDIAS), size=rows, p=weights / weights.sum())
+    centers = np.array([(lat, lng, spread) for _, lat, lng, spread, _ in ALCALDIAS])
+    
+    lat = centers[which, 0] + rng.normal(0, 1, rows) * centers[which, 2]
+    lng = centers[which, 1] + rng.normal(0, 1, rows) * centers[which, 2]
+    names = np.array([alcaldia[0] for alcaldia in ALCALDIAS], dtype=object)
+    
+    return pd.DataFrame({
+        "id": [f"CDMX-{i:08d}" for i in range(rows)],
+        "programa": np.array(PROGRAMAS, dtype=object)[rng.integers(0, len(PROGRAMAS), rows)],
+        "fecha_instalacion": "2021-03-15",
+        "latitud": np.round(lat, 6),
+        "longitud": np.round(lng, 6),
+        "colonia": "Centro",
+        "alcaldia": names[which],
+    })
+
+
+def modify(df: pd.DataFrame, fraction: float, seed: int = 1) -> pd.DataFrame:
+    """Copia con `fraction` de las filas movidas unos metros (republicación semanal)."""
+    rng = np.random.default_rng(seed)
+    changed = df.copy()
+    rows = rng.choice(len(df), size=int(len(df) * fraction), replace=False)
+    changed.loc[rows, "latitud"] = (changed.loc[rows, "latitud"] + 0.0001).round(6)
+    return changed
+
+
+def to_bytes(df: pd.DataFrame, fmt: str) -> bytes:
+    """Serializa al formato de archivo: csv, csv.gz, parquet o xlsx."""
+    if fmt in ("csv", "csv.gz"):
+        content = df.to_csv(index=False).encode("utf-8")
+        return gzip.compress(content, compresslevel=1) if fmt == "csv.gz" else content
+    
+    buffer = BytesIO()
+    if fmt == "parquet":
+        df.to_parquet(buffer, index=False)
+    elif fmt == "xlsx":
+        df.to_excel(buffer, index=False)
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+    return buffer.getvalue()
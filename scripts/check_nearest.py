@@ -0,0 +1,96 @@
+"""
+Compara la rejilla de /nearest con repo.get_nearby sobre la BD.
+
+Uso:
+    python -m scripts.check_nearest --samples 2000 --k 5
+
+Construye la rejilla con las coordenadas actuales, imprime sus cifras
+(celdas, candidatos, memoria, tiempo de construcción) y resuelve
+coordenadas al azar dentro de la extensión del dataset (la mitad junto a
+un punto existente, para cubrir las zonas densas) con la rejilla y con
+PostGIS. Sale con código 1 si algún resultado difiere en IDs, orden o
+distancia.
+"""
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from app.config import settings
+from app.database import SessionLocal
+from app.repositories import wifi_repository as repo
+from app.utils.nearest_grid import NearestGrid
+from app.utils.spatial_index import SpatialIndex
+
+# Diferencia de distancia tolerada (m) entre numpy y PostGIS
+DISTANCE_TOLERANCE_M = 0.01
+
+
+def sample_coordinates(index: SpatialIndex, samples: int, seed: int) -> list[tuple[float, float]]:
+    rng = np.random.default_rng(seed)
+    uniform = samples - samples // 2
+    lats = rng.uniform(index.lats.min(), index.lats.max(), uniform)
+    lngs = rng.uniform(index.lngs.min(), index.lngs.max(), uniform)
+    # ~50 m alrededor de puntos existentes
+    picks = rng.integers(0, len(index), samples // 2)
+    near_lats = index.lats[picks] + rng.normal(0, 0.0005, len(picks))
+    near_lngs = index.lngs[picks] + rng.normal(0, 0.0005, len(picks))
+    return list(zip(np.concatenate([lats, near_lats]).tolist(),
+                    np.concatenate([lngs, near_lngs]).tolist()))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Verificación de la rejilla de /nearest")
+    parser.add_argument("--samples", type=int, default=1000)
+    parser.add_argument("--k", type=int, default=settings.nearest_grid_k)
+    parser.add_argument("--cell-deg", type=float, default=settings.nearest_grid_cell_deg)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    
+    db = SessionLocal()
+    try:
+        ids, lats, lngs = repo.get_coordinates(db)
+        if not ids:
+            sys.exit("No hay puntos en la BD")
+        index = SpatialIndex(ids, lats, lngs, cell_deg=settings.nearby_index_cell_deg)
+        grid = NearestGrid(
+            index, args.k, args.cell_deg,
+            max_cells=settings.nearest_grid_max_cells,
+            max_candidates=settings.nearest_grid_max_candidates
+        )
+        print(json.dumps(grid.stats(), indent=2))
+        
+        mismatches = fallbacks = 0
+        grid_seconds = 0.0
+        for lat, lng in sample_coordinates(index, args.samples, args.seed):
+            started = time.perf_counter()
+            matches = grid.nearest(lat, lng, args.k)
+            grid_seconds += time.perf_counter() - started
+            if matches is None:
+                fallbacks += 1
+                continue
+            
+            rows = repo.get_nearby(db, lat, lng, args.k)[:args.k]
+            expected = [(row.id, row.distancia_metros) for row in rows]
+            same = len(matches) == len(expected) and all(
+                wifi_id == row_id and abs(distance - row_distance) <= DISTANCE_TOLERANCE_M
+                for (wifi_id, distance, _), (row_id, row_distance) in zip(matches, expected)
+            )
+            if not same:
+                mismatches += 1
+                print(f"Difiere en ({lat}, {lng}): {matches} != {expected}", file=sys.stderr)
+    finally:
+        db.close()
+    
+    resolved = args.samples - fallbacks
+    print(f"{resolved} consultas resueltas con la rejilla "
+          f"({grid_seconds / max(resolved, 1) * 1e6:.1f} µs c/u), "
+          f"{fallbacks} en celdas sin lista, {mismatches} diferencias")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Importa un CSV grande desde el disco con varios procesos.
+
+Uso:
+    python -m scripts.import_parallel puntos.csv --workers 8 --on-duplicate update
+
+Cada proceso lee, valida y copia a staging una parte del archivo; al final
+se fusiona todo en una sola transacción (ver app.services.parallel_import).
+Imprime el resultado de la importación como JSON, sin la lista de errores
+si se pasa --summary.
+"""
+import argparse
+import sys
+import time
+
+from app.database import SessionLocal
+from app.services import parallel_import
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Importación de CSV en paralelo")
+    parser.add_argument("path")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Procesos (por omisión IMPORT_PARALLEL_WORKERS o los núcleos)")
+    parser.add_argument("--shard-mb", type=int, default=None, help="Tamaño de cada bloque en MB")
+    parser.add_argument("--on-error", default="report")
+    parser.add_argument("--on-duplicate", default="ignore")
+    parser.add_argument("--delete-missing", action="store_true")
+    parser.add_argument("--summary", action="store_true", help="Omitir la lista de errores")
+    args = parser.parse_args()
+    
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        result = parallel_import.import_parallel(
+            db, args.path, args.path, args.on_error, args.on_duplicate,
+            workers=args.workers,
+            shard_bytes=args.shard_mb * 1024 * 1024 if args.shard_mb else None,
+            delete_missing=args.delete_missing
+        )
+    finally:
+        db.close()
+    
+    print(result.model_dump_json(indent=2, exclude={"errors"} if args.summary else None))
+    print(f"{time.perf_counter() - started:.1f} s", file=sys.stderr)
+    if result.status == "failed":
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Cambia el almacenamiento de coordenadas de wifi_points.
+
+Uso:
+    python -m scripts.migrate_coordinates float     # y luego COORDINATE_STORAGE=float
+    python -m scripts.migrate_coordinates numeric   # vuelta atrás
+
+float: latitud/longitud pasan a double precision y location a una
+columna generada (ST_MakePoint en la BD). numeric: numeric(10, 6) y
+location como columna normal calculada una vez. En los dos sentidos
+location se borra y se vuelve a crear con sus índices, en una sola
+transacción; la tabla queda bloqueada mientras tanto. Los valores que
+devuelve la API no cambian.
+"""
+import argparse
+import sys
+import time
+
+from sqlalchemy import text
+
+from app.database import get_engine
+from app.models.wifi_point import LOCATION_EXPRESSION, WifiPoint
+
+COLUMN_TYPES = {
+    "float": "double precision USING {name}::double precision",
+    "numeric": "numeric(10, 6) USING round({name}::numeric, 6)",
+}
+LOCATION_INDEXES = ("idx_wifi_points_location", "idx_wifi_points_location_geog")
+LOCATION_COLUMNS = {
+    "float": f"geometry(Point, 4326) GENERATED ALWAYS AS ({LOCATION_EXPRESSION}) STORED",
+    "numeric": "geometry(Point, 4326)",
+}
+
+
+def migrate(storage: str) -> None:
+    # DROP COLUMN borra también los índices de location
+    statements = [
+        "ALTER TABLE wifi_points DROP COLUMN location",
+        "ALTER TABLE wifi_points "
+        + ", ".join(
+            f"ALTER COLUMN {name} TYPE {COLUMN_TYPES[storage].format(name=name)}"
+            for name in ("latitud", "longitud")
+        ),
+        f"ALTER TABLE wifi_points ADD COLUMN location {LOCATION_COLUMNS[storage]}",
+    ]
+    if storage == "numeric":
+        statements.append(f"UPDATE wifi_points SET location = {LOCATION_EXPRESSION}")
+    
+    with get_engine().begin() as connection:
+        for statement in statements:
+            connection.execute(text(statement))
+        for index in WifiPoint.__table__.indexes:
+            if index.name in LOCATION_INDEXES:
+                index.create(connection)
+        connection.execute(text("ANALYZE wifi_points"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Migración del almacenamiento de coordenadas")
+    parser.add_argument("storage", choices=sorted(COLUMN_TYPES))
+    args = parser.parse_args()
+    
+    started = time.perf_counter()
+    migrate(args.storage)
+    print(f"wifi_points en modo {args.storage} ({time.perf_counter() - started:.1f} s); "
+          f"arranca la API con COORDINATE_STORAGE={args.storage}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
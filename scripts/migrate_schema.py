@@ -0,0 +1,70 @@
+"""
+Pone al día el esquema de una BD creada antes de alcaldia_key.
+
+Uso:
+    python -m scripts.migrate_schema
+
+Crea las tablas que falten (alcaldias, dataset_version; una BD vacía
+queda lista), agrega wifi_points.alcaldia_key y la llena con
+normalize_key para cada alcaldía distinta, crea sus índices y los GiST
+de location, y llena la tabla alcaldias. Todo va en una transacción y se puede correr de nuevo
+sin efecto; la tabla queda bloqueada mientras se llena alcaldia_key.
+"""
+import sys
+import time
+
+from sqlalchemy import String, column, select, text, update, values
+from sqlalchemy.orm import Session
+
+from app.database import Base, get_engine
+from app.models.wifi_point import WifiPoint
+from app.repositories import wifi_repository as repo
+from app.utils.text import normalize_key
+
+
+def backfill_statement(alcaldias: list[str]):
+    """UPDATE ... FROM VALUES (alcaldia, clave) para las filas sin clave."""
+    keys = values(
+        column("alcaldia", String), column("key", String), name="alcaldia_keys"
+    ).data([(alcaldia, normalize_key(alcaldia)) for alcaldia in alcaldias])
+    return (
+        update(WifiPoint)
+        .where(WifiPoint.alcaldia == keys.c.alcaldia, WifiPoint.alcaldia_key.is_(None))
+        # Sin tocar updated_at: los puntos no cambian
+        .values(alcaldia_key=keys.c.key, updated_at=WifiPoint.updated_at)
+    )
+
+
+def migrate() -> int:
+    """Aplica la migración y retorna cuántas alcaldías distintas se normalizaron."""
+    with get_engine().begin() as connection:
+        Base.metadata.create_all(connection, checkfirst=True)
+        connection.execute(text(
+            "ALTER TABLE wifi_points ADD COLUMN IF NOT EXISTS alcaldia_key varchar(100)"
+        ))
+        
+        alcaldias = connection.execute(
+            select(WifiPoint.alcaldia).where(WifiPoint.alcaldia_key.is_(None)).distinct()
+        ).scalars().all()
+        if alcaldias:
+            connection.execute(backfill_statement(alcaldias))
+        connection.execute(text("ALTER TABLE wifi_points ALTER COLUMN alcaldia_key SET NOT NULL"))
+        
+        for index in WifiPoint.__table__.indexes:
+            index.create(connection, checkfirst=True)
+        
+        with Session(bind=connection) as db:
+            repo.refresh_alcaldias(db)
+        connection.execute(text("ANALYZE wifi_points"))
+    return len(alcaldias)
+
+
+def main() -> None:
+    started = time.perf_counter()
+    normalized = migrate()
+    print(f"Esquema al día ({time.perf_counter() - started:.1f} s); "
+          f"{normalized} alcaldías normalizadas", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Llena la caché de tiles en disco para los zooms bajos.
+
+Uso:
+    TILE_CACHE_DIR=/var/cache/wifi-tiles python -m scripts.seed_tiles --max-zoom 12
+
+Los zooms bajos son los que más puntos juntan por tile y los más caros de
+generar; con la caché sembrada la API los sirve desde disco. Los tiles
+quedan bajo la huella del dataset actual, así que hay que volver a correrlo
+después de cada importación. Los directorios de huellas viejas se pueden
+borrar.
+"""
+import argparse
+import json
+import sys
+import time
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services import nearby_index, tile_service
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Genera tiles MVT en la caché de disco")
+    parser.add_argument("--min-zoom", type=int, default=0)
+    parser.add_argument("--max-zoom", type=int, default=12)
+    args = parser.parse_args()
+    
+    if not settings.tile_cache_dir:
+        sys.exit("TILE_CACHE_DIR no está configurado")
+    if nearby_index.enabled():
+        nearby_index.rebuild()
+    
+    started = time.perf_counter()
+    db = SessionLocal()
+    try:
+        count = tile_service.seed(db, args.min_zoom, args.max_zoom)
+    finally:
+        db.close()
+    
+    print(json.dumps({
+        "tiles": count,
+        "min_zoom": args.min_zoom,
+        "max_zoom": args.max_zoom,
+        "seconds": round(time.perf_counter() - started, 2),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
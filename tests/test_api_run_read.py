@@ -0,0 +1,19 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.api.wifi import run_read
+
+
+def sync_read(db, value):
+    return ("sync", value)
+
+
+async def async_read(db, value):
+    return ("async", value)
+
+
+def test_run_read_dispatches_on_session_type():
+    assert asyncio.run(run_read(Session(), sync_read, async_read, 1)) == ("sync", 1)
+    assert asyncio.run(run_read(AsyncSession(), sync_read, async_read, 2)) == ("async", 2)
@@ -0,0 +1,43 @@
+import json
+import os
+import subprocess
+import sys
+
+PROBE = (
+    "import json, sys; import app.main; "
+    "print(json.dumps([name for name in ('pandas', 'pyarrow', 'openpyxl') if name in sys.modules]))"
+)
+
+
+def loaded_modules(role):
+    env = {**os.environ, "APP_ROLE": role}
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def test_read_path_does_not_import_the_file_stack():
+    assert loaded_modules("all") == []
+    assert loaded_modules("api") == []
+
+
+def test_import_routes_only_for_roles_that_ingest():
+    env = {**os.environ, "APP_ROLE": "api"}
+    probe = (
+        "import app.main; "
+        "print(sorted({route.path for route in app.main.app.routes if 'import' in route.path}))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", probe], env=env, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.strip() == "[]"
+
+
+def test_unknown_role_is_rejected():
+    env = {**os.environ, "APP_ROLE": "apis"}
+    result = subprocess.run(
+        [sys.executable, "-c", "import app.config"], env=env, capture_output=True, text=True
+    )
+    assert result.returncode != 0
+    assert "app_role" in result.stderr
@@ -0,0 +1,21 @@
+from app.services import dataset_state
+
+
+def test_db_version_changes_from_other_processes_mark_the_dataset():
+    dataset_state._db_version = None
+    generation = dataset_state.current_generation()
+
+    # La primera lectura es la que ya reflejan cachés e índices
+    assert not dataset_state.sync_version(3)
+    assert not dataset_state.sync_version(3)
+    assert dataset_state.current_generation() == generation
+
+    # Importación en otro proceso
+    assert dataset_state.sync_version(4)
+    assert dataset_state.current_generation() == generation + 1
+
+    # Importación en este proceso: el poller no la vuelve a marcar
+    dataset_state.mark_changed(5)
+    assert not dataset_state.sync_version(5)
+    assert not dataset_state.sync_version(4)
+    assert dataset_state.current_generation() == generation + 2
@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.services.export_service import csv_chunks, ndjson_chunks
+
+
+def make_row(wifi_id):
+    return SimpleNamespace(
+        id=wifi_id,
+        programa="MiCalle",
+        latitud=Decimal("19.4326"),
+        longitud=Decimal("-99.1332"),
+        alcaldia="Cuauhtémoc",
+        created_at=datetime(2024, 1, 1, tzinfo=timezone.utc),
+        updated_at=None,
+    )
+
+
+def test_ndjson_one_line_per_row():
+    chunks = list(ndjson_chunks([[make_row("A"), make_row("B")], [make_row("C")]]))
+
+    assert len(chunks) == 2
+    lines = b"".join(chunks).decode("utf-8").splitlines()
+    assert [line.split('"')[3] for line in lines] == ["A", "B", "C"]
+
+
+def test_csv_header_and_empty_table():
+    body = b"".join(csv_chunks([[make_row("A")]])).decode("utf-8").splitlines()
+
+    assert body[0] == "id,programa,latitud,longitud,alcaldia,created_at,updated_at"
+    assert body[1] == "A,MiCalle,19.4326,-99.1332,Cuauhtémoc,2024-01-01T00:00:00+00:00,"
+    assert b"".join(csv_chunks([])).startswith(b"id,programa")
@@ -0,0 +1,42 @@
+import time
+from collections import OrderedDict
+from io import BytesIO
+
+from app.config import settings
+from app.schemas.wifi_point import ImportJob
+from app.services import import_jobs
+
+
+def wait_finished(job_id, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = import_jobs.get(job_id)
+        if job.finished_at:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"El trabajo {job_id} no terminó")
+
+
+def test_submit_runs_the_job_and_records_the_result():
+    # Sin las columnas requeridas la importación falla antes de tocar la BD
+    job = import_jobs.submit(BytesIO(b"id,programa\nA1,MiCalle\n"), "puntos.csv", "fail", "skip")
+    assert job.status == "queued"
+
+    finished = wait_finished(job.job_id)
+    assert finished.status == "failed"
+    assert finished.started_at is not None
+    assert "Columnas faltantes" in finished.result.errors[0].reason
+
+
+def test_prune_finished_keeps_the_newest_and_running_jobs(monkeypatch):
+    monkeypatch.setattr(settings, "import_job_retention", 1)
+    monkeypatch.setattr(import_jobs, "_jobs", OrderedDict())
+    created = import_jobs.now()
+    for job_id, finished in (("a", True), ("b", False), ("c", True), ("d", True)):
+        import_jobs._jobs[job_id] = ImportJob(
+            job_id=job_id, status="done" if finished else "running", filename="x.csv",
+            created_at=created, finished_at=created if finished else None
+        )
+
+    import_jobs.prune_finished()
+    assert list(import_jobs._jobs) == ["b", "d"]
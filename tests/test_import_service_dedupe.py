@@ -0,0 +1,73 @@
+import pandas as pd
+
+from app.repositories import wifi_repository as repo
+from app.services import import_service
+
+EXISTING = {"B"}
+
+
+def chunk(ids, start):
+    return pd.DataFrame({
+        "id": ids,
+        "programa": ["CDMX WiFi"] * len(ids),
+        "latitud": ["19.3"] * len(ids),
+        "longitud": ["-99.1"] * len(ids),
+        "alcaldia": ["Tlalpan"] * len(ids),
+    }, index=range(start, start + len(ids)))
+
+
+def stub_repo(monkeypatch):
+    calls = {"queried": [], "written": []}
+
+    def get_existing_ids(db, wifi_ids):
+        calls["queried"].append(sorted(wifi_ids))
+        return EXISTING & set(wifi_ids)
+
+    def bulk_write(db, records, on_duplicate):
+        calls["written"].append([record["id"] for record in records])
+        return repo.BulkWriteResult(len(records), 0, 0)
+
+    monkeypatch.setattr(repo, "get_existing_ids", get_existing_ids)
+    monkeypatch.setattr(repo, "bulk_write", bulk_write)
+    return calls
+
+
+def test_duplicates_within_and_across_chunks(monkeypatch):
+    calls = stub_repo(monkeypatch)
+    errors, seen = [], set()
+
+    first = import_service.import_chunk(
+        None, chunk(["A", "B", "A", "C"], 0), "report", "skip", errors, seen
+    )
+    second = import_service.import_chunk(
+        None, chunk(["C", "D", "B", "D"], 4), "report", "skip", errors, seen
+    )
+
+    assert first == repo.BulkWriteResult(inserted=2, updated=0, skipped=2)
+    assert second == repo.BulkWriteResult(inserted=1, updated=0, skipped=3)
+    assert calls["written"] == [["A", "C"], ["D"]]
+    # C ya se aceptó en el primer bloque: no se consulta a la BD
+    assert calls["queried"] == [["A", "B", "C"], ["B", "D"]]
+    # B también se repite en el archivo, pero gana "ID duplicado"
+    assert [(e.row, e.id, e.reason) for e in errors] == [
+        (3, "B", "ID duplicado"),
+        (4, "A", "ID duplicado en el archivo"),
+        (6, "C", "ID duplicado en el archivo"),
+        (8, "B", "ID duplicado"),
+        (9, "D", "ID duplicado en el archivo"),
+    ]
+
+
+def test_fail_mode_stops_at_the_first_row(monkeypatch):
+    calls = stub_repo(monkeypatch)
+    errors = []
+
+    response = import_service.import_chunk(
+        None, chunk(["A", "A", "B"], 0), "report", "fail", errors, set()
+    )
+
+    assert response.status == "failed"
+    assert [(e.row, e.id, e.reason) for e in response.errors] == [
+        (3, "A", "ID duplicado en el archivo"),
+    ]
+    assert calls["written"] == []
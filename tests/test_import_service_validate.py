@@ -1,6 +1,6 @@
 import pandas as pd
 
-from app.services.import_service import validate_row
+from app.services.import_service import validate_frame, validate_row
 
 
 def test_validate_row_ok_returns_none():
@@ -25,3 +25,49 @@ def test_validate_row_out_of_range_latitude():
     })
 
     assert validate_row(row) == "Latitud fuera de rango: 123.0"
+
+
+def test_validate_frame_matches_row_rules():
+    df = pd.DataFrame({
+        "id": ["a", " ", "c", "d"],
+        "programa": ["CDMX WiFi", "CDMX WiFi", None, "CDMX WiFi"],
+        "alcaldia": [" Coyoacan ", "Tlalpan", "Tlalpan", "Tlalpan"],
+        "latitud": ["19,3", "19.3", "19.3", "19.3"],
+        "longitud": ["-99.1", "-99.1", "-99.1", "-200"],
+    })
+
+    clean, reasons = validate_frame(df)
+
+    assert reasons.tolist() == [
+        None,
+        "ID es requerido",
+        "Programa es requerido",
+        "Longitud fuera de rango: -200.0",
+    ]
+    assert clean.loc[0, "latitud"] == 19.3
+    assert clean.loc[0, "alcaldia"] == "Coyoacan"
+
+
+def test_reader_paths_give_the_same_reasons():
+    # Objetos (Excel, lector de pandas) y texto de Arrow (lector de pyarrow)
+    data = {
+        "id": ["a", "b", "c", "d"],
+        "programa": ["CDMX WiFi"] * 4,
+        "alcaldia": ["Tlalpan"] * 4,
+        "latitud": ["123", "inf", "nan", "1e999"],
+        "longitud": ["-99.1"] * 4,
+    }
+    expected = [
+        "Latitud fuera de rango: 123.0",
+        "Latitud inválida",
+        "Latitud inválida",
+        "Latitud inválida",
+    ]
+
+    for dtype in (object, "string[pyarrow]"):
+        _, reasons = validate_frame(pd.DataFrame(data, dtype=dtype))
+        assert reasons.tolist() == expected
+
+    row = pd.Series({"id": "a", "programa": "CDMX WiFi", "alcaldia": "Tlalpan",
+                     "latitud": "123", "longitud": "-99.1"})
+    assert validate_row(row) == "Latitud fuera de rango: 123.0"
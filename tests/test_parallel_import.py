@@ -0,0 +1,206 @@
+from io import BytesIO
+
+import pandas as pd
+import pytest
+
+from app.repositories import wifi_repository as repo
+from app.repositories.wifi_repository import RECORD_COLUMNS
+from app.services import dataset_state, import_service, parallel_import
+from app.utils import file_reader
+
+CSV = (
+    b"id,programa,latitud,longitud,alcaldia\n"
+    b'A1,"Parque\nCentral",19.43,-99.13,Cuauhtemoc\n'
+    b"A2,MiCalle,99.0,-99.13,Coyoacan\n"
+    b'A3,"Dice ""hola""",19.35,-99.06,Iztapalapa\n'
+    b"A4,MiCalle,19.24,-99.16,Tlalpan\n"
+    b"A5,MiCalle,,-99.16,Tlalpan\n"
+)
+
+
+def read_all_shards(content: bytes, shard_bytes: int) -> list[pd.DataFrame]:
+    stream = BytesIO(content)
+    dialect = file_reader.sniff_stream(stream)
+    header, ranges = parallel_import.plan_shards(stream, len(content), shard_bytes)
+    return [parallel_import.read_shard(stream, header, start, end, dialect) for start, end in ranges]
+
+
+def test_shards_never_split_quoted_fields():
+    # Un corte por cada pocos bytes: caen dentro de los campos entre comillas
+    for shard_bytes in (1, 7, 20, 64):
+        frames = read_all_shards(CSV, shard_bytes)
+        joined = pd.concat(frames, ignore_index=True)
+        expected = file_reader.read_file(CSV, "puntos.csv", RECORD_COLUMNS)
+        assert joined["id"].tolist() == expected["id"].tolist()
+        assert joined["programa"].tolist() == expected["programa"].tolist()
+
+
+def test_errors_get_global_row_numbers():
+    frames = read_all_shards(CSV, 20)
+    assert len(frames) > 1
+    results = []
+    for shard, df in enumerate(frames):
+        records, errors = parallel_import.parse_shard(df)
+        results.append(parallel_import.ShardResult(shard, len(df), len(records), errors))
+
+    offsets = parallel_import.shard_offsets(results)
+    rows = [
+        (offsets[result.shard] + row_index + 2, row_id, reason)
+        for result in results
+        for row_index, row_id, reason in result.errors
+    ]
+    assert rows == [
+        (3, "A2", "Latitud fuera de rango: 99.0"),
+        (6, "A5", "Latitud inválida"),
+    ]
+    assert sum(result.valid for result in results) == 3
+
+
+# Duplicados en el archivo entre bloques, contra la BD y filas inválidas
+# (E2 está en la BD y su fila falla la validación)
+MERGE_CSV = (
+    b"id,programa,latitud,longitud,alcaldia\n"
+    b"A1,MiCalle,19.1,-99.1,Tlalpan\n"
+    b"B1,MiCalle,19.2,-99.1,Tlalpan\n"
+    b"A1,Parque,19.3,-99.1,Tlalpan\n"
+    b"E1,MiCalle,19.4,-99.1,Tlalpan\n"
+    b"X1,MiCalle,99.0,-99.1,Tlalpan\n"
+    b"C1,MiCalle,19.5,-99.1,Coyoacan\n"
+    b"E2,MiCalle,abc,-99.1,Tlalpan\n"
+    b"C1,Parque,19.6,-99.1,Coyoacan\n"
+    b"D1,MiCalle,19.7,-99.1,Coyoacan\n"
+)
+STORED = {
+    "B1": ("MiCalle", 19.2, -99.1, "Tlalpan"),
+    "E1": ("Otro", 19.4, -99.1, "Tlalpan"),
+    "E2": ("MiCalle", 19.8, -99.1, "Tlalpan"),
+    "F1": ("MiCalle", 19.9, -99.1, "Tlalpan"),
+}
+
+
+class FakeDb:
+    """BD en memoria con la semántica de ON CONFLICT de bulk_write y merge_staged."""
+
+    def __init__(self, staged=()):
+        self.points = dict(STORED)
+        self.source_ids = set()
+        self.staged = sorted(staged, key=lambda row: row[:2])
+
+    def write(self, records, on_duplicate):
+        inserted = updated = skipped = unchanged = 0
+        for record in records:
+            values = tuple(record[key] for key in ("programa", "latitud", "longitud", "alcaldia"))
+            stored = self.points.get(record["id"])
+            if stored is None:
+                inserted += 1
+            elif on_duplicate not in import_service.UPSERT_MODES:
+                skipped += 1
+                continue
+            elif on_duplicate == "diff" and stored == values:
+                unchanged += 1
+                continue
+            else:
+                updated += 1
+            self.points[record["id"]] = values
+        return repo.BulkWriteResult(inserted, updated, skipped, unchanged)
+
+    def staged_duplicates(self):
+        seen = set()
+        for shard, row_index, record in self.staged:
+            in_db = record["id"] in self.points
+            if in_db or record["id"] in seen:
+                yield shard, row_index, record["id"], in_db
+            seen.add(record["id"])
+
+    def merge_staged(self, on_duplicate):
+        if on_duplicate in import_service.UPSERT_MODES:
+            # La última aparición de cada ID
+            last = {record["id"]: record for _, _, record in self.staged}
+            return self.write(list(last.values()), on_duplicate)
+        duplicated = {row[:2] for row in self.staged_duplicates()}
+        return self.write(
+            [record for shard, row_index, record in self.staged
+             if (shard, row_index) not in duplicated],
+            on_duplicate
+        )
+
+    def delete_missing(self):
+        missing = set(self.points) - self.source_ids
+        for wifi_id in missing:
+            del self.points[wifi_id]
+        return len(missing)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def fake_repo(monkeypatch):
+    monkeypatch.setattr(repo, "get_existing_ids", lambda db, ids: set(db.points) & set(ids))
+    monkeypatch.setattr(repo, "bulk_write", lambda db, records, on_duplicate: db.write(records, on_duplicate))
+    monkeypatch.setattr(repo, "staged_duplicates", lambda db, staging: db.staged_duplicates())
+    monkeypatch.setattr(repo, "merge_staged", lambda db, staging, on_duplicate: db.merge_staged(on_duplicate))
+    monkeypatch.setattr(repo, "record_source_ids", lambda db, ids: db.source_ids.update(ids))
+    monkeypatch.setattr(
+        repo, "record_staged_source_ids",
+        lambda db, staging: db.source_ids.update(record["id"] for _, _, record in db.staged)
+    )
+    monkeypatch.setattr(repo, "delete_missing", lambda db: db.delete_missing())
+    monkeypatch.setattr(repo, "refresh_alcaldias", lambda db: None)
+    monkeypatch.setattr(repo, "bump_dataset_version", lambda db: 1)
+    monkeypatch.setattr(dataset_state, "mark_changed", lambda version: None)
+
+
+def import_both(on_error, on_duplicate, delete_missing):
+    frame = file_reader.read_file(MERGE_CSV, "puntos.csv", RECORD_COLUMNS)
+    sequential_db = FakeDb()
+    sequential = import_service.import_frames(
+        sequential_db, [frame], on_error, on_duplicate, delete_missing=delete_missing
+    )
+
+    results, staged = [], []
+    for shard, df in enumerate(read_all_shards(MERGE_CSV, 60)):
+        records, errors = parallel_import.parse_shard(df)
+        results.append(parallel_import.ShardResult(shard, len(df), len(records), errors))
+        staged += [(shard, record["row_index"], record) for record in records]
+    assert len(results) > 2
+    parallel_db = FakeDb(staged)
+    parallel = parallel_import.merge_shards(
+        parallel_db, None, results, on_error, on_duplicate, delete_missing
+    )
+    return (sequential, sequential_db), (parallel, parallel_db)
+
+
+@pytest.mark.parametrize("on_error,on_duplicate", [
+    ("skip", "skip"), ("skip", "update"), ("skip", "diff"), ("skip", "fail"), ("fail", "update"),
+])
+def test_merge_shards_counts_match_import_frames(fake_repo, on_error, on_duplicate):
+    (sequential, sequential_db), (parallel, parallel_db) = import_both(
+        on_error, on_duplicate, delete_missing=False
+    )
+    assert parallel.model_dump(exclude={"chunks"}) == sequential.model_dump(exclude={"chunks"})
+    assert parallel_db.points == sequential_db.points
+
+
+def test_merge_shards_bookkeeping(fake_repo):
+    (update, _), _ = import_both("skip", "update", delete_missing=False)
+    # A1 y C1 se reemplazan dentro del archivo; B1 y E1 ya estaban
+    assert (update.inserted, update.updated, update.unchanged, update.skipped) == (3, 4, 0, 2)
+
+    (diff, _), _ = import_both("skip", "diff", delete_missing=False)
+    # B1 viene igual; E1 cambia de programa
+    assert (diff.inserted, diff.updated, diff.unchanged, diff.skipped) == (3, 1, 3, 2)
+
+
+def test_merge_shards_keeps_ids_of_invalid_rows(fake_repo):
+    (sequential, sequential_db), (parallel, parallel_db) = import_both(
+        "skip", "update", delete_missing=True
+    )
+    # E2 solo viene en una fila inválida y no se borra; F1 no viene
+    assert parallel.deleted == sequential.deleted == 1
+    assert "E2" in parallel_db.source_ids
+    assert parallel_db.source_ids == sequential_db.source_ids
+    assert set(parallel_db.points) == set(sequential_db.points) == set(STORED) - {"F1"} | {"A1", "C1", "D1"}
@@ -0,0 +1,18 @@
+from app.config import settings
+from app.services import dataset_state, tile_service
+
+
+def test_fingerprint_is_reread_after_ttl(monkeypatch):
+    generation = dataset_state.current_generation()
+    first = tile_service.store_fingerprint(generation, (16, 1000, "2024-01-01"))
+    assert tile_service.cached_fingerprint() == first
+    assert not first.behind()
+
+    monkeypatch.setattr(settings, "tile_fingerprint_ttl", 0)
+    assert tile_service.cached_fingerprint() is None
+
+    # Otro proceso importó: la huella cambia sin que cambie la generación local
+    changed = tile_service.store_fingerprint(generation, (16, 1200, "2024-01-02"))
+    assert changed.value != first.value
+    assert changed.behind()
+    assert tile_service.fresh_index(changed) is None
@@ -0,0 +1,14 @@
+from app.services import dataset_state, totals
+
+
+def test_counts_from_an_older_generation_are_discarded():
+    generation = dataset_state.current_generation()
+    totals.on_dataset_changed(generation)
+
+    # Una importación confirmó mientras se contaba
+    totals.store(generation - 1, total=10, by_alcaldia={"tlalpan": 3})
+    assert totals._total is None and totals._by_alcaldia is None
+
+    totals.store(generation, total=10)
+    assert totals._total == 10
+    totals.on_dataset_changed(generation)
@@ -0,0 +1,14 @@
+import pytest
+
+from app.utils.cursor import InvalidCursorError, decode_cursor, encode_cursor
+
+
+def test_cursor_roundtrip():
+    values = {"d": 1234.5678, "id": "AICM-01"}
+
+    assert decode_cursor(encode_cursor(values)) == values
+
+
+def test_decode_cursor_rejects_garbage():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("no-es-un-cursor")
@@ -0,0 +1,45 @@
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import QueuePool
+
+from app.utils.db_router import ReadRouter, ReadSession
+from app.utils.pool_metrics import instrumented
+
+
+def make_engine(path):
+    return create_engine(f"sqlite:///{path}", poolclass=instrumented(QueuePool))
+
+
+def database_name(connection):
+    return connection.engine.url.database
+
+
+def test_round_robin_and_fallback_to_primary(tmp_path):
+    primary = make_engine(tmp_path / "primary.db")
+    replicas = [make_engine(tmp_path / "a.db"), make_engine(tmp_path / "b.db")]
+    router = ReadRouter(primary, replicas)
+
+    used = []
+    for _ in range(4):
+        with router.connect() as connection:
+            used.append(database_name(connection))
+    assert used == [str(tmp_path / name) for name in ("a.db", "b.db", "a.db", "b.db")]
+
+    broken = ReadRouter(primary, [make_engine(tmp_path / "missing" / "x.db")])
+    with broken.connect() as connection:
+        assert database_name(connection) == str(tmp_path / "primary.db")
+    assert broken.stats()["replicas"][0]["down"] is True
+
+
+def test_read_session_connects_lazily(tmp_path):
+    router = ReadRouter(make_engine(tmp_path / "primary.db"), [make_engine(tmp_path / "a.db")])
+    replica_pool = router.replicas[0].pool
+
+    session = ReadSession(router)
+    assert replica_pool.checkedout() == 0
+
+    assert session.execute(text("SELECT 1")).scalar() == 1
+    assert replica_pool.checkedout() == 1
+
+    session.close()
+    assert replica_pool.checkedout() == 0
+    assert router.stats()["replicas"][0]["checkouts"] == 1
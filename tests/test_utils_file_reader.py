@@ -1,6 +1,11 @@
+import gzip
+from io import BytesIO
+
 import pandas as pd
+import pytest
 
-from app.utils.file_reader import parse_decimal
+from app.utils import file_reader
+from app.utils.file_reader import iter_chunks, parse_decimal, parse_decimal_series, read_file
 
 
 def test_parse_decimal_accepts_comma_decimal():
@@ -10,3 +15,56 @@ def test_parse_decimal_accepts_comma_decimal():
 def test_parse_decimal_returns_none_for_invalid():
     assert parse_decimal("nope") is None
     assert parse_decimal(None) is None
+
+
+def test_iter_chunks_sniffs_latin1_semicolon_csv():
+    content = "id;programa;alcaldia\n1;Parque;Álvaro Obregón\n2;Metro;Tlalpan\n3;Mercado;Iztapalapa\n"
+    stream = BytesIO(content.encode("latin-1"))
+
+    chunks = list(iter_chunks(stream, "puntos.csv", chunk_size=2))
+
+    assert [len(chunk) for chunk in chunks] == [2, 1]
+    assert list(chunks[1].index) == [2]
+    assert chunks[0]["alcaldia"].iloc[0] == "Álvaro Obregón"
+
+
+CSV = (
+    "extra;id;programa;latitud;longitud;alcaldia\n"
+    "x;001;Parque;19,43;-99,13;Álvaro Obregón\n"
+    "y;2;;19.44;-99.14;Tlalpan\n"
+)
+COLUMNS = ("id", "programa", "latitud", "longitud", "alcaldia")
+
+
+def test_read_file_gzip_csv_reads_only_requested_columns_as_text(monkeypatch):
+    content = gzip.compress(CSV.encode("latin-1"))
+
+    frames = [read_file(content, "puntos.csv.gz", COLUMNS)]
+    # Sin pyarrow se usa el motor C de pandas y el resultado es el mismo
+    monkeypatch.setattr(file_reader, "has_pyarrow", lambda: False)
+    frames.append(read_file(content, "puntos.csv.gz", COLUMNS))
+
+    for df in frames:
+        assert list(df.columns) == list(COLUMNS)
+        assert df["id"].tolist() == ["001", "2"]
+        assert pd.isna(df["programa"].iloc[1])
+        assert parse_decimal_series(df["latitud"]).tolist() == [19.43, 19.44]
+
+
+def test_iter_chunks_parquet_keeps_index_and_text_ids():
+    pa = pytest.importorskip("pyarrow")
+    import pyarrow.parquet as pq
+
+    table = pa.table({
+        "id": [1, 2, 3], "programa": ["a", "b", "c"], "latitud": [19.4, 19.5, 19.6],
+        "longitud": [-99.1, -99.2, -99.3], "alcaldia": ["x", "y", "z"], "extra": [0, 0, 0],
+    })
+    buffer = BytesIO()
+    pq.write_table(table, buffer)
+    buffer.seek(0)
+
+    chunks = list(iter_chunks(buffer, "puntos.parquet", chunk_size=2, columns=COLUMNS))
+
+    assert [list(chunk.index) for chunk in chunks] == [[0, 1], [2]]
+    assert list(chunks[1].columns) == list(COLUMNS)
+    assert chunks[1]["id"].tolist() == ["3"]
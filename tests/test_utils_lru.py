@@ -0,0 +1,22 @@
+from app.services.response_cache import etag_matches
+from app.utils.lru import LRUCache
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats() == {
+        "entries": 2, "max_entries": 2, "hits": 2, "misses": 1, "evictions": 1,
+    }
+
+
+def test_etag_matches_if_none_match_list():
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert not etag_matches('"x"', '"abc"')
+    assert not etag_matches(None, '"abc"')
@@ -0,0 +1,63 @@
+import pytest
+
+from app.utils import instrumentation
+from app.utils.metrics import Counter, Histogram, Metric, render
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latencia", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(0.05, "/a")
+    histogram.observe(0.5, "/a")
+    histogram.observe(3, "/a")
+
+    assert render([histogram]).splitlines() == [
+        "# HELP latency_seconds Latencia",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{route="/a",le="0.1"} 1',
+        'latency_seconds_bucket{route="/a",le="1"} 2',
+        'latency_seconds_bucket{route="/a",le="+Inf"} 3',
+        'latency_seconds_sum{route="/a"} 3.55',
+        'latency_seconds_count{route="/a"} 3',
+    ]
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("errors", "Errores", ("reason",))
+    counter.inc('dice "no"\n')
+    counter.inc('dice "no"\n', amount=2)
+
+    assert render([counter]).splitlines()[-1] == 'errors_total{reason="dice \\"no\\"\\n"} 3'
+
+
+def test_stage_adds_to_current_request():
+    timings = instrumentation.RequestTimings()
+    token = instrumentation._current.set(timings)
+    try:
+        with instrumentation.stage("serialize"):
+            pass
+        with instrumentation.stage("serialize"):
+            pass
+    finally:
+        instrumentation._current.reset(token)
+
+    assert list(timings.stages) == ["serialize"]
+    assert "serialize;dur=" in timings.server_timing(timings.start)
+    assert instrumentation.STAGE_SECONDS.snapshot("serialize")[2] >= 2
+
+
+def test_statement_operation():
+    assert instrumentation.statement_operation("\n  select 1") == "SELECT"
+    assert instrumentation.statement_operation("(SELECT 1) UNION (SELECT 2)") == "SELECT"
+    assert instrumentation.statement_operation("VACUUM wifi_points") == "OTHER"
+
+
+def test_counter_publishes_scraped_totals():
+    counter = Counter("cache_hits", "Aciertos", ("cache",))
+    counter.set(7, "tiles")
+
+    assert render([counter]).splitlines()[1:] == [
+        "# TYPE cache_hits counter",
+        'cache_hits_total{cache="tiles"} 7',
+    ]
+    with pytest.raises(TypeError):
+        Metric("base", "Sin samples")
@@ -0,0 +1,40 @@
+import numpy as np
+
+from app.utils import mvt
+from app.utils.spatial_index import SpatialIndex
+
+
+def test_tile_of_point_contains_it():
+    lng, lat, z = -99.1332, 19.4326, 14
+    x, y = mvt.lng_tile(lng, z), mvt.lat_tile(lat, z)
+    min_lng, min_lat, max_lng, max_lat = mvt.tile_bounds(z, x, y)
+
+    assert min_lng <= lng <= max_lng and min_lat <= lat <= max_lat
+    assert (x, y) in mvt.tiles_covering(lng - 0.01, lat - 0.01, lng + 0.01, lat + 0.01, z)
+    assert mvt.tile_bounds(0, 0, 0)[0] == -180.0
+
+
+def test_encode_points_layer_bytes_and_buffer():
+    z, x, y = 10, 230, 455
+    outside = mvt.tile_bounds(z, x + 2, y)[0]
+
+    tile = mvt.encode_points("wifi_points", ["a", "far"], np.array([-99.13, outside]),
+                             np.array([19.43, 19.43]), z, x, y)
+
+    # Capa "wifi_points" v2 con un punto (MoveTo 124, 2628) y atributo id="a"
+    assert tile.hex() == (
+        "1a2a78020a0b776966695f706f696e7473120d120200001801220509f80188291a02696422030a0161288020"
+    )
+    assert mvt.encode_points("wifi_points", [], np.array([]), np.array([]), z, x, y) == b""
+
+
+def test_index_within_bbox_matches_brute_force():
+    rng = np.random.default_rng(7)
+    lats = rng.uniform(19.1, 19.6, 500)
+    lngs = rng.uniform(-99.4, -98.9, 500)
+    index = SpatialIndex([f"p{i}" for i in range(500)], lats, lngs, cell_deg=0.02)
+
+    found = set(index.ids[index.within_bbox(-99.2, 19.3, -99.05, 19.45)])
+    expected = {f"p{i}" for i in range(500)
+                if -99.2 <= lngs[i] <= -99.05 and 19.3 <= lats[i] <= 19.45}
+    assert found == expected
@@ -0,0 +1,38 @@
+import numpy as np
+
+from app.utils.nearest_grid import NearestGrid
+from app.utils.spatial_index import SpatialIndex
+
+
+def make_index(n=1500, seed=11):
+    rng = np.random.default_rng(seed)
+    # Un cúmulo denso y puntos dispersos, con coordenadas repetidas para los empates
+    lats = np.concatenate([rng.normal(19.43, 0.01, n // 2), rng.uniform(19.2, 19.6, n - n // 2)])
+    lngs = np.concatenate([rng.normal(-99.13, 0.01, n // 2), rng.uniform(-99.3, -98.9, n - n // 2)])
+    lats[-50:], lngs[-50:] = lats[:50], lngs[:50]
+    ids = [f"p{i:05d}" for i in range(n)]
+    return SpatialIndex(ids, lats, lngs, cell_deg=0.01)
+
+
+def test_grid_matches_index_and_falls_back_when_it_cannot_answer():
+    index = make_index()
+    grid = NearestGrid(index, k=5, cell_deg=0.01, max_candidates=40)
+    rng = np.random.default_rng(3)
+    queries = list(zip(rng.uniform(19.2, 19.6, 400), rng.uniform(-99.3, -98.9, 400)))
+    # Justo sobre puntos repetidos: cinco empates exactos en distancia 0
+    queries += list(zip(index.lats[:20].tolist(), index.lngs[:20].tolist()))
+
+    answered = 0
+    for lat, lng in queries:
+        for k in (1, 5):
+            result = grid.nearest(lat, lng, k)
+            if result is not None:
+                answered += 1
+                assert result == index.nearest(lat, lng, k)
+
+    stats = grid.stats()
+    assert answered > 0
+    assert stats["fallback_cells"] > 0
+    assert stats["candidates_max"] <= 40
+    assert grid.nearest(19.43, -99.13, 6) is None
+    assert grid.nearest(25.0, -80.0, 1) is None
@@ -0,0 +1,51 @@
+import numpy as np
+
+from app.utils.spatial_index import KNN_EARTH_RADIUS, SpatialIndex, central_angle
+
+
+def make_index(n=2000, seed=7):
+    rng = np.random.default_rng(seed)
+    lats = rng.uniform(19.2, 19.6, n)
+    lngs = rng.uniform(-99.3, -98.9, n)
+    ids = [f"p{i:05d}" for i in range(n)]
+    return SpatialIndex(ids, lats, lngs, cell_deg=0.01), ids, lats, lngs
+
+
+def brute_force(ids, lats, lngs, lat, lng):
+    dist = central_angle(lat, lng, lats, lngs) * KNN_EARTH_RADIUS
+    return sorted(zip(dist.tolist(), ids))
+
+
+def test_nearest_matches_brute_force():
+    index, ids, lats, lngs = make_index()
+    expected = brute_force(ids, lats, lngs, 19.43, -99.13)[:25]
+
+    result = index.nearest(19.43, -99.13, limit=25)
+
+    assert [wifi_id for wifi_id, _, _ in result] == [wifi_id for _, wifi_id in expected]
+    assert np.allclose([knn for _, _, knn in result], [d for d, _ in expected])
+
+
+def test_cursor_pages_cover_full_order_within_radius():
+    index, ids, lats, lngs = make_index()
+    expected = [wifi_id for d, wifi_id in brute_force(ids, lats, lngs, 19.5, -99.2) if d <= 3000]
+
+    seen, after = [], None
+    while True:
+        page = index.nearest(19.5, -99.2, limit=7, radius_m=3000, after=after)
+        if not page:
+            break
+        seen.extend(wifi_id for wifi_id, _, _ in page)
+        after = (page[-1][2], page[-1][0])
+
+    assert seen == expected
+    assert index.count_within(19.5, -99.2, 3000) == len(expected)
+
+
+def test_query_outside_grid():
+    index, ids, lats, lngs = make_index(n=300)
+    expected = brute_force(ids, lats, lngs, 25.0, -80.0)[:3]
+
+    result = index.nearest(25.0, -80.0, limit=3)
+
+    assert [wifi_id for wifi_id, _, _ in result] == [wifi_id for _, wifi_id in expected]
@@ -0,0 +1,8 @@
+from app.utils.text import normalize_key
+
+
+def test_normalize_key_ignores_accents_case_and_spacing():
+    assert normalize_key("Álvaro Obregón") == "alvaro obregon"
+    assert normalize_key("  alvaro   OBREGON ") == "alvaro obregon"
+    assert normalize_key("alvaro-obregon") == "alvaro obregon"
+    assert normalize_key("Cuauhtémoc") == normalize_key("CUAUHTEMOC")
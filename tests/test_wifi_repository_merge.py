@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+
+from sqlalchemy.dialects import postgresql
+
+from app.repositories import wifi_repository as repo
+
+
+def compile_merge(on_duplicate):
+    return str(repo.merge_statement(repo.staging, on_duplicate).compile(dialect=postgresql.dialect()))
+
+
+def test_diff_mode_only_updates_changed_rows():
+    diff = compile_merge("diff")
+    update = compile_merge("update")
+
+    assert "ON CONFLICT (id) DO UPDATE" in diff
+    assert (
+        "WHERE (wifi_points.programa, wifi_points.latitud, wifi_points.longitud, wifi_points.alcaldia) "
+        "IS DISTINCT FROM (excluded.programa, excluded.latitud, excluded.longitud, excluded.alcaldia)"
+    ) in diff
+    assert "IS DISTINCT FROM" not in update
+    assert "DO NOTHING" in compile_merge("skip")
+
+
+def test_generated_location_is_not_written():
+    # El modelo lee COORDINATE_STORAGE al importarse: se compila en otro proceso
+    probe = (
+        "from sqlalchemy.dialects import postgresql\n"
+        "from sqlalchemy import select\n"
+        "from app.repositories import wifi_repository as repo\n"
+        "dialect = postgresql.dialect()\n"
+        "print(repo.merge_statement(repo.staging, 'update').compile(dialect=dialect))\n"
+        "print(select(*repo.RESPONSE_COLUMNS).compile(dialect=dialect))\n"
+    )
+    env = {**os.environ, "COORDINATE_STORAGE": "float"}
+    output = subprocess.run(
+        [sys.executable, "-c", probe], env=env, capture_output=True, text=True, check=True
+    ).stdout
+
+    assert "location" not in output
+    assert "CAST(CAST(wifi_points.latitud AS NUMERIC(10, 6)) AS VARCHAR) AS latitud" in output
+    assert "ST_SetSRID(ST_MakePoint" in compile_merge("update")
+
+
+def test_delete_missing_statement():
+    sql = str(repo.delete_missing_statement().compile(dialect=postgresql.dialect()))
+
+    assert sql.startswith("DELETE FROM wifi_points WHERE NOT (EXISTS (SELECT")
+    assert "wifi_points_source_ids.id = wifi_points.id" in sql
+
+
+def test_staged_statements():
+    dialect = postgresql.dialect()
+    staging = repo.shard_staging("public", "wifi_points_import_test")
+    duplicates = str(repo.staged_duplicates_statement(staging).compile(dialect=dialect))
+    skip = str(repo.merge_statement(repo.staged_source(staging, "skip"), "skip").compile(dialect=dialect))
+    update = str(repo.merge_statement(repo.staged_source(staging, "update"), "update").compile(dialect=dialect))
+
+    assert "EXISTS (SELECT" in duplicates
+    assert "row_number() OVER (PARTITION BY public.wifi_points_import_test.id" in duplicates
+    assert "WHERE NOT (EXISTS (SELECT" in skip
+    assert "DO NOTHING" in skip
+    assert "EXISTS" not in update
+    assert "shard DESC" in update
+    assert "ON CONFLICT (id) DO UPDATE" in update
+
+
+def test_refresh_alcaldias_locks_before_rebuilding():
+    class RecordingSession:
+        def __init__(self):
+            self.statements = []
+
+        def execute(self, statement):
+            self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+
+    db = RecordingSession()
+    repo.refresh_alcaldias(db)
+
+    assert db.statements[0] == "LOCK TABLE alcaldias IN EXCLUSIVE MODE"
+    assert db.statements[1] == "DELETE FROM alcaldias"
+    assert db.statements[2].startswith("INSERT INTO alcaldias")
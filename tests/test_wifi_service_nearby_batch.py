@@ -0,0 +1,49 @@
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.schemas.wifi_point import NearbyBatchQuery, NearbyBatchResponse, NearbyBatchResult
+from app.services import wifi_service
+from app.utils.spatial_index import SpatialIndex
+
+
+def make_row(wifi_id, lat, lng, **extra):
+    return SimpleNamespace(
+        id=wifi_id, programa="MiCalle", latitud=Decimal(str(lat)), longitud=Decimal(str(lng)),
+        alcaldia="Coyoacán", created_at=datetime(2024, 1, 1), updated_at=None, **extra
+    )
+
+
+def test_index_batch_groups_per_query_and_matches_model_json():
+    coords = {"a": (19.43, -99.13), "b": (19.44, -99.14), "c": (19.35, -99.16)}
+    index = SpatialIndex(list(coords), [c[0] for c in coords.values()], [c[1] for c in coords.values()])
+    points = {wifi_id: make_row(wifi_id, *latlng) for wifi_id, latlng in coords.items()}
+    queries = [
+        NearbyBatchQuery(lat=19.431, lng=-99.131, k=2),
+        NearbyBatchQuery(lat=19.35, lng=-99.16, k=3, radius_m=500),
+    ]
+
+    matches = wifi_service.search_index_batch(index, wifi_service.batch_params(queries))
+    groups = wifi_service.attach_batch_rows(matches, points)
+
+    assert [[point.id for point, _ in group] for group in groups] == [["a", "b"], ["c"]]
+    expected = NearbyBatchResponse(results=[
+        NearbyBatchResult(
+            lat=query.lat,
+            lng=query.lng,
+            data=[wifi_service.to_response_with_distance(p, d) for p, d in group]
+        )
+        for query, group in zip(queries, groups)
+    ])
+    assert wifi_service.encode_batch(queries, groups) == expected.model_dump_json().encode("utf-8")
+
+
+def test_group_batch_rows_keeps_empty_groups():
+    rows = [
+        make_row("a", 19.4, -99.1, idx=0, distancia_metros=10.0),
+        make_row("b", 19.4, -99.1, idx=2, distancia_metros=20.0),
+    ]
+
+    groups = wifi_service.group_batch_rows(rows, 3)
+
+    assert [[point.id for point, _ in group] for group in groups] == [["a"], [], ["b"]]
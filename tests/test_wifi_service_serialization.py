@@ -0,0 +1,42 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.schemas.wifi_point import PaginatedResponse
+from app.services import wifi_service
+from app.utils import json_encoder
+
+
+def make_point(**overrides):
+    values = {
+        "id": "MEX-001",
+        "programa": "Zócalo conectado",
+        "latitud": Decimal("19.43260800"),
+        "longitud": Decimal("-99.13320900"),
+        "alcaldia": "Cuauhtémoc",
+        "created_at": datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc),
+        "updated_at": None,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+def test_lean_page_matches_pydantic_json():
+    points = [make_point(), make_point(id="MEX-002", alcaldia="Coyoacán", updated_at=datetime(2024, 6, 2))]
+    pagination = wifi_service.build_pagination(1, 2, 10, "abc")
+
+    expected = PaginatedResponse(
+        data=list(map(wifi_service.to_response, points)), pagination=pagination
+    ).model_dump_json().encode("utf-8")
+    lean = wifi_service.encode_page(list(map(wifi_service.to_dict, points)), pagination)
+
+    assert lean == expected
+
+
+def test_lean_distance_matches_pydantic_json():
+    point = make_point()
+
+    expected = wifi_service.to_response_with_distance(point, 1234.5678).model_dump_json()
+    lean = json_encoder.dumps(wifi_service.to_dict_with_distance(point, 1234.5678))
+
+    assert lean == expected.encode("utf-8")
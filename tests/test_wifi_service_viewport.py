@@ -0,0 +1,40 @@
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.config import settings
+from app.repositories.wifi_repository import BBox
+from app.schemas.wifi_point import ViewportCluster, ViewportResponse
+from app.services import wifi_service
+
+
+def test_cell_size_bounds_cells_per_axis():
+    city = BBox(-99.4, 19.0, -98.9, 19.6)
+    world = BBox(-180, -85, 180, 85)
+
+    assert wifi_service.viewport_cell_deg(city, 12) == 360 / 2 ** 12 / settings.viewport_cells_per_tile
+    # Un zoom alto con un rectángulo enorme no debe generar miles de celdas por eje
+    cell = wifi_service.viewport_cell_deg(world, 18)
+    assert 360 / cell <= settings.viewport_max_cells_per_axis
+
+
+def test_encode_viewport_matches_model_json():
+    point = SimpleNamespace(
+        id="a", programa="MiCalle", latitud=Decimal("19.43"), longitud=Decimal("-99.13"),
+        alcaldia="Coyoacán", created_at=datetime(2024, 1, 1), updated_at=None
+    )
+    cluster = SimpleNamespace(count=3, lat=19.4, lng=-99.1, id=None)
+
+    for viewport in (
+        wifi_service.points_viewport([point]),
+        wifi_service.clusters_viewport([cluster], 0.01),
+    ):
+        expected = ViewportResponse(
+            zoom=14,
+            clustered=viewport.clustered,
+            cell_deg=viewport.cell_deg,
+            total=viewport.total,
+            points=list(map(wifi_service.to_response, viewport.points)),
+            clusters=[ViewportCluster(**wifi_service.cluster_to_dict(c)) for c in viewport.clusters]
+        )
+        assert wifi_service.encode_viewport(viewport, 14) == expected.model_dump_json().encode("utf-8")